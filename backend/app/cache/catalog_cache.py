@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CatalogCache(Generic[T]):
+    """
+    In-process cache for a small, rarely-changing catalog (emotions, symptoms).
+
+    Items are indexed by name (and also kept as loaded, for listing them
+    without collapsing duplicate names) and reloaded once the TTL expires or after
+    invalidate() is called by the write path. Each load also gets a version
+    derived from the catalog contents, so it is stable across workers and
+    usable as an HTTP ETag.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[List[T]]],
+        key: Callable[[T], str],
+        ttl: float,
+    ):
+        self._loader = loader
+        self._key = key
+        self._ttl = ttl
+        self._items: List[T] = []
+        self._index: Optional[Dict[str, T]] = None
+        self._names: frozenset = frozenset()
+        self._version: Optional[str] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._index is not None and time.monotonic() < self._expires_at
+
+    @staticmethod
+    def _fingerprint(index: Dict[str, T]) -> str:
+        digest = hashlib.sha1()
+        for name in sorted(index):
+            item = index[name]
+            dump = item.model_dump_json() if hasattr(item, "model_dump_json") else repr(item)
+            digest.update(dump.encode("utf-8"))
+        return digest.hexdigest()
+
+    async def get(self) -> Dict[str, T]:
+        """Return the name -> item index, loading it if missing or expired."""
+        index, _ = await self.get_with_version()
+        return index
+
+    async def get_with_version(self) -> Tuple[Dict[str, T], str]:
+        """Return the index together with its content version."""
+        _, index, version = await self._snapshot()
+        return index, version
+
+    async def items(self) -> List[T]:
+        """Return every loaded item in loader order, duplicate names included."""
+        items, _, _ = await self._snapshot()
+        return list(items)
+
+    async def _snapshot(self) -> Tuple[List[T], Dict[str, T], str]:
+        if self._is_fresh():
+            return self._items, self._index, self._version
+
+        async with self._lock:
+            # Another coroutine may have refreshed it while we waited
+            if self._is_fresh():
+                return self._items, self._index, self._version
+
+            generation = self._generation
+            items = await self._loader()
+            index = {self._key(item): item for item in items}
+            version = self._fingerprint(index)
+
+            # Don't publish a load that raced with an invalidation
+            if generation == self._generation:
+                self._items = items
+                self._index = index
+                self._names = frozenset(index)
+                self._version = version
+                self._expires_at = time.monotonic() + self._ttl
+            return items, index, version
+
+    async def names(self) -> frozenset:
+        """Return the set of cached names."""
+        index = await self.get()
+        return self._names if index is self._index else frozenset(index)
+
+    async def contains(self, name: str) -> bool:
+        return name in await self.names()
+
+    def invalidate(self):
+        """Drop the cached catalog so the next read reloads it."""
+        self._generation += 1
+        self._items = []
+        self._index = None
+        self._names = frozenset()
+        self._version = None
+        self._expires_at = 0.0
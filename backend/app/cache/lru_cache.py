@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LRUCache(Generic[T]):
+    """
+    Bounded in-process LRU cache with optional per-entry expiry.
+
+    Expiry times are absolute wall-clock timestamps (seconds since the epoch),
+    so they can be taken straight from a JWT `exp` claim. Lookups count hits
+    and misses for monitoring. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[T, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: T, expires_at: Optional[float] = None):
+        """
+        Store a value. It expires at `expires_at` or after the cache TTL,
+        whichever comes first.
+        """
+        if self._ttl is not None:
+            ttl_expiry = time.time() + self._ttl
+            expires_at = ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+        if self._maxsize <= 0 or (expires_at is not None and expires_at <= time.time()):
+            return
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self._maxsize}
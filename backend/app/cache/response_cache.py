@@ -0,0 +1,188 @@
+"""
+Per-user cache of the analytics responses behind the dashboard.
+
+Insights, patterns, emotion frequency and symptom time patterns only change
+when their owner writes a thought, so they are cached per (uid, endpoint)
+and dropped by the thought write paths in thought_service. Entries also
+expire after RESPONSE_CACHE_TTL_SECONDS, which bounds how stale a result can
+get when a write bypasses the API (scripts, stats rebuilds) or a cache
+outage swallowed an invalidation.
+
+    RESPONSE_CACHE_BACKEND      memory                    "memory" (per worker), "redis" (shared) or "none"
+    RESPONSE_CACHE_TTL_SECONDS  300
+    RESPONSE_CACHE_SIZE         10000                     entries per worker (memory backend)
+    RESPONSE_CACHE_REDIS_URL    redis://localhost:6379/0
+
+The redis backend needs the `redis` package; RedisBackend accepts any client
+with the same async get/set/delete calls, so a local stand-in can replace it.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from app.cache.lru_cache import LRUCache
+from app.cache.single_flight import SingleFlight
+from app.monitoring.metrics import RESPONSE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = "response:"
+
+INSIGHTS_SUMMARY = "insights-summary"
+THOUGHT_PATTERNS = "patterns"
+EMOTIONS_FREQUENCY = "emotions-frequency"
+SYMPTOMS_TIME_PATTERNS = "symptoms-time-patterns"
+# Every cached endpoint of a user is dropped on each of their writes
+CACHED_ENDPOINTS = (INSIGHTS_SUMMARY, THOUGHT_PATTERNS, EMOTIONS_FREQUENCY, SYMPTOMS_TIME_PATTERNS)
+
+
+class ResponseCacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryBackend:
+    """Bounded LRU in this worker's memory."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self._entries: LRUCache[bytes] = LRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, expires_at=time.time() + ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.invalidate(key)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+class RedisBackend:
+    """Shared by every worker; `client` is a redis.asyncio client or a stand-in for one."""
+
+    def __init__(self, client, prefix: str = REDIS_KEY_PREFIX):
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(self._prefix + key, value, ex=max(1, int(ttl)))
+
+    async def delete(self, *keys: str) -> None:
+        await self._client.delete(*(self._prefix + key for key in keys))
+
+    async def close(self) -> None:
+        close = getattr(self._client, "aclose", None) or self._client.close
+        await close()
+
+
+class ResponseCache:
+    """
+    Read-through cache of JSON-serializable results. Backend errors are
+    logged and treated as misses, so an unavailable cache only costs the
+    recomputation.
+    """
+
+    def __init__(self, backend: Optional[ResponseCacheBackend], ttl: float = RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._loads = SingleFlight()
+        # uid -> tick of the user's latest invalidation, so a load that raced
+        # with a write is not stored (kept as long as the entries it guards)
+        self._clock = 0
+        self._invalidated: LRUCache[int] = LRUCache(maxsize=RESPONSE_CACHE_SIZE, ttl=ttl)
+
+    @staticmethod
+    def _key(uid: str, endpoint: str) -> str:
+        return f"{uid}:{endpoint}"
+
+    async def get_or_load(self, uid: str, endpoint: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached result of `endpoint` for `uid`, or loader()'s result (then cached)."""
+        if endpoint not in CACHED_ENDPOINTS:
+            raise ValueError(f"Not a cached endpoint: {endpoint}")
+        if self.backend is None:
+            return await loader()
+
+        key = self._key(uid, endpoint)
+        try:
+            cached = await self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            cached = None
+        if cached is not None:
+            RESPONSE_CACHE_REQUESTS.inc(endpoint, "hit")
+            return json.loads(cached)
+
+        RESPONSE_CACHE_REQUESTS.inc(endpoint, "miss")
+        # Requests arriving after a write must not join a load that started before it
+        generation = self._invalidated.get(uid)
+        return await self._loads.do((key, generation), lambda: self._load(uid, key, loader))
+
+    async def _load(self, uid: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        started = self._clock
+        value = await loader()
+
+        invalidated = self._invalidated.get(uid)
+        if invalidated is not None and invalidated > started:
+            return value
+        try:
+            await self.backend.set(key, json.dumps(value, default=str).encode("utf-8"), self.ttl)
+        except Exception:
+            logger.warning("Response cache write failed", exc_info=True)
+        return value
+
+    async def invalidate(self, uid: str) -> None:
+        """Drop every cached response of `uid`; called after each of their writes."""
+        self._clock += 1
+        self._invalidated.set(uid, self._clock)
+        if self.backend is None:
+            return
+        try:
+            await self.backend.delete(*(self._key(uid, endpoint) for endpoint in CACHED_ENDPOINTS))
+        except Exception:
+            logger.warning("Response cache invalidation failed", exc_info=True, extra={"uid": uid})
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def _redis_client(url: str):
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError as e:
+        raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from e
+    return redis_asyncio.from_url(url)
+
+
+def create_response_cache() -> ResponseCache:
+    if RESPONSE_CACHE_BACKEND == "none":
+        return ResponseCache(None)
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return ResponseCache(MemoryBackend())
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return ResponseCache(RedisBackend(_redis_client(RESPONSE_CACHE_REDIS_URL)))
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {RESPONSE_CACHE_BACKEND}")
+
+
+response_cache = create_response_cache()
@@ -1,71 +1,253 @@
+import logging
 import os
 from dotenv import load_dotenv
-from neo4j import GraphDatabase, exceptions
-from contextlib import contextmanager
-from typing import Generator
+from neo4j import AsyncGraphDatabase, GraphDatabase, READ_ACCESS, WRITE_ACCESS, unit_of_work
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Awaitable, Callable, Generator, Optional, TypeVar
+from neo4j._async.driver import AsyncSession
 from neo4j._sync.driver import Session
+from app.db.queries import AsyncTrackedSession, TrackedSession
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 
+# Routing: with a neo4j:// (or neo4j+s://) URI, read-access sessions go to
+# followers/read replicas and write-access sessions to the leader; bolt://
+# always talks to the one server. Naming the database also saves the driver a
+# home-database lookup per session.
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE") or None
+# Where the analytics aggregates run: "read" (replicas) or "write" (leader,
+# for read-your-own-writes at the cost of loading the leader)
+NEO4J_ANALYTICS_ACCESS = os.getenv("NEO4J_ANALYTICS_ACCESS", "read").lower()
+
+# Connection pool settings (seconds for every timeout/lifetime value)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "60"))
+
+# Managed transactions: transient failures (leader switch, deadlock, expired
+# session) are retried with exponential backoff for at most this long, and
+# each transaction is terminated by the server after its timeout.
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "15"))
+NEO4J_TRANSACTION_TIMEOUT = float(os.getenv("NEO4J_TRANSACTION_TIMEOUT", "10"))
+
+T = TypeVar("T")
+
+
+def pool_config() -> dict:
+    """Driver keyword arguments for the connection pool and transaction retries."""
+    return {
+        "max_connection_pool_size": NEO4J_MAX_POOL_SIZE,
+        "connection_acquisition_timeout": NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": NEO4J_MAX_CONNECTION_LIFETIME,
+        "liveness_check_timeout": NEO4J_LIVENESS_CHECK_TIMEOUT,
+        "max_transaction_retry_time": NEO4J_MAX_TRANSACTION_RETRY_TIME,
+    }
+
+
+def _transaction_timeout(timeout: Optional[float]) -> float:
+    return NEO4J_TRANSACTION_TIMEOUT if timeout is None else timeout
+
+
+def session_config(**config) -> dict:
+    """Session keyword arguments, with the configured database filled in."""
+    if NEO4J_DATABASE:
+        config.setdefault("database", NEO4J_DATABASE)
+    return config
+
+
+def analytics_access_mode() -> str:
+    return WRITE_ACCESS if NEO4J_ANALYTICS_ACCESS == "write" else READ_ACCESS
+
+
 class Neo4jConnection:
-    def __init__(self, uri: str = NEO4J_URI, user: str = NEO4J_USER, password: str = NEO4J_PASSWORD):
+    def __init__(
+        self,
+        uri: str = NEO4J_URI,
+        user: str = NEO4J_USER,
+        password: str = NEO4J_PASSWORD,
+        lazy: bool = False,
+    ):
         self.uri = uri
         self.user = user
         self.password = password
         self.driver = None
-        self.connect()
+        if not lazy:
+            self.connect()
 
     def connect(self) -> bool:
         """Establishes Neo4j connection and returns a status."""
+        if self.driver is not None:
+            return True
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
-            print("Connection established.")
+            self.driver = GraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                **pool_config(),
+            )
+            logger.info("Neo4j driver created", extra={"uri": self.uri})
             return True
-        except Exception as e:
-            print(f"Failed to connect to Neo4j: {str(e)}")
+        except Exception:
+            logger.exception("Failed to connect to Neo4j")
             return False
 
     def close(self):
         """Close the Neo4j driver connection."""
         if self.driver:
             self.driver.close()
-            print("Connection closed.")
+            self.driver = None
+            logger.info("Neo4j driver closed")
 
     def reconnect(self):
         """
         Attempt to reconnect to the Neo4j database.
         """
 
-        print("Attempting to reconnect...")
+        logger.warning("Reconnecting to Neo4j")
         self.close()
         return self.connect()
 
     @contextmanager
-    def get_session(self) -> Generator[Session, None, None]:
-        """Get a Neo4j session with automatic reconnection on failure."""
-        if not self.driver or self.driver is None:
+    def get_session(self, **config) -> Generator[Session, None, None]:
+        """Get a Neo4j session, closing it when the block exits.
+
+        Expired sessions and other transient errors are retried by
+        execute_read/execute_write, not here: a context manager can only
+        yield once.
+        """
+        if self.driver is None:
+            self.connect()
+
+        session = self.driver.session(**session_config(**config))
+        try:
+            yield TrackedSession(session)
+        finally:
+            session.close()
+
+    def execute_read(self, work: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """Run work(tx, *args, **kwargs) in a managed read transaction, retried on transient errors."""
+        with self.get_session() as session:
+            return session.execute_read(self._transaction_function(work, timeout), *args, **kwargs)
+
+    def execute_write(self, work: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """Run work(tx, *args, **kwargs) in a managed write transaction, retried on transient errors."""
+        with self.get_session() as session:
+            return session.execute_write(self._transaction_function(work, timeout), *args, **kwargs)
+
+    def execute_analytics(self, work: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """Run a read-only aggregate where NEO4J_ANALYTICS_ACCESS routes it (replicas by default)."""
+        if analytics_access_mode() == WRITE_ACCESS:
+            return self.execute_write(work, *args, timeout=timeout, **kwargs)
+        return self.execute_read(work, *args, timeout=timeout, **kwargs)
+
+    @staticmethod
+    def _transaction_function(work: Callable[..., T], timeout: Optional[float]) -> Callable[..., T]:
+        @unit_of_work(timeout=_transaction_timeout(timeout))
+        def run(tx, *args, **kwargs):
+            return work(TrackedSession(tx), *args, **kwargs)
+        return run
+
+
+class AsyncNeo4jConnection:
+    """Async counterpart of Neo4jConnection, used by request handlers so
+    Cypher round trips don't block the event loop."""
+
+    def __init__(self, uri: str = NEO4J_URI, user: str = NEO4J_USER, password: str = NEO4J_PASSWORD):
+        self.uri = uri
+        self.user = user
+        self.password = password
+        self.driver = None
+
+    def connect(self) -> bool:
+        """Creates the async driver. No I/O happens until the first session."""
+        if self.driver is not None:
+            return True
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                **pool_config(),
+            )
+            return True
+        except Exception:
+            logger.exception("Failed to connect to Neo4j")
+            return False
+
+    async def close(self):
+        """Close the async driver connection."""
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+    @asynccontextmanager
+    async def get_session(self, **config) -> AsyncGenerator[AsyncSession, None]:
+        """Get an async Neo4j session, closing it when the block exits.
+
+        Keyword arguments are passed through as session config (e.g. fetch_size).
+        """
+        if self.driver is None:
             self.connect()
 
-        
+        session = self.driver.session(**session_config(**config))
         try:
-            session = self.driver.session()
-            yield session
-        except exceptions.SessionExpired:
-            print("Session expired, attempting to reconnect...")
-            if self.reconnect():
-                session = self.driver.session()
-                yield session
-            else:
-                raise Exception("Failed to reconnect to Neo4j after session expiration.")
-        
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            raise
+            yield AsyncTrackedSession(session)
         finally:
-            if session:
-                session.close()
\ No newline at end of file
+            await session.close()
+
+    async def execute_read(
+        self, work: Callable[..., Awaitable[T]], *args, timeout: Optional[float] = None, **kwargs
+    ) -> T:
+        """Run work(tx, *args, **kwargs) in a managed read transaction, retried on transient errors.
+
+        The work function may run more than once, so it must consume its
+        results inside the transaction and keep side effects out of it.
+        """
+        async with self.get_session() as session:
+            return await session.execute_read(self._transaction_function(work, timeout), *args, **kwargs)
+
+    async def execute_write(
+        self, work: Callable[..., Awaitable[T]], *args, timeout: Optional[float] = None, **kwargs
+    ) -> T:
+        """Run work(tx, *args, **kwargs) in a managed write transaction, retried on transient errors."""
+        async with self.get_session() as session:
+            return await session.execute_write(self._transaction_function(work, timeout), *args, **kwargs)
+
+    async def execute_analytics(
+        self, work: Callable[..., Awaitable[T]], *args, timeout: Optional[float] = None, **kwargs
+    ) -> T:
+        """Run a read-only aggregate where NEO4J_ANALYTICS_ACCESS routes it (replicas by default)."""
+        if analytics_access_mode() == WRITE_ACCESS:
+            return await self.execute_write(work, *args, timeout=timeout, **kwargs)
+        return await self.execute_read(work, *args, timeout=timeout, **kwargs)
+
+    @staticmethod
+    def _transaction_function(work: Callable[..., Awaitable[T]], timeout: Optional[float]) -> Callable[..., Awaitable[T]]:
+        @unit_of_work(timeout=_transaction_timeout(timeout))
+        async def run(tx, *args, **kwargs):
+            return await work(AsyncTrackedSession(tx), *args, **kwargs)
+        return run
+
+
+# Process-wide connections shared by every service module. The drivers (and
+# their connection pools) are opened by the FastAPI lifespan hook in app.main
+# and closed on shutdown; scripts and tests fall back to connecting on first use.
+db = Neo4jConnection(lazy=True)
+async_db = AsyncNeo4jConnection()
+
+
+def init_db() -> bool:
+    """Open the shared drivers."""
+    return db.connect() and async_db.connect()
+
+
+async def close_db():
+    """Close the shared drivers and release their pooled connections."""
+    db.close()
+    await async_db.close()
@@ -0,0 +1,242 @@
+"""
+Registry of the static Cypher statements the services run.
+
+Neo4j caches query plans by statement text, so every distinct string costs a
+planning pass. Registered statements are fixed and fully parameterized; the
+sessions handed out by app.db.connection record every executed text here, which
+gives the query text reuse ratio (executions that repeat an already-seen text)
+and flags ad-hoc strings that slip past the registry. The ratio is measured on
+this worker only: it bounds what the server's plan cache can reuse but is not
+its hit rate, which Neo4j reports in its own metrics (cypher.cache.*).
+
+They also time every statement by its registered name: the results they
+return report duration, rows and the server's result_available_after /
+result_consumed_after to app.monitoring.metrics once consumed.
+"""
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+from app.monitoring.metrics import CYPHER_ERRORS, observe_statement
+
+
+class QueryRegistry:
+    def __init__(self):
+        self._statements: Dict[str, str] = {}
+        self._names_by_text: Dict[str, str] = {}
+        self._executions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, text: str) -> str:
+        """Register a statement under a unique name and return its text."""
+        if name in self._statements and self._statements[name] != text:
+            raise ValueError(f"Query {name} is already registered with different text")
+        self._statements[name] = text
+        self._names_by_text[text] = name
+        return text
+
+    def __getitem__(self, name: str) -> str:
+        return self._statements[name]
+
+    def name_of(self, text) -> str:
+        """Registered name of a statement text, "unregistered" for ad-hoc ones."""
+        return self._names_by_text.get(str(text), "unregistered")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def names(self):
+        return sorted(self._statements)
+
+    def record(self, text) -> None:
+        """Count one execution of a statement text."""
+        with self._lock:
+            self._executions[str(text)] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._executions.clear()
+
+    def stats(self) -> dict:
+        """
+        Execution counts per registered statement plus how often texts repeat:
+        every distinct text needs planning once, every repeat can reuse that plan.
+        """
+        with self._lock:
+            executions = dict(self._executions)
+
+        total = sum(executions.values())
+        distinct = len(executions)
+        unregistered = [text for text in executions if text not in self._names_by_text]
+        return {
+            "registered": len(self._statements),
+            "executions": total,
+            "distinct_texts": distinct,
+            "unregistered_texts": len(unregistered),
+            "query_text_reuse_ratio": (total - distinct) / total if total else None,
+            "by_statement": {
+                self._names_by_text[text]: count
+                for text, count in executions.items()
+                if text in self._names_by_text
+            },
+        }
+
+
+query_registry = QueryRegistry()
+
+
+def register_query(name: str, text: str) -> str:
+    return query_registry.register(name, text)
+
+
+class _ResultTiming:
+    """Times one statement from run() until its result is consumed, once."""
+
+    def __init__(self, query):
+        self.statement = query_registry.name_of(query)
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.done = False
+
+    def finish(self, summary=None):
+        if not self.done:
+            self.done = True
+            observe_statement(self.statement, time.perf_counter() - self.start, self.rows, summary)
+
+    def fail(self):
+        if not self.done:
+            self.done = True
+            CYPHER_ERRORS.inc(self.statement)
+
+
+class TrackedResult:
+    """Forwards to a sync Result, reporting its timing once it is consumed."""
+
+    def __init__(self, result, timing: _ResultTiming):
+        self._result = result
+        self._timing = timing
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        try:
+            for record in self._result:
+                self._timing.rows += 1
+                yield record
+        except Exception:
+            self._timing.fail()
+            raise
+        if hasattr(self._result, "consume"):
+            self.consume()
+        else:
+            self._timing.finish()
+
+    def _finish_after(self, value, rows: int):
+        self._timing.rows += rows
+        self.consume()
+        return value
+
+    def single(self, *args, **kwargs):
+        record = self._result.single(*args, **kwargs)
+        return self._finish_after(record, 1 if record is not None else 0)
+
+    def data(self, *args, **kwargs):
+        records = self._result.data(*args, **kwargs)
+        return self._finish_after(records, len(records))
+
+    def consume(self):
+        try:
+            summary = self._result.consume()
+        except Exception:
+            self._timing.fail()
+            raise
+        self._timing.finish(summary)
+        return summary
+
+
+class AsyncTrackedResult:
+    """Forwards to an async Result, reporting its timing once it is consumed."""
+
+    def __init__(self, result, timing: _ResultTiming):
+        self._result = result
+        self._timing = timing
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    async def __aiter__(self):
+        try:
+            async for record in self._result:
+                self._timing.rows += 1
+                yield record
+        except Exception:
+            self._timing.fail()
+            raise
+        if hasattr(self._result, "consume"):
+            await self.consume()
+        else:
+            self._timing.finish()
+
+    async def _finish_after(self, value, rows: int):
+        self._timing.rows += rows
+        await self.consume()
+        return value
+
+    async def single(self, *args, **kwargs):
+        record = await self._result.single(*args, **kwargs)
+        return await self._finish_after(record, 1 if record is not None else 0)
+
+    async def data(self, *args, **kwargs):
+        records = await self._result.data(*args, **kwargs)
+        return await self._finish_after(records, len(records))
+
+    async def consume(self):
+        try:
+            summary = await self._result.consume()
+        except Exception:
+            self._timing.fail()
+            raise
+        self._timing.finish(summary)
+        return summary
+
+
+class TrackedSession:
+    """Forwards to a sync session or transaction, recording each statement it runs."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def run(self, query, *args, **kwargs):
+        query_registry.record(query)
+        timing = _ResultTiming(query)
+        try:
+            result = self._session.run(query, *args, **kwargs)
+        except Exception:
+            timing.fail()
+            raise
+        return TrackedResult(result, timing)
+
+
+class AsyncTrackedSession:
+    """Forwards to an async session or transaction, recording each statement it runs."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def run(self, query, *args, **kwargs):
+        query_registry.record(query)
+        timing = _ResultTiming(query)
+        try:
+            result = await self._session.run(query, *args, **kwargs)
+        except Exception:
+            timing.fail()
+            raise
+        return AsyncTrackedResult(result, timing)
@@ -0,0 +1,133 @@
+"""
+Idempotent Neo4j schema bootstrap: uniqueness constraints and indexes for
+every property the services look nodes up by.
+
+Run it once per deploy, before starting the workers:
+
+    python -m app.db.schema           # create whatever is missing
+    python -m app.db.schema --check   # only report, exit 1 if anything is missing
+
+NEO4J_APPLY_SCHEMA=true also applies it from the app lifespan, which runs
+the DDL in every worker and holds up startup while Neo4j is unreachable;
+meant for local development.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import Dict, List
+
+from app.db.connection import async_db
+
+logger = logging.getLogger(__name__)
+
+APPLY_SCHEMA_ON_STARTUP = os.getenv("NEO4J_APPLY_SCHEMA", "false").lower() == "true"
+
+# Lucene analyzer of the thought search index (see `SHOW FULLTEXT ANALYZERS`,
+# e.g. "brazilian" for Portuguese stemming). Changing it needs the index dropped.
+FULLTEXT_ANALYZER = os.getenv("NEO4J_FULLTEXT_ANALYZER", "standard-no-stop-words")
+THOUGHT_FULLTEXT_INDEX = "thought_text_fulltext"
+
+# Uniqueness constraints are backed by a range index, so they also serve the
+# equality lookups on these properties.
+CONSTRAINTS: Dict[str, str] = {
+    "user_uid_unique": "CREATE CONSTRAINT user_uid_unique IF NOT EXISTS FOR (u:User) REQUIRE u.uid IS UNIQUE",
+    "thought_id_unique": "CREATE CONSTRAINT thought_id_unique IF NOT EXISTS FOR (t:Thought) REQUIRE t.id IS UNIQUE",
+    "symptom_name_unique": "CREATE CONSTRAINT symptom_name_unique IF NOT EXISTS FOR (s:Symptom) REQUIRE s.name IS UNIQUE",
+    "emotion_name_unique": "CREATE CONSTRAINT emotion_name_unique IF NOT EXISTS FOR (e:Emotion) REQUIRE e.name IS UNIQUE",
+    # One counter per (user, kind, key) for the materialized insight aggregates
+    "user_stat_unique": "CREATE CONSTRAINT user_stat_unique IF NOT EXISTS FOR (s:UserStat) REQUIRE (s.user_id, s.kind, s.key) IS UNIQUE",
+}
+
+INDEXES: Dict[str, str] = {
+    # (t:Thought {user_id: $user_id}) lookups in the insight queries
+    "thought_user_id": "CREATE INDEX thought_user_id IF NOT EXISTS FOR (t:Thought) ON (t.user_id)",
+    # Per-user history ordered or filtered by date
+    "thought_user_timestamp": "CREATE INDEX thought_user_timestamp IF NOT EXISTS FOR (t:Thought) ON (t.user_id, t.timestamp)",
+    "thought_timestamp": "CREATE INDEX thought_timestamp IF NOT EXISTS FOR (t:Thought) ON (t.timestamp)",
+    "user_stat_user_id": "CREATE INDEX user_stat_user_id IF NOT EXISTS FOR (s:UserStat) ON (s.user_id)",
+    # Journal search; user_id is indexed too so Lucene itself scopes hits to one user
+    THOUGHT_FULLTEXT_INDEX: (
+        f"CREATE FULLTEXT INDEX {THOUGHT_FULLTEXT_INDEX} IF NOT EXISTS FOR (t:Thought) "
+        "ON EACH [t.title, t.situation_description, t.underlying_belief, t.user_id] "
+        f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+    ),
+}
+
+
+def schema_statements() -> Dict[str, str]:
+    return {**CONSTRAINTS, **INDEXES}
+
+
+async def existing_schema_names(session) -> set:
+    names = set()
+    for statement in ("SHOW CONSTRAINTS YIELD name", "SHOW INDEXES YIELD name"):
+        result = await session.run(statement)
+        names.update([record["name"] async for record in result])
+    return names
+
+
+async def missing_schema() -> List[str]:
+    """Names of the constraints/indexes that are not in the database yet."""
+    async with async_db.get_session() as session:
+        existing = await existing_schema_names(session)
+    return [name for name in schema_statements() if name not in existing]
+
+
+async def ensure_schema() -> Dict[str, List[str]]:
+    """
+    Create every missing constraint and index. Failures (e.g. duplicate
+    values blocking a uniqueness constraint) are logged and reported, not raised.
+    """
+    report = {"created": [], "failed": []}
+    statements = schema_statements()
+
+    async with async_db.get_session() as session:
+        existing = await existing_schema_names(session)
+        for name, statement in statements.items():
+            if name in existing:
+                continue
+            try:
+                result = await session.run(statement)
+                await result.consume()
+                report["created"].append(name)
+            except Exception:
+                logger.exception("Failed to create schema item %s", name)
+                report["failed"].append(name)
+
+    if report["created"]:
+        logger.info("Created Neo4j schema items: %s", ", ".join(report["created"]))
+    if report["failed"]:
+        logger.warning("Missing Neo4j schema items: %s", ", ".join(report["failed"]))
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create or check the Neo4j constraints and indexes.")
+    parser.add_argument("--check", action="store_true", help="only report missing items")
+    args = parser.parse_args(argv)
+
+    async def run():
+        try:
+            if args.check:
+                missing = await missing_schema()
+                for name in missing:
+                    print(f"missing: {name}")
+                return 1 if missing else 0
+
+            report = await ensure_schema()
+            for name in report["created"]:
+                print(f"created: {name}")
+            for name in report["failed"]:
+                print(f"failed: {name}")
+            return 1 if report["failed"] else 0
+        finally:
+            await async_db.close()
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,31 +1,95 @@
-import asyncio
-from fastapi import Request, HTTPException, Security, Depends
-from firebase_admin import auth
+import hashlib
+import logging
+import os
+from fastapi import Request, HTTPException, Security
 from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool
+from app.cache.lru_cache import LRUCache
+from app.cache.single_flight import SingleFlight
 from app.models.user import User
-from app.services.user_service import get_user_by_firebase_uid, create_user
+from app.monitoring.metrics import AUTH_CACHE_REQUESTS
+from app.services.token_verifier import token_verifier
+from app.services.user_service import get_user_by_firebase_uid_async, create_user_async
 
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "300"))
+
+# Decoded claims of already-verified tokens, keyed by the token's hash and
+# dropped once the token expires.
+token_cache: LRUCache[dict] = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+# User profiles by uid, so repeat requests skip the Neo4j lookup.
+user_cache: LRUCache[User] = LRUCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+# Concurrent first requests for the same token/uid share one verification and
+# one lookup-or-MERGE instead of racing each other.
+_verifications = SingleFlight()
+_provisioning = SingleFlight()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def verify_token_cached(token: str) -> dict:
+    """
+    Verify a Firebase ID token, reusing the result until the token's exp.
+    A blocking verifier (firebase_admin may fetch certs) runs in the
+    threadpool rather than on the event loop.
+    """
+    key = _token_key(token)
+    decoded_token = token_cache.get(key)
+    if decoded_token is not None:
+        AUTH_CACHE_REQUESTS.inc("token", "hit")
+        return decoded_token
+    AUTH_CACHE_REQUESTS.inc("token", "miss")
+
+    async def verify():
+        if token_verifier.blocking:
+            decoded = await run_in_threadpool(token_verifier.verify, token)
+        else:
+            decoded = token_verifier.verify(token)
+        token_cache.set(key, decoded, expires_at=decoded.get("exp"))
+        return decoded
+
+    return await _verifications.do(key, verify)
+
+
+async def _provision_user(decoded_token: dict) -> User:
+    uid = decoded_token["uid"]
+    user = await get_user_by_firebase_uid_async(uid)  # Aqui que deve ser mockado
+
+    if not user:
+        user = await create_user_async(User(uid=uid, email=decoded_token.get("email"), name=decoded_token.get("name", ""), photo_url=decoded_token.get("picture", "")))
+        logger.info("Provisioned new user", extra={"uid": uid})
+
+    if user:
+        user_cache.set(uid, user)
+    return user
+
+
+async def get_or_create_user(decoded_token: dict) -> User:
+    uid = decoded_token["uid"]
+    user = user_cache.get(uid)
+    if user is not None:
+        AUTH_CACHE_REQUESTS.inc("user", "hit")
+        return user
+    AUTH_CACHE_REQUESTS.inc("user", "miss")
+    return await _provisioning.do(uid, lambda: _provision_user(decoded_token))
+
+
 async def get_current_user(request: Request, token: str = Security(security)):
-    
+
     try:
-        
-        decoded_token = auth.verify_id_token(token.credentials)
-    
-        uid = decoded_token["uid"]
-
-        
-        user = get_user_by_firebase_uid(uid)  # Aqui que deve ser mockado
-        
-
-        if not user:
-            print("❌ Nenhum usuário encontrado. Criando novo...")
-            user = create_user(User(uid=uid, email=decoded_token.get("email"), name=decoded_token.get("name", ""), photo_url=decoded_token.get("picture", "")))
-            print(f"✅ Usuário criado: {user}")
-        return user
+        decoded_token = await verify_token_cached(token.credentials)
+        return await get_or_create_user(decoded_token)
 
     except Exception as e:
-        print(f"⚠️ Erro em get_current_user: {str(e)}")
+        # Expired or forged tokens are routine; no traceback needed
+        logger.info("Authentication failed: %s", e)
         raise HTTPException(status_code=401, detail="Invalid or expired token")
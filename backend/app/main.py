@@ -1,20 +1,66 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import emotions
 from app.routes import symptoms
 from app.routes import auth
 from app.routes import thoughts
+from app.routes import metrics
 from app.config import firebase_config  # Import Firebase config to initialize the SDK
+from app.cache.response_cache import response_cache
+from app.config.logging_config import configure_logging, shutdown_logging
+from app.db.connection import init_db, close_db
+from app.db.queries import query_registry
+from app.db.schema import APPLY_SCHEMA_ON_STARTUP, ensure_schema
+from app.monitoring.metrics import METRICS_ENABLED, METRICS_TOKEN
+from app.monitoring.middleware import LatencyMiddleware, RequestIdMiddleware
+from app.services.token_verifier import token_verifier
 
-app = FastAPI(redirect_slashes=False)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if METRICS_ENABLED and not METRICS_TOKEN:
+        logger.warning("METRICS_TOKEN is not set, so GET /metrics is not served")
+    # One pooled Neo4j driver per worker, shared by every service module
+    init_db()
+    if APPLY_SCHEMA_ON_STARTUP:
+        try:
+            await ensure_schema()
+        except Exception:
+            # An unreachable database shouldn't keep the API from starting
+            logger.exception("Could not verify the Neo4j schema on startup")
+    # Loads the token signing keys and keeps them refreshed in the background
+    await token_verifier.start()
+    yield
+    await token_verifier.stop()
+    await response_cache.close()
+    stats = query_registry.stats()
+    logger.info(
+        "Cypher statements: %d executions, %d distinct texts (%d unregistered), query text reuse ratio %s",
+        stats["executions"], stats["distinct_texts"], stats["unregistered_texts"], stats["query_text_reuse_ratio"]
+    )
+    await close_db()
+    shutdown_logging()
+
+
+app = FastAPI(redirect_slashes=False, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["GET", "POST"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID"]
 )
+app.add_middleware(RequestIdMiddleware)
+# Added last so it is outermost and times the whole stack, CORS and request ids included
+if METRICS_ENABLED:
+    app.add_middleware(LatencyMiddleware)
 
 @app.get("/")
 def read_root():
@@ -25,3 +71,6 @@ app.include_router(emotions.router, prefix="/emotions")
 app.include_router(symptoms.router, prefix="/symptoms")
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(thoughts.router, prefix="/thought-records")
+# Scrapes are authenticated; the app is public
+if METRICS_ENABLED and METRICS_TOKEN:
+    app.include_router(metrics.router)
@@ -20,3 +20,20 @@ class ThoughtCreate(BaseModel):
     emotion: str
     underlying_belief: str
     symptoms: List[str]
+
+
+class ThoughtImport(BaseModel):
+    """One entry of a bulk import; the timestamp defaults to the import time."""
+    timestamp: Optional[datetime] = None
+    title: Optional[str] = None
+    situation_description: Optional[str] = None
+    emotion: str
+    underlying_belief: Optional[str] = None
+    symptoms: List[str] = []
+
+
+class ThoughtSearchHit(BaseModel):
+    """A search result: the thought, its relevance and <mark>-highlighted snippets per field."""
+    thought: Thought
+    score: float
+    highlights: Dict[str, str] = {}
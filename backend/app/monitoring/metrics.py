@@ -0,0 +1,227 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters and histograms are keyed by label values and guarded by one lock
+each; `render()` writes every registered metric in the text format scraped
+from GET /metrics, which requires `Authorization: Bearer $METRICS_TOKEN`.
+Each worker process keeps its own values, so scrape every worker (or run one
+per pod).
+"""
+import math
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+# Disables the latency middleware and GET /metrics (statement timing stays cheap)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Bearer token scrapers must send to GET /metrics; without one it is not served
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: [non-cumulative bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[-1] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: list(series) for key, series in self._values.items()}
+        lines = []
+        for key, series in sorted(values.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets, series):
+                cumulative += observed
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency, labelled by route template so ids in paths don't explode the series
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response is fully sent.",
+    ("method", "route", "status"),
+)
+
+# Client-side time per statement, from run() until its result is consumed
+CYPHER_DURATION = metrics_registry.histogram(
+    "cypher_statement_duration_seconds",
+    "Time from running a Cypher statement until its result is consumed.",
+    ("statement",),
+)
+CYPHER_AVAILABLE_AFTER = metrics_registry.histogram(
+    "cypher_result_available_after_seconds",
+    "Server-reported time until the first record was available.",
+    ("statement",),
+)
+CYPHER_CONSUMED_AFTER = metrics_registry.histogram(
+    "cypher_result_consumed_after_seconds",
+    "Server-reported time to stream every record after the first was available.",
+    ("statement",),
+)
+CYPHER_ROWS = metrics_registry.counter(
+    "cypher_statement_rows_total",
+    "Records returned per Cypher statement.",
+    ("statement",),
+)
+CYPHER_ERRORS = metrics_registry.counter(
+    "cypher_statement_errors_total",
+    "Cypher statements that raised while running or streaming.",
+    ("statement",),
+)
+
+# Verified-token and user-profile caches of app.dependencies.auth_dependency;
+# cache is "token" or "user", result is "hit" or "miss"
+AUTH_CACHE_REQUESTS = metrics_registry.counter(
+    "auth_cache_requests_total",
+    "Authentication cache lookups by cache and result.",
+    ("cache", "result"),
+)
+
+# Per-user analytics responses (app.cache.response_cache); result is "hit" or "miss"
+RESPONSE_CACHE_REQUESTS = metrics_registry.counter(
+    "response_cache_requests_total",
+    "Cached analytics endpoint lookups by result.",
+    ("endpoint", "result"),
+)
+
+
+def _observe_server_time(histogram: Histogram, milliseconds, statement: str) -> None:
+    # Servers that don't report a timing leave it None
+    if isinstance(milliseconds, (int, float)):
+        histogram.observe(milliseconds / 1000, statement)
+
+
+def observe_statement(statement: str, duration: float, rows: int, summary=None) -> None:
+    """Record one consumed statement; `summary` is its neo4j ResultSummary, if any."""
+    CYPHER_DURATION.observe(duration, statement)
+    CYPHER_ROWS.inc(statement, amount=rows)
+    if summary is not None:
+        _observe_server_time(CYPHER_AVAILABLE_AFTER, getattr(summary, "result_available_after", None), statement)
+        _observe_server_time(CYPHER_CONSUMED_AFTER, getattr(summary, "result_consumed_after", None), statement)
@@ -0,0 +1,78 @@
+import re
+import time
+import uuid
+
+from app.config.logging_config import request_id_var
+from app.monitoring.metrics import HTTP_REQUEST_DURATION
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Client-supplied ids are reused only if they look like ids, not arbitrary text
+_VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,128}$")
+
+
+class LatencyMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request into
+    http_request_duration_seconds. Streaming responses are timed until the
+    last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
+
+
+class RequestIdMiddleware:
+    """
+    Tag each request with an id (the caller's X-Request-ID, or a new one),
+    visible to every log record emitted while handling it and echoed back in
+    the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"")
+        request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex.encode("ascii")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (REQUEST_ID_HEADER, request_id)]
+            await send(message)
+
+        token = request_id_var.set(request_id.decode("ascii"))
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,26 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, Security
 from typing import List, Optional, Dict, Any
-from app.db.connection import Neo4jConnection
 from app.models.emotion import Emotion
 from app.dependencies.auth_dependency import get_current_user
-from app.services.emotion_service import add_emotion, get_all_emotions_from_db, get_emotion_frequency
+from app.cache.response_cache import EMOTIONS_FREQUENCY, response_cache
+from app.services.emotion_service import add_emotion_async, get_all_emotions as get_cached_emotions, get_emotion_frequency_async
 
 router = APIRouter()
 
-db = Neo4jConnection()
-
 @router.post("/")
 async def add_emotion_endpoint(emotion: Emotion):
     try:
         # Calling the service to add the emotion
-        result = add_emotion(emotion.name, emotion.description)
+        result = await add_emotion_async(emotion.name, emotion.description)
         return {"message": "Emotion added successfully", "emotion": result.model_dump()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/")
-def get_all_emotions():
-    emotions = get_all_emotions_from_db()
+async def get_all_emotions():
+    emotions = await get_cached_emotions()
     return {"emotions": [emotion.model_dump() for emotion in emotions]}
 
 
@@ -35,7 +33,9 @@ async def get_emotion_insights_summary_handler(
         Example: [{"emotion": "happy", "count": 5}, ...]
     """
     try:
-        emotions_data = get_emotion_frequency(current_user.uid)
+        emotions_data = await response_cache.get_or_load(
+            current_user.uid, EMOTIONS_FREQUENCY, lambda: get_emotion_frequency_async(current_user.uid)
+        )
         if not emotions_data:
             return {
                 "status": "success",
@@ -0,0 +1,24 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from app.monitoring import metrics
+from app.monitoring.metrics import CONTENT_TYPE, metrics_registry
+
+router = APIRouter(tags=["monitoring"])
+
+
+def _authorized(authorization: Optional[str]) -> bool:
+    scheme, _, token = (authorization or "").partition(" ")
+    return (
+        bool(metrics.METRICS_TOKEN)
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(token.encode(), metrics.METRICS_TOKEN.encode())
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics_handler(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint: request latency and per-statement Cypher timings."""
+    if not _authorized(authorization):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, Security
-from app.db.connection import Neo4jConnection
+from fastapi import APIRouter, HTTPException, Request, Response, Security
+from fastapi.responses import JSONResponse
 from app.models.symptom import Symptom
-from app.services.symptom_service import add_symptom, get_all_symptoms_from_db
+from app.services.symptom_service import add_symptom_async, get_symptom_catalog
 from app.dependencies.auth_dependency import get_current_user
-from app.services.symptom_service import get_symptom_time_patterns
+from app.cache.response_cache import SYMPTOMS_TIME_PATTERNS, response_cache
+from app.services.symptom_service import get_symptom_time_patterns_async
 
 router = APIRouter()
 
@@ -11,16 +12,33 @@ router = APIRouter()
 async def add_symptom_endpoint(symptom: Symptom):
     try:
 
-        result = add_symptom(symptom.name, symptom.description)
+        result = await add_symptom_async(symptom.name, symptom.description)
         return {"message": "Symptom added successfully", "symptom": result.model_dump()}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
     
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
 @router.get("/")
-def get_all_symptoms():
-    symptoms=get_all_symptoms_from_db()
-    return {"symptoms": [symptom.model_dump() for symptom in symptoms]}
+async def get_all_symptoms(request: Request):
+    symptoms, version = await get_symptom_catalog()
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+
+    # Clients send back the ETag to skip re-downloading an unchanged catalog
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(
+        {"symptoms": [symptom.model_dump() for symptom in symptoms]},
+        headers=headers
+    )
 
 @router.get("/symptoms-time-patterns")
 async def get_symptoms_time_patterns_handler(
@@ -32,7 +50,9 @@ async def get_symptoms_time_patterns_handler(
     - Thought -> Symptom (existent relationship)
     """
     try:
-        patterns_data = get_symptom_time_patterns(current_user.uid)
+        patterns_data = await response_cache.get_or_load(
+            current_user.uid, SYMPTOMS_TIME_PATTERNS, lambda: get_symptom_time_patterns_async(current_user.uid)
+        )
 
         if not patterns_data:
             return{
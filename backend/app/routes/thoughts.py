@@ -1,33 +1,59 @@
+import csv
+import io
+import json
+import os
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Query, Security
-from app.models.thought import Thought, ThoughtCreate
+from typing import AsyncIterator, List, Literal, Optional, Dict, Any, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Security
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models.thought import Thought, ThoughtCreate, ThoughtSearchHit
 from app.services.thought_service import (
-    create_thought,
-    get_user_thoughts,
-    get_thought_patterns,
-    update_thought,
-    delete_thought,
-    get_insights_summary
+    create_thought_async,
+    import_thoughts_async,
+    get_user_thoughts_async,
+    get_thought_patterns_async,
+    update_thought_async,
+    delete_thought_async,
+    get_insights_summary_async,
+    search_thoughts_async,
+    stream_user_thoughts,
+    encode_cursor,
+    parse_fields,
+    unknown_symptoms
 )
 from app.dependencies.auth_dependency import get_current_user
-from app.services.emotion_service import get_all_emotions_from_db
+from app.cache.response_cache import INSIGHTS_SUMMARY, THOUGHT_PATTERNS, response_cache
+from app.services.emotion_service import get_emotion_index, is_valid_emotion
+from app.services.symptom_service import get_symptom_names
+from app.services.search_service import decode_search_cursor, encode_search_cursor
 
 router = APIRouter(
     tags=["thought-records"],
 )
 
+MAX_PAGE_SIZE = 200
+MAX_SEARCH_QUERY_LENGTH = 200
+MAX_IMPORT_ITEMS = int(os.getenv("THOUGHT_IMPORT_MAX_ITEMS", "50000"))
+# A JSON array is parsed whole, so its size is capped before it is read
+MAX_IMPORT_ITEM_BYTES = int(os.getenv("THOUGHT_IMPORT_MAX_ITEM_BYTES", "8192"))
+MAX_IMPORT_BYTES = MAX_IMPORT_ITEMS * MAX_IMPORT_ITEM_BYTES
+
+EXPORT_CSV_COLUMNS = [
+    "id", "timestamp", "title", "situation_description",
+    "emotion", "underlying_belief", "symptoms"
+]
+
 @router.post("/", response_model=Thought)
 async def create_thought_handler(
     record: ThoughtCreate,
     current_user = Security(get_current_user)
 ):
     try:
-        
-        emotions = get_all_emotions_from_db()
-
-        if record.emotion not in [emotion.name for emotion in emotions]:
-            raise HTTPException(status_code=40, detail="Invalid emotion provided")
+        if not await is_valid_emotion(record.emotion):
+            raise HTTPException(status_code=400, detail="Invalid emotion provided")
+        unknown = unknown_symptoms(record.symptoms or [], await get_symptom_names())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown symptoms: {', '.join(unknown)}")
         
         full_record = Thought(
             id="",  # vai ser gerado no banco
@@ -39,34 +65,216 @@ async def create_thought_handler(
             underlying_belief=record.underlying_belief,
             symptoms=record.symptoms,
         )
-        return create_thought(current_user.uid, full_record)
+        return await create_thought_async(current_user.uid, full_record)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+async def _upload_lines(request: Request) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+async def _ndjson_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, item) per non-blank line as the upload streams in."""
+    index = 0
+    async for line in _upload_lines(request):
+        if index >= MAX_IMPORT_ITEMS:
+            yield index, ValueError(f"Import is limited to {MAX_IMPORT_ITEMS} items; the rest was ignored")
+            return
+        yield index, _parse_json_line(line)
+        index += 1
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, or 413 as soon as it is known to exceed `limit` bytes."""
+    too_large = HTTPException(status_code=413, detail=f"Import body is limited to {limit} bytes")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise too_large
+    # Content-Length may be absent (chunked uploads) or wrong, so count as well
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+async def _json_array_items(items: List[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    for index, item in enumerate(items):
+        yield index, item
+
+@router.post("/bulk", response_model=Dict[str, Any])
+async def import_thoughts_handler(
+    request: Request,
+    current_user = Security(get_current_user)
+):
+    """
+    Import many thoughts at once from a JSON array or an NDJSON upload
+    (Content-Type: application/x-ndjson). Each item is validated on its own;
+    the response lists the failed ones by index.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = _ndjson_items(request)
+    else:
+        try:
+            payload = json.loads(await _read_body(request, MAX_IMPORT_BYTES))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if len(payload) > MAX_IMPORT_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Import is limited to {MAX_IMPORT_ITEMS} items")
+        items = _json_array_items(payload)
+
+    try:
+        emotions = frozenset(await get_emotion_index())
+        symptoms = await get_symptom_names()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Once batches start committing, failures are reported per item
+    return await import_thoughts_async(current_user.uid, items, emotions, symptoms)
 
 @router.get("/", response_model=List[Thought])
 async def get_thoughts_handler(
+    response: Response,
     start_date: Optional[datetime] = Query(None, description="Start date for filtering records"),
     end_date: Optional[datetime] = Query(None, description="End date for filtering records"),
     emotion: Optional[str] = Query(None, description="Filter by emotion type"),
-    symptom: Optional[str] = Query(None, description="Filter by symptom"),
+    symptom: Optional[List[str]] = Query(None, description="Filter by symptom; repeat for several"),
+    symptom_match: Literal["any", "all"] = Query("any", description="With several symptoms: match any or all of them"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to get every record"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated optional fields to return, e.g. title,symptoms"),
     current_user = Security(get_current_user)
 ):
     try:
-        
-        return get_user_thoughts(
+        projection = parse_fields(fields)
+        thoughts = await get_user_thoughts_async(
             user_id=current_user.uid,
             start_date=start_date,
             end_date=end_date,
             emotion=emotion,
-            symptom=symptom
+            symptoms=symptom,
+            limit=limit,
+            cursor=cursor,
+            fields=projection,
+            symptom_match=symptom_match
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # A full page means there may be more; the client passes this back as `cursor`
+    headers = {}
+    if limit and len(thoughts) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(thoughts[-1])
+
+    if projection is not None:
+        include = {"id", "user_id", "timestamp", "emotion", *projection}
+        return JSONResponse(
+            [thought.model_dump(mode="json", include=include) for thought in thoughts],
+            headers=headers
+        )
+    response.headers.update(headers)
+    return thoughts
+
+@router.get("/search", response_model=List[ThoughtSearchHit])
+async def search_thoughts_handler(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH, description="Words to look for"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    current_user = Security(get_current_user)
+):
+    """
+    Search the user's titles, situations and beliefs, best matches first.
+    Each hit carries its relevance score and HTML-escaped snippets with the
+    matched words wrapped in <mark>.
+    """
+    try:
+        offset = decode_search_cursor(cursor) if cursor else 0
+        hits, next_offset = await search_thoughts_async(current_user.uid, q, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if next_offset is not None:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(next_offset)
+    return hits
+
+async def _ndjson_lines(thoughts: AsyncIterator[Thought]) -> AsyncIterator[str]:
+    async for thought in thoughts:
+        yield thought.model_dump_json(exclude={"analysis"}) + "\n"
+
+async def _csv_lines(thoughts: AsyncIterator[Thought]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    yield flush()
+    async for thought in thoughts:
+        writer.writerow([
+            thought.id,
+            thought.timestamp.isoformat(),
+            thought.title,
+            thought.situation_description,
+            thought.emotion,
+            thought.underlying_belief,
+            ";".join(thought.symptoms or []),
+        ])
+        yield flush()
+
+@router.get("/export")
+async def export_thoughts_handler(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Export format"),
+    start_date: Optional[datetime] = Query(None, description="Start date for filtering records"),
+    end_date: Optional[datetime] = Query(None, description="End date for filtering records"),
+    current_user = Security(get_current_user)
+):
+    """
+    Stream the user's full history without building it in memory.
+    """
+    thoughts = stream_user_thoughts(current_user.uid, start_date=start_date, end_date=end_date)
+
+    if format == "csv":
+        body, media_type = _csv_lines(thoughts), "text/csv"
+    else:
+        body, media_type = _ndjson_lines(thoughts), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="thought-records.{format}"'}
+    )
+
 @router.get("/patterns", response_model=List[dict])
 async def get_patterns_handler(current_user = Security(get_current_user)):
     try:
-        return get_thought_patterns(current_user.uid)
+        return await response_cache.get_or_load(
+            current_user.uid, THOUGHT_PATTERNS, lambda: get_thought_patterns_async(current_user.uid)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,19 +285,13 @@ async def update_thoughts_handler(
     current_user = Security(get_current_user)
 ):
     try:
-        emotions = get_all_emotions_from_db()
-
         # Validação de emoção
-        if record.emotion not in [emotion.name for emotion in emotions]:
+        if not await is_valid_emotion(record.emotion):
             raise HTTPException(status_code=400, detail="Invalid emotion provided")
+        unknown = unknown_symptoms(record.symptoms or [], await get_symptom_names())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown symptoms: {', '.join(unknown)}")
 
-        # Verificação se o pensamento pertence ao usuário
-        records = get_user_thoughts(user_id=current_user.uid)
-        record_ids = [r.id for r in records]
-
-        if record_id not in record_ids:
-            raise HTTPException(status_code=404, detail="Record not found")
-        
         # Montagem do dicionário de atualizações
         updates = {
             "user_id": current_user.uid,
@@ -101,8 +303,8 @@ async def update_thoughts_handler(
             "symptoms": record.symptoms,
         }
         
-        # Chamada da função de atualização
-        updated_record = update_thought(record_id, updates)
+        # Chamada da função de atualização (só altera registros do próprio usuário)
+        updated_record = await update_thought_async(current_user.uid, record_id, updates)
         if not updated_record:
             raise HTTPException(status_code=404, detail="Record not found")
         
@@ -119,13 +321,7 @@ async def delete_thoughts_handler(
     current_user = Security(get_current_user)
 ):
     try:
-        records = get_user_thoughts(user_id=current_user.uid)
-        record_ids = [r.id for r in records]
-
-        if record_id not in record_ids:
-            raise HTTPException(status_code=404, detail="Record not found")
-
-        success = delete_thought(record_id)
+        success = await delete_thought_async(current_user.uid, record_id)
         if not success:
             raise HTTPException(status_code=404, detail="Record not found")
         return {"message": "Record deleted successfully"}
@@ -139,7 +335,9 @@ async def get_insights_summary_handler(
     current_user = Security(get_current_user)
     ):
     try:
-        insights = get_insights_summary(current_user.uid)
+        insights = await response_cache.get_or_load(
+            current_user.uid, INSIGHTS_SUMMARY, lambda: get_insights_summary_async(current_user.uid)
+        )
         return insights
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
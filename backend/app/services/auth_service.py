@@ -1,25 +1,24 @@
-from firebase_admin import auth
 from fastapi import HTTPException, status
-from backend.app.models.user import User
+from app.models.user import User
+from app.services.token_verifier import token_verifier
 
 def verify_token(id_token: str) -> User:
-    
+    """
+    Verify an ID token and build the user from its claims. The profile fields
+    come from the token itself, so no extra call to Firebase is needed.
+    """
     try:
-        decoded_token = auth.verify_id_token(id_token)
-        uid = decoded_token["uid"]
-        user_info = auth.get_user(uid)
+        claims = token_verifier.verify(id_token)
 
         return User(
-            uid=uid,
-            email=user_info.email,
-            name=user_info.display_name,
-            photo_url=user_info.photo_url
+            uid=claims["uid"],
+            email=claims.get("email"),
+            name=claims.get("name"),
+            photo_url=claims.get("picture")
         )
 
-    except Exception as e:
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid authentication credentials"
         )
-    
-    
@@ -1,56 +1,94 @@
+import logging
+import os
 from fastapi import APIRouter
 from app.models.emotion import Emotion
-from app.db.connection import Neo4jConnection
+from app.db.queries import register_query
+from app.db.connection import async_db
+from app.cache.catalog_cache import CatalogCache
+from app.services import stats_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-db = Neo4jConnection()
 
-def add_emotion(name: str, description: str = None) -> Emotion:
+EMOTION_CACHE_TTL = float(os.getenv("EMOTION_CACHE_TTL_SECONDS", "300"))
+
+ADD_EMOTION_QUERY = register_query("emotion.add", """
+CREATE (e:Emotion {id: randomUUID(), name: $name, description: $description})
+RETURN e
+""")
+
+ALL_EMOTIONS_QUERY = register_query("emotion.all", "MATCH (e:Emotion) RETURN e")
+
+
+def _emotion_from_node(emotion_data) -> Emotion:
+    return Emotion(
+        id=emotion_data["id"],
+        name=emotion_data["name"],
+        description=emotion_data.get("description")
+    )
+
+
+async def _add_emotion_tx_async(tx, name: str, description: str):
+    result = await tx.run(ADD_EMOTION_QUERY, name=name, description=description)
+    return await result.single()
+
+
+async def _all_emotions_tx_async(tx) -> list[Emotion]:
+    results = await tx.run(ALL_EMOTIONS_QUERY)
+    return [_emotion_from_node(record["e"]) async for record in results]
+
+
+async def add_emotion_async(name: str, description: str = None) -> Emotion:
     """
     Add a new emotion to the database.
     """
-    query = """
-    CREATE (e:Emotion {id: randomUUID(), name: $name, description: $description})
-    RETURN e
-    """
-    with db.get_session() as session:
-        result = session.run(query, name=name, description=description).single()
-        if result:
-            emotion_data = result["e"]
-            return Emotion(
-                id=emotion_data["id"],
-                name=emotion_data["name"],
-                description=emotion_data.get("description")
-            )
-        return None
+    record = await async_db.execute_write(_add_emotion_tx_async, name, description)
+    invalidate_emotion_cache()
+    if record:
+        return _emotion_from_node(record["e"])
+    return None
 
-def get_all_emotions_from_db() -> list[Emotion]:
+
+async def get_all_emotions_async() -> list[Emotion]:
     """
     Get all emotions from the database.
     """
-    query = "MATCH (e:Emotion) RETURN e"
-    with db.get_session() as session:
-        results = session.run(query)
-        return [
-            Emotion(
-                id=record["e"]["id"],
-                name=record["e"]["name"],
-                description=record["e"].get("description")
-            )
-            for record in results
-        ]
+    return await async_db.execute_read(_all_emotions_tx_async)
+
 
-def get_emotion_frequency(user_id: str) -> list[dict]:
-    query = """
-    MATCH (u:User {uid: $user_id})-[:HAS_RECORD]->(t:Thought)
-    RETURN t.emotion AS emotion, count(t) AS count
-    ORDER BY count DESC
-    LIMIT 5
+_emotion_cache = CatalogCache(get_all_emotions_async, key=lambda emotion: emotion.name, ttl=EMOTION_CACHE_TTL)
+
+
+async def get_emotion_index() -> dict[str, Emotion]:
+    """
+    Get the cached emotion catalog, indexed by name.
+    """
+    return await _emotion_cache.get()
+
+
+async def get_all_emotions() -> list[Emotion]:
     """
+    Get the cached emotion catalog as stored, one entry per Emotion node.
+    """
+    return await _emotion_cache.items()
+
+
+async def is_valid_emotion(name: str) -> bool:
+    return await _emotion_cache.contains(name)
+
+
+def invalidate_emotion_cache():
+    _emotion_cache.invalidate()
+
+
+async def get_emotion_frequency_async(user_id: str) -> list[dict]:
     try:
-        with db.get_session() as session:
-            result = session.run(query, {"user_id": user_id})
-            return [{"emotion": record["emotion"], "count": record["count"]} for record in result]
+        stats = await stats_service.get_user_stats(user_id, kinds=[stats_service.EMOTION])
+        return [
+            {"emotion": emotion, "count": count}
+            for emotion, count in stats_service.top(stats[stats_service.EMOTION], 5)
+        ]
     except Exception as e:
-        print(f"Error fetching emotion frequency: {e}")
-        raise e    
\ No newline at end of file
+        logger.exception("Error fetching emotion frequency")
+        raise e
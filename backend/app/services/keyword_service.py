@@ -0,0 +1,108 @@
+"""
+Write-time keyword extraction for thought text.
+
+Titles and situation descriptions are tokenized once when a thought is
+written; the per-thought term counts are stored on the node (parallel
+`terms`/`term_counts` lists) and folded into the user's keyword counters, so
+keyword insights never re-read the text.
+
+Stopwords are configured with KEYWORD_STOPWORD_LANGUAGES (comma-separated,
+default "pt,en") plus optional KEYWORD_EXTRA_STOPWORDS. Words shorter than
+KEYWORD_MIN_LENGTH are dropped as well.
+"""
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+STOPWORDS: Dict[str, FrozenSet[str]] = {
+    "en": frozenset("""
+        a about above after again against all also am an and any are as at be because been before
+        being below between both but by can could did do does doing down during each even ever
+        every few for from further get got had has have having he her here hers herself him himself
+        his how however i if in into is it its itself just like made make many me might more most
+        much must my myself never no nor not now of off on once only or other our ours ourselves
+        out over own really same say said she should since so some still such than that the their
+        theirs them themselves then there these they thing things this those though through to too
+        under until up upon us very was we well were what when where which while who whom why will
+        with without would yet you your yours yourself yourselves
+    """.split()),
+    "pt": frozenset("""
+        a à agora ainda além algo algum alguma algumas alguns ao aos apenas após aquela aquelas
+        aquele aqueles aquilo as às assim até bem cada coisa coisas com como contra da das de dela
+        delas dele deles depois desde dessa dessas desse desses desta destas deste destes deve do
+        dos e é ela elas ele eles em enquanto entre era eram essa essas esse esses esta está estão
+        estas estava estavam este estes estou eu foi fomos for foram fosse fui há isso isto já la
+        lá lhe lhes lo mais mas me mesma mesmas mesmo mesmos meu meus minha minhas muita muitas
+        muito muitos na nas nem nessa nesse nesta neste no nos nós nossa nossas nosso nossos num
+        numa não o os ou para pela pelas pelo pelos per perante pois por porque porquê portanto
+        pouco qual quais quando quanto que quem se sem sempre ser seu seus sido só sob sobre sua
+        suas também tão te tem têm tendo tenho ter teu teus teve tinha tinham tive toda todas todo
+        todos tu tua tuas tudo um uma umas uns vai vão você vocês vos
+    """.split()),
+}
+
+STOPWORD_LANGUAGES = [
+    language.strip() for language in os.getenv("KEYWORD_STOPWORD_LANGUAGES", "pt,en").split(",") if language.strip()
+]
+EXTRA_STOPWORDS = [word.strip() for word in os.getenv("KEYWORD_EXTRA_STOPWORDS", "").split(",") if word.strip()]
+MIN_KEYWORD_LENGTH = int(os.getenv("KEYWORD_MIN_LENGTH", "4"))
+
+# Letters only (any script): digits, underscores and punctuation split words
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def _normalize(word: str) -> str:
+    return unicodedata.normalize("NFC", word).casefold()
+
+
+def build_stopwords(languages: Iterable[str], extra: Iterable[str] = ()) -> FrozenSet[str]:
+    words = set()
+    for language in languages:
+        if language not in STOPWORDS:
+            raise ValueError(f"No stopword list for language: {language}")
+        words.update(STOPWORDS[language])
+    words.update(extra)
+    return frozenset(_normalize(word) for word in words)
+
+
+_stopwords = build_stopwords(STOPWORD_LANGUAGES, EXTRA_STOPWORDS)
+
+
+def stopwords() -> FrozenSet[str]:
+    """The configured stopwords, normalized."""
+    return _stopwords
+
+
+def is_keyword(word: str, stopwords: Optional[FrozenSet[str]] = None) -> bool:
+    stopwords = _stopwords if stopwords is None else stopwords
+    return len(word) >= MIN_KEYWORD_LENGTH and word not in stopwords
+
+
+def tokenize(text: Optional[str], stopwords: Optional[FrozenSet[str]] = None) -> List[str]:
+    """Normalized keywords of a text, in order, stopwords removed."""
+    if not text:
+        return []
+    # Compose accents first: a combining mark on its own would split the word
+    words = _WORD_RE.findall(_normalize(text))
+    return [word for word in words if is_keyword(word, stopwords)]
+
+
+def term_counts(*texts: Optional[str]) -> Dict[str, int]:
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(tokenize(text))
+    return dict(counts)
+
+
+def thought_terms(title: Optional[str], situation_description: Optional[str]) -> Tuple[List[str], List[int]]:
+    """Term counts of a thought as the parallel lists stored on the node."""
+    counts = term_counts(title, situation_description)
+    terms = sorted(counts)
+    return terms, [counts[term] for term in terms]
+
+
+def stored_term_counts(terms: Optional[List[str]], counts: Optional[List[int]]) -> Dict[str, int]:
+    """Inverse of thought_terms for the lists read back from a node."""
+    return dict(zip(terms or [], counts or []))
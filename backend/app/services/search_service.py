@@ -0,0 +1,109 @@
+"""
+Query building and highlighting for the thought full-text search.
+
+The search box text is reduced to plain word tokens, so nothing a user types
+reaches Lucene as query syntax. The query also requires the owner's user_id
+(one of the index fields) so Lucene mostly returns the user's own thoughts.
+That clause goes through the index analyzer, which may lowercase, split or
+stem the uid, so it only narrows the hits: ownership is checked on the
+property, and cursors count raw index positions.
+"""
+import base64
+import html
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+SEARCH_FIELDS = ("title", "situation_description", "underlying_belief")
+MAX_SEARCH_TERMS = int(os.getenv("THOUGHT_SEARCH_MAX_TERMS", "16"))
+SNIPPET_CHARS = int(os.getenv("THOUGHT_SEARCH_SNIPPET_CHARS", "160"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).casefold()
+
+
+def search_terms(q: str) -> List[str]:
+    """Distinct normalized word tokens of a search string, in order."""
+    terms = dict.fromkeys(_TOKEN_RE.findall(_normalize(q or "")))
+    return list(terms)[:MAX_SEARCH_TERMS]
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def build_fulltext_query(user_id: str, terms: List[str]) -> str:
+    """
+    Lucene query matching any term in the text fields, restricted to the
+    user's thoughts. Thoughts matching more (or rarer) terms score higher.
+    """
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    words = " ".join(terms)
+    fields = " ".join(f"{field}:({words})" for field in SEARCH_FIELDS)
+    return f"+user_id:{_phrase(user_id)} +({fields})"
+
+
+def highlight(text: Optional[str], terms: List[str]) -> Optional[str]:
+    """
+    HTML-escaped snippet of `text` with the matched words wrapped in <mark>,
+    or None when no term occurs. Long texts are cut to SNIPPET_CHARS around
+    the first match.
+    """
+    if not text:
+        return None
+    wanted = set(terms)
+    # NFC keeps offsets stable; only the comparison is case-folded
+    text = unicodedata.normalize("NFC", text)
+    matches = [m for m in _TOKEN_RE.finditer(text) if m.group().casefold() in wanted]
+    if not matches:
+        return None
+
+    start, end = 0, len(text)
+    if len(text) > SNIPPET_CHARS:
+        start = max(0, matches[0].start() - SNIPPET_CHARS // 4)
+        end = min(len(text), start + SNIPPET_CHARS)
+        start = max(0, end - SNIPPET_CHARS)
+
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
+
+
+def highlights(record, terms: List[str]) -> Dict[str, str]:
+    """Snippets for every searched field of a record that contains a term."""
+    snippets = {}
+    for field in SEARCH_FIELDS:
+        snippet = highlight(record.get(field), terms)
+        if snippet is not None:
+            snippets[field] = snippet
+    return snippets
+
+
+def encode_search_cursor(offset: int) -> str:
+    """Opaque cursor for the page of hits starting at `offset`."""
+    payload = json.dumps({"offset": offset})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> int:
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["offset"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
@@ -0,0 +1,300 @@
+"""
+Per-user insight aggregates, maintained incrementally on every thought write.
+
+Each counter is a (:UserStat {user_id, kind, key, count}) node:
+
+    total          key ""              number of thoughts
+    emotion        key emotion name    thoughts per emotion
+    hour           key "0".."23"       thoughts per UTC hour
+    day            key "YYYY-MM-DD"    thoughts per UTC day (active days)
+    symptom        key symptom name    thoughts per symptom
+    symptom_range  key "<range>|<name>" symptoms per period of the day
+    keyword        key normalized term occurrences in titles and descriptions
+
+Writes add +1/-1 deltas (keywords add their per-thought term counts, see
+keyword_service), so insight reads only touch the user's counters instead of
+scanning their history. Users whose counters were never built are rebuilt
+from their thoughts on first read; a rebuild also stores the term counts of
+thoughts written before keywords were extracted and turns legacy `symptoms`
+list properties into HAS_SYMPTOM edges. For backfills run:
+
+    python -m app.services.stats_service rebuild [--user UID]
+"""
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.db.queries import register_query
+from app.db.connection import async_db
+from app.services import keyword_service
+
+Deltas = Dict[tuple, int]
+
+TOTAL = "total"
+EMOTION = "emotion"
+HOUR = "hour"
+DAY = "day"
+SYMPTOM = "symptom"
+SYMPTOM_RANGE = "symptom_range"
+KEYWORD = "keyword"
+
+# Every writer of a user's counters first takes a write lock on their User
+# node. Under read-committed isolation that is what keeps a rebuild and a
+# concurrent thought write from missing each other: whichever comes second
+# waits, then sees the other's committed result.
+_LOCK_USER = """
+MATCH (u:User {uid: $user_id})
+SET u._stats_lock = true
+REMOVE u._stats_lock
+"""
+
+LOCK_USER_STATS_QUERY = register_query("stats.lock", _LOCK_USER)
+
+# Deltas are only applied once the user's counters exist (marked by the
+# total counter); otherwise the first read rebuilds them from scratch.
+APPLY_DELTAS_QUERY = register_query("stats.apply_deltas", _LOCK_USER + """
+WITH u
+MATCH (:UserStat {user_id: $user_id, kind: 'total', key: ''})
+UNWIND $deltas AS d
+MERGE (s:UserStat {user_id: $user_id, kind: d.kind, key: d.key})
+ON CREATE SET s.count = 0
+SET s.count = s.count + d.delta
+WITH s
+WHERE s.count <= 0 AND s.kind <> 'total'
+DELETE s
+""")
+
+# $kinds narrows the read (keyword counters grow with the user's vocabulary);
+# the total counter always comes back so a missing set can be told apart
+USER_STATS_QUERY = register_query("stats.read", """
+MATCH (s:UserStat {user_id: $user_id})
+WHERE $kinds IS NULL OR s.kind IN $kinds OR s.kind = 'total'
+RETURN s.kind AS kind, s.key AS key, s.count AS count
+""")
+
+RESET_USER_STATS_QUERY = register_query("stats.reset", """
+OPTIONAL MATCH (s:UserStat {user_id: $user_id})
+DELETE s
+WITH count(*) AS cleared
+MERGE (total:UserStat {user_id: $user_id, kind: 'total', key: ''})
+SET total.count = 0
+""")
+
+# Thoughts written before symptoms became HAS_SYMPTOM edges kept them in a
+# `symptoms` list property. The rebuild links them first, so they are counted;
+# the list is only dropped once every name matched a catalog symptom.
+LINK_LEGACY_SYMPTOMS_QUERY = register_query("stats.link_legacy_symptoms", """
+MATCH (t:Thought {user_id: $user_id})
+WHERE t.symptoms IS NOT NULL
+CALL {
+    WITH t
+    UNWIND t.symptoms AS symptom_name
+    OPTIONAL MATCH (s:Symptom {name: toLower(trim(symptom_name))})
+    FOREACH (symptom IN CASE WHEN s IS NULL THEN [] ELSE [s] END | MERGE (t)-[:HAS_SYMPTOM]->(symptom))
+    RETURN collect(CASE WHEN s IS NULL THEN symptom_name END) AS unknown
+}
+WITH t, unknown
+WHERE size(unknown) = 0
+REMOVE t.symptoms
+""")
+
+# Text only comes back for thoughts whose terms were never extracted
+USER_THOUGHT_FACTS_QUERY = register_query("stats.thought_facts", """
+MATCH (t:Thought {user_id: $user_id})
+RETURN t.id AS id,
+       t.emotion AS emotion,
+       t.timestamp AS timestamp,
+       [(t)-[:HAS_SYMPTOM]->(s:Symptom) | s.name] AS symptoms,
+       t.terms AS terms,
+       t.term_counts AS term_counts,
+       CASE WHEN t.terms IS NULL THEN t.title END AS title,
+       CASE WHEN t.terms IS NULL THEN t.situation_description END AS situation_description
+""")
+
+STORE_THOUGHT_TERMS_QUERY = register_query("stats.store_thought_terms", """
+UNWIND $rows AS row
+MATCH (t:Thought {id: row.id})
+SET t.terms = row.terms, t.term_counts = row.term_counts
+""")
+
+ALL_USER_IDS_QUERY = register_query("stats.all_user_ids", "MATCH (u:User) RETURN u.uid AS uid")
+
+
+def time_range(hour: int) -> str:
+    """Period of the day, matching the symptom time-pattern buckets."""
+    if 5 <= hour < 12:
+        return "Morning"
+    if 12 <= hour < 18:
+        return "Afternoon"
+    if hour < 5 or hour >= 23:
+        return "Dawn"
+    return "Night"
+
+
+def _to_utc(timestamp) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    if hasattr(timestamp, "to_native"):
+        timestamp = timestamp.to_native()
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return timestamp.astimezone(timezone.utc)
+
+
+def thought_deltas(
+    emotion: Optional[str],
+    timestamp,
+    symptoms: Iterable[str],
+    sign: int = 1,
+    deltas: Optional[Deltas] = None,
+    terms: Optional[Dict[str, int]] = None
+) -> Deltas:
+    """Add (sign * 1) for every counter a single thought contributes to,
+    and (sign * count) for each of its keyword term counts."""
+    deltas = deltas if deltas is not None else defaultdict(int)
+    timestamp = _to_utc(timestamp)
+
+    deltas[(TOTAL, "")] += sign
+    if emotion:
+        deltas[(EMOTION, emotion)] += sign
+    if timestamp is not None:
+        deltas[(HOUR, str(timestamp.hour))] += sign
+        deltas[(DAY, timestamp.date().isoformat())] += sign
+    for symptom in set(symptoms or []):
+        deltas[(SYMPTOM, symptom)] += sign
+        if timestamp is not None:
+            deltas[(SYMPTOM_RANGE, f"{time_range(timestamp.hour)}|{symptom}")] += sign
+    for term, count in (terms or {}).items():
+        deltas[(KEYWORD, term)] += sign * count
+    return deltas
+
+
+def _delta_params(deltas: Deltas) -> List[dict]:
+    return [
+        {"kind": kind, "key": key, "delta": delta}
+        for (kind, key), delta in deltas.items()
+        if delta
+    ]
+
+
+async def apply_deltas_async(tx, user_id: str, deltas: Deltas):
+    """Apply counter deltas inside the transaction that wrote the thoughts."""
+    params = _delta_params(deltas)
+    if params:
+        result = await tx.run(APPLY_DELTAS_QUERY, user_id=user_id, deltas=params)
+        await result.consume()
+
+
+def stats_from_records(records) -> Optional[Dict[str, Dict[str, int]]]:
+    """Group counter rows by kind; None when the user has no counters yet."""
+    stats: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for record in records:
+        stats[record["kind"]][record["key"]] = record["count"]
+    if TOTAL not in stats:
+        return None
+    return stats
+
+
+async def _user_stats_tx(tx, user_id: str, kinds: Optional[List[str]]):
+    result = await tx.run(USER_STATS_QUERY, user_id=user_id, kinds=kinds)
+    return stats_from_records([record async for record in result])
+
+
+def _stats_from_deltas(deltas: Deltas) -> Dict[str, Dict[str, int]]:
+    stats: Dict[str, Dict[str, int]] = defaultdict(dict)
+    stats[TOTAL][""] = 0
+    for (kind, key), count in deltas.items():
+        if count > 0:
+            stats[kind][key] = count
+    return stats
+
+
+async def _rebuild_user_stats_tx(tx, user_id: str, only_if_missing: bool = False) -> Dict[str, Dict[str, int]]:
+    # Lock before reading, so writes committed meanwhile are either seen here
+    # or wait for this rebuild and then apply their deltas on top of it
+    result = await tx.run(LOCK_USER_STATS_QUERY, user_id=user_id)
+    await result.consume()
+    if only_if_missing:
+        # Another worker may have built them, or a replica was just behind
+        existing = await _user_stats_tx(tx, user_id, None)
+        if existing is not None:
+            return existing
+
+    result = await tx.run(LINK_LEGACY_SYMPTOMS_QUERY, user_id=user_id)
+    await result.consume()
+
+    deltas: Deltas = defaultdict(int)
+    backfill = []
+    result = await tx.run(USER_THOUGHT_FACTS_QUERY, user_id=user_id)
+    async for record in result:
+        if record["terms"] is None:
+            terms, term_counts = keyword_service.thought_terms(record["title"], record["situation_description"])
+            backfill.append({"id": record["id"], "terms": terms, "term_counts": term_counts})
+        else:
+            terms, term_counts = record["terms"], record["term_counts"]
+        thought_deltas(
+            record["emotion"], record["timestamp"], record["symptoms"], deltas=deltas,
+            terms=keyword_service.stored_term_counts(terms, term_counts)
+        )
+
+    if backfill:
+        result = await tx.run(STORE_THOUGHT_TERMS_QUERY, rows=backfill)
+        await result.consume()
+    result = await tx.run(RESET_USER_STATS_QUERY, user_id=user_id)
+    await result.consume()
+    await apply_deltas_async(tx, user_id, deltas)
+    return _stats_from_deltas(deltas)
+
+
+async def rebuild_user_stats(user_id: str) -> Dict[str, Dict[str, int]]:
+    """Recompute a user's counters from their thoughts."""
+    return await async_db.execute_write(_rebuild_user_stats_tx, user_id)
+
+
+async def get_user_stats(user_id: str, kinds: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+    """Read a user's counters (all kinds, or only `kinds` plus the total),
+    building them first if they don't exist yet."""
+    stats = await async_db.execute_analytics(_user_stats_tx, user_id, kinds)
+
+    if stats is None:
+        # A replica may just be lagging: the leader decides whether to build
+        stats = await async_db.execute_write(_rebuild_user_stats_tx, user_id, True)
+    return stats
+
+
+def top(counts: Dict[str, int], n: int) -> List[tuple]:
+    """The n largest counters, ties broken by key for stable output."""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the per-user insight aggregates.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild = subcommands.add_parser("rebuild", help="recompute counters from the stored thoughts")
+    rebuild.add_argument("--user", help="only rebuild this uid")
+    args = parser.parse_args(argv)
+
+    async def run():
+        try:
+            if args.user:
+                user_ids = [args.user]
+            else:
+                async with async_db.get_session() as session:
+                    result = await session.run(ALL_USER_IDS_QUERY)
+                    user_ids = [record["uid"] async for record in result]
+
+            for user_id in user_ids:
+                stats = await rebuild_user_stats(user_id)
+                print(f"{user_id}: {stats[TOTAL]['']} thoughts")
+            return 0
+        finally:
+            await async_db.close()
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,124 +1,112 @@
-from typing import List, Dict
+import logging
+import os
+from typing import List, Dict, Tuple
 from app.models.symptom import Symptom
-from app.db.connection import Neo4jConnection
+from app.db.queries import register_query
+from app.db.connection import async_db
+from app.cache.catalog_cache import CatalogCache
+from app.services import stats_service
+
+logger = logging.getLogger(__name__)
+
+SYMPTOM_CACHE_TTL = float(os.getenv("SYMPTOM_CACHE_TTL_SECONDS", "300"))
+
+
+FIND_SYMPTOM_QUERY = register_query("symptom.find", """
+MATCH (s:Symptom {name: $name})
+RETURN s
+""")
+
+CREATE_SYMPTOM_QUERY = register_query("symptom.create", """
+CREATE (s:Symptom {
+    name: $name,
+    description: $description
+})
+RETURN s
+""")
+
+ALL_SYMPTOMS_QUERY = register_query("symptom.all", "MATCH (s:Symptom) RETURN s")
 
-db = Neo4jConnection()
 
 def normalize_symptom_name(name: str) -> str:
     return name.strip().lower()
 
-def add_symptom(name: str, description: str = None) -> Symptom:
+async def _add_symptom_tx_async(tx, name: str, description: str):
+    """Find-or-create in one transaction; returns (record, created)."""
+    result = await tx.run(FIND_SYMPTOM_QUERY, {"name": name})
+    record = await result.single()
+    if record:
+        return record, False
+    result = await tx.run(CREATE_SYMPTOM_QUERY, {"name": name, "description": description})
+    return await result.single(), True
+
+async def add_symptom_async(name: str, description: str = None) -> Symptom:
     """
     Add a new symptom to the database
     """
     normalized_name = normalize_symptom_name(name)
 
-    
-    with db.get_session() as session:
-
-        result = session.run("""
-                             MATCH (s:Symptom {name: $name})
-                             RETURN s
-
-                             """, {"name":normalized_name}).single()
-        if result:
-            node = result["s"]
-            return Symptom(name=node["name"], description=node["description"])
-
-        result = session.run(
-            """
-                CREATE (s:Symptom {
-                name: $name,
-                description: $description
-                })
-                RETURN s
-            """, {"name": normalized_name, "description": description}).single()
-        node = result["s"]
-        
-        return Symptom(name=node["name"], description=node["description"])
-    
-def get_all_symptoms_from_db() -> list[Symptom]:
+    record, created = await async_db.execute_write(_add_symptom_tx_async, normalized_name, description)
+    if created:
+        invalidate_symptom_cache()
+
+    return _symptom_from_node(record["s"])
+
+def _symptom_from_node(node) -> Symptom:
+    return Symptom(id=node.element_id, name=node["name"], description=node.get("description"))
+
+def _parse_symptom_record(record) -> Symptom | None:
+    node = record.get("s")
+    if node is None or not node.element_id or not node.get("name"):
+        logger.warning("Skipping symptom record with missing id or name", extra={"record": str(record)})
+        return None
+    return _symptom_from_node(node)
+
+async def _all_symptoms_tx_async(tx) -> list[Symptom]:
+    results = await tx.run(ALL_SYMPTOMS_QUERY)
+    return [symptom async for record in results if (symptom := _parse_symptom_record(record))]
+
+async def get_all_symptoms_async() -> list[Symptom]:
     """
     Get all symptoms from the database.
     """
-    query = "MATCH (s:Symptom) RETURN s"
-    
     try:
-        with db.get_session() as session:
-            results = session.run(query)
-            
-            symptoms = []
-            for record in results:
-                print("Processing record:", record)  # Imprime o record completo
-                
-                # Acessar o nó 's'
-                node = record.get("s")
-                if node:
-                    print("Node:", node)
-                    
-                    # Obter propriedades do nó
-                    symptom_id = node.element_id
-                    symptom_name = node.get("name")
-                    symptom_description = node.get("description", None)
-                    
-                    # Exibir as propriedades para depuração
-                    print(f"Parsed Symptom - ID: {symptom_id}, Name: {symptom_name}, Description: {symptom_description}")
-                    
-                    # Verificar se o id e nome são válidos
-                    if symptom_id and symptom_name:
-                        print("Creating Symptom object...")
-                        symptom = Symptom(id=symptom_id, name=symptom_name, description=symptom_description)
-                        print(f"Symptom created: {symptom}")
-                        symptoms.append(symptom)
-                    else:
-                        print(f"Skipping record due to invalid data - ID or Name missing")
-                else:
-                    print("No node 's' found in record")
-            
-            print(f"Symptoms list populated with {len(symptoms)} symptoms")
-            return symptoms
-    
-    except Exception as e:
-        print(f"Error occurred while fetching symptoms: {e}")
-        raise  # Re-levanta a exceção após logar
+        symptoms = await async_db.execute_read(_all_symptoms_tx_async)
+
+        logger.debug("Loaded symptom catalog", extra={"count": len(symptoms)})
+        return symptoms
 
-def get_symptom_time_patterns(user_id: str) -> List[Dict]:
+    except Exception:
+        logger.exception("Error occurred while fetching symptoms")
+        raise
+
+_symptom_cache = CatalogCache(get_all_symptoms_async, key=lambda symptom: symptom.name, ttl=SYMPTOM_CACHE_TTL)
+
+async def get_symptom_catalog() -> Tuple[List[Symptom], str]:
+    """
+    Get the cached symptom catalog and its version (usable as an ETag).
+    """
+    index, version = await _symptom_cache.get_with_version()
+    return list(index.values()), version
+
+async def get_symptom_names() -> frozenset:
+    return await _symptom_cache.names()
+
+def invalidate_symptom_cache():
+    _symptom_cache.invalidate()
+
+async def get_symptom_time_patterns_async(user_id: str) -> List[Dict]:
     """
     Correlates symptoms with hour ranges with proper timestamp handling.
     Returns: List of dictionaries with time_range, symptom, and count
     """
-    query = """
-    MATCH (u:User {uid: $user_id})-[:HAS_RECORD]->(t:Thought)-[:HAS_SYMPTOM]->(s:Symptom)
-    WHERE t.timestamp IS NOT NULL
-    WITH 
-        datetime(t.timestamp) AS timestamp,
-        s.name AS symptom
-    WITH
-        symptom,
-        CASE
-            WHEN timestamp.hour >= 5 AND timestamp.hour < 12 THEN 'Morning'
-            WHEN timestamp.hour >= 12 AND timestamp.hour < 18 THEN 'Afternoon'
-            WHEN timestamp.hour < 5 OR timestamp.hour >= 23 THEN 'Dawn'
-            ELSE 'Night'
-        END AS time_range
-    RETURN 
-        time_range,
-        symptom,
-        count(*) AS count
-    ORDER BY time_range, count DESC
-    """
-    
     try:
-        with db.get_session() as session:
-            result = session.run(query, {"user_id": user_id})
-            patterns = []
-            for record in result:
-                patterns.append({
-                    "time_range": record["time_range"],
-                    "symptom": record["symptom"],
-                    "count": record["count"]
-                })
-            return patterns
+        stats = await stats_service.get_user_stats(user_id, kinds=[stats_service.SYMPTOM_RANGE])
+        patterns = []
+        for key, count in stats[stats_service.SYMPTOM_RANGE].items():
+            time_range, symptom = key.split("|", 1)
+            patterns.append({"time_range": time_range, "symptom": symptom, "count": count})
+        return sorted(patterns, key=lambda pattern: (pattern["time_range"], -pattern["count"]))
     except Exception as e:
-        print(f"Error fetching symptom time patterns: {e}")
-        raise e
\ No newline at end of file
+        logger.exception("Error fetching symptom time patterns")
+        raise e
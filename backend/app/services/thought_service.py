@@ -1,326 +1,766 @@
+import base64
+import json
+import logging
+import os
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Optional
-from app.models.thought import Thought, ThoughtCreate
-from app.db.connection import Neo4jConnection
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from pydantic import ValidationError
+from app.models.thought import Thought, ThoughtCreate, ThoughtImport, ThoughtSearchHit
+from app.cache.response_cache import response_cache
+from app.db.connection import async_db
+from app.db.queries import register_query
+from app.db.schema import THOUGHT_FULLTEXT_INDEX
+from app.services import keyword_service, search_service, stats_service
+from neo4j import READ_ACCESS
 from neo4j.time import DateTime
 
-db = Neo4jConnection()
+logger = logging.getLogger(__name__)
+
+# Records pulled from Neo4j per network round trip while streaming an export
+EXPORT_FETCH_SIZE = int(os.getenv("NEO4J_EXPORT_FETCH_SIZE", "500"))
+# Thoughts written per UNWIND statement (and transaction) by the bulk import
+IMPORT_BATCH_SIZE = int(os.getenv("THOUGHT_IMPORT_BATCH_SIZE", "500"))
+# Index pages a search reads at most to fill one page of the user's hits
+SEARCH_MAX_ROUNDS = int(os.getenv("THOUGHT_SEARCH_MAX_ROUNDS", "5"))
+
+
+# Static statement for every create: the symptom check runs before the CREATE,
+# so a thought naming an unknown symptom is not written at all (no row comes
+# back), and an empty $symptoms list needs no separate query text.
+CREATE_THOUGHT_QUERY = register_query("thought.create", """
+MATCH (u:User {uid: $user_id})
+OPTIONAL MATCH (s:Symptom) WHERE s.name IN $symptoms
+WITH u, collect(s) AS symptom_nodes
+WHERE size(symptom_nodes) = size($symptoms)
+CREATE (t:Thought {
+    id: randomUUID(),
+    user_id: $user_id,
+    timestamp: datetime($timestamp),
+    title: $title,
+    situation_description: $situation_description,
+    emotion: $emotion,
+    underlying_belief: $underlying_belief,
+    terms: $terms,
+    term_counts: $term_counts,
+    created_at: datetime(),
+    updated_at: datetime()
+})
+CREATE (u)-[:HAS_RECORD]->(t)
+FOREACH (s IN symptom_nodes | CREATE (t)-[:HAS_SYMPTOM]->(s))
+RETURN properties(t) as thought_props,
+       t.timestamp as db_timestamp
+""")
+
+
+def _create_thought_params(user_id: str, data: ThoughtCreate):
+    # Normaliza os sintomas (remove duplicados e espaços em branco)
+    normalized_symptoms = []
+    if data.symptoms:
+        normalized_symptoms = list({symptom.lower().strip() for symptom in data.symptoms if symptom.strip()})
+
+    # Prepara o timestamp
+    input_timestamp = data.timestamp.astimezone(timezone.utc) if data.timestamp else datetime.now(timezone.utc)
+    neo4j_timestamp = input_timestamp.isoformat(timespec='milliseconds')
+
+    # Palavras-chave extraídas uma vez na escrita
+    terms, term_counts = keyword_service.thought_terms(data.title, data.situation_description)
+
+    params = {
+        "user_id": user_id,
+        "timestamp": neo4j_timestamp,
+        "title": data.title,
+        "situation_description": data.situation_description,
+        "emotion": data.emotion,
+        "underlying_belief": data.underlying_belief,
+        "symptoms": normalized_symptoms,
+        "terms": terms,
+        "term_counts": term_counts,
+    }
+
+    return params, normalized_symptoms
+
+
+def _created_thought(result, user_id: str, normalized_symptoms: List[str]) -> Thought:
+    if not result:
+        raise ValueError("Erro ao criar registro de pensamento")
+
+    thought_props = dict(result["thought_props"])
+    db_timestamp = result["db_timestamp"]
+
+    return Thought(
+        id=thought_props["id"],
+        user_id=user_id,
+        timestamp=db_timestamp.to_native(),
+        title=thought_props["title"],
+        situation_description=thought_props["situation_description"],
+        emotion=thought_props["emotion"],
+        underlying_belief=thought_props["underlying_belief"],
+        symptoms=normalized_symptoms,
+        analysis={}
+    )
+
+
+def _record_to_thought(record_data) -> Thought:
+    timestamp = record_data["timestamp"]
+
+    if hasattr(timestamp, "to_native"):
+        parsed_timestamp = timestamp.to_native()
+    else:
+        parsed_timestamp = timestamp
+
+    return Thought(
+        id=record_data["id"],
+        user_id=record_data["user_id"],
+        timestamp=parsed_timestamp,
+        title=record_data.get("title"),
+        situation_description=record_data.get("situation_description"),
+        symptoms=record_data.get("symptoms") or [],
+        emotion=record_data["emotion"],
+        underlying_belief=record_data.get("underlying_belief"),
+    )
+
+
+# Fields a list request may leave out; id, user_id, timestamp and emotion are
+# always returned because the Thought model requires them.
+PROJECTABLE_FIELDS = ("title", "situation_description", "underlying_belief", "symptoms")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields=` value, rejecting unknown names."""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(requested) - set(PROJECTABLE_FIELDS) - {"id", "user_id", "timestamp", "emotion"}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [field for field in requested if field in PROJECTABLE_FIELDS]
+
+
+def encode_cursor(thought: Thought) -> str:
+    """Opaque keyset cursor pointing just after the given thought."""
+    payload = json.dumps({"ts": thought.timestamp.isoformat(), "id": thought.id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
 
-def create_thought(user_id: str, data: ThoughtCreate) -> Thought:
+def decode_cursor(cursor: str):
     try:
-        # Normaliza os sintomas (remove duplicados e espaços em branco)
-        normalized_symptoms = []
-        if data.symptoms:
-            normalized_symptoms = list({symptom.lower().strip() for symptom in data.symptoms if symptom.strip()})
-        
-        # Prepara o timestamp
-        input_timestamp = data.timestamp.astimezone(timezone.utc) if data.timestamp else datetime.now(timezone.utc)
-        neo4j_timestamp = input_timestamp.isoformat(timespec='milliseconds')
-
-        # Query base sem sintomas
-        query = """
-        MATCH (u:User {uid: $user_id})
-        CREATE (t:Thought {
-            id: randomUUID(),
-            user_id: $user_id,
-            timestamp: datetime($timestamp),
-            title: $title,
-            situation_description: $situation_description,
-            emotion: $emotion,
-            underlying_belief: $underlying_belief,
-            created_at: datetime(),
-            updated_at: datetime()
-        })
-        CREATE (u)-[:HAS_RECORD]->(t)
-        """
-        
-        # Adiciona tratamento de sintomas se existirem
-        if normalized_symptoms:
-            query += """
-            WITH t
-            UNWIND $symptoms AS symptom_name
-            OPTIONAL MATCH (s:Symptom {name: symptom_name})
-            WITH t, collect(s) AS symptom_nodes
-            WHERE size(symptom_nodes) = size($symptoms)
-            FOREACH (s IN symptom_nodes | CREATE (t)-[:HAS_SYMPTOM]->(s))
-            """
-        
-        # Finaliza a query com RETURN
-        query += """
-        RETURN properties(t) as thought_props,
-               t.timestamp as db_timestamp
-        """
-        
-        # Parâmetros para a query
-        params = {
-            "user_id": user_id,
-            "timestamp": neo4j_timestamp,
-            "title": data.title,
-            "situation_description": data.situation_description,
-            "emotion": data.emotion,
-            "underlying_belief": data.underlying_belief
-        }
-        
-        # Adiciona sintomas aos parâmetros se existirem
-        if normalized_symptoms:
-            params["symptoms"] = normalized_symptoms
-
-        with db.get_session() as session:
-            result = session.run(query, params).single()
-
-            if not result:
-                raise ValueError("Erro ao criar registro de pensamento")
-
-            thought_props = dict(result["thought_props"])
-            db_timestamp = result["db_timestamp"]
-            
-            return Thought(
-                id=thought_props["id"],
-                user_id=user_id,
-                timestamp=db_timestamp.to_native(),
-                title=thought_props["title"],
-                situation_description=thought_props["situation_description"],
-                emotion=thought_props["emotion"],
-                underlying_belief=thought_props["underlying_belief"],
-                symptoms=normalized_symptoms,
-                analysis={}
-            )
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(payload["ts"]).astimezone(timezone.utc), str(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 
+def _created_deltas(thought: Thought, params: dict):
+    return stats_service.thought_deltas(
+        thought.emotion, thought.timestamp, thought.symptoms,
+        terms=keyword_service.stored_term_counts(params["terms"], params["term_counts"])
+    )
+
+
+async def _create_thought_tx_async(tx, user_id: str, params: dict, normalized_symptoms: List[str]) -> Thought:
+    result = await tx.run(CREATE_THOUGHT_QUERY, params)
+    thought = _created_thought(await result.single(), user_id, normalized_symptoms)
+    await stats_service.apply_deltas_async(tx, user_id, _created_deltas(thought, params))
+    return thought
+
+
+async def create_thought_async(user_id: str, data: ThoughtCreate) -> Thought:
+    try:
+        params, normalized_symptoms = _create_thought_params(user_id, data)
+        thought = await async_db.execute_write(_create_thought_tx_async, user_id, params, normalized_symptoms)
+        await response_cache.invalidate(user_id)
+        return thought
+
     except Exception as e:
-        print(f"Error creating thought: {e}")
+        logger.exception("Error creating thought")
         raise e
 
-def get_user_thoughts(
+
+# One statement per batch: every row becomes a Thought linked to its owner
+# and to its (already validated) symptoms.
+IMPORT_THOUGHTS_QUERY = register_query("thought.import_batch", """
+MATCH (u:User {uid: $user_id})
+UNWIND $rows AS row
+CREATE (t:Thought {
+    id: randomUUID(),
+    user_id: $user_id,
+    timestamp: row.timestamp,
+    title: row.title,
+    situation_description: row.situation_description,
+    emotion: row.emotion,
+    underlying_belief: row.underlying_belief,
+    terms: row.terms,
+    term_counts: row.term_counts,
+    created_at: datetime(),
+    updated_at: datetime()
+})
+CREATE (u)-[:HAS_RECORD]->(t)
+WITH t, row
+CALL {
+    WITH t, row
+    UNWIND row.symptoms AS symptom_name
+    MATCH (s:Symptom {name: symptom_name})
+    CREATE (t)-[:HAS_SYMPTOM]->(s)
+    RETURN count(*) AS linked
+}
+RETURN count(t) AS created
+""")
+
+
+def _normalize_symptoms(symptoms: Sequence[str]) -> List[str]:
+    return sorted({symptom.lower().strip() for symptom in symptoms if symptom.strip()})
+
+
+def unknown_symptoms(symptoms: Sequence[str], catalog: frozenset) -> List[str]:
+    """The normalized names in `symptoms` that are not in the symptom catalog."""
+    return [symptom for symptom in _normalize_symptoms(symptoms) if symptom not in catalog]
+
+
+def validate_import_item(raw: Any, emotions: frozenset, symptoms: frozenset) -> dict:
+    """
+    Check one bulk-import entry against the emotion and symptom catalogs and
+    return it as UNWIND row parameters. Raises ValueError with a readable reason.
+    """
+    try:
+        item = ThoughtImport.model_validate(raw)
+    except ValidationError as e:
+        reasons = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise ValueError(reasons) from None
+
+    if item.emotion not in emotions:
+        raise ValueError(f"Invalid emotion: {item.emotion}")
+
+    normalized_symptoms = _normalize_symptoms(item.symptoms)
+    unknown = unknown_symptoms(normalized_symptoms, symptoms)
+    if unknown:
+        raise ValueError(f"Unknown symptoms: {', '.join(unknown)}")
+
+    timestamp = item.timestamp or datetime.now(timezone.utc)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+    terms, term_counts = keyword_service.thought_terms(item.title, item.situation_description)
+
+    return {
+        "timestamp": timestamp.astimezone(timezone.utc),
+        "title": item.title,
+        "situation_description": item.situation_description,
+        "emotion": item.emotion,
+        "underlying_belief": item.underlying_belief,
+        "symptoms": normalized_symptoms,
+        "terms": terms,
+        "term_counts": term_counts,
+    }
+
+
+async def _write_import_batch_tx(tx, user_id: str, rows: List[dict]) -> int:
+    deltas = defaultdict(int)
+    for row in rows:
+        stats_service.thought_deltas(
+            row["emotion"], row["timestamp"], row["symptoms"], deltas=deltas,
+            terms=keyword_service.stored_term_counts(row["terms"], row["term_counts"])
+        )
+
+    result = await tx.run(IMPORT_THOUGHTS_QUERY, user_id=user_id, rows=rows)
+    record = await result.single()
+    created = record["created"] if record else 0
+    if created != len(rows):
+        raise ValueError("User not found")
+    await stats_service.apply_deltas_async(tx, user_id, deltas)
+    return created
+
+
+async def import_thoughts_async(
+    user_id: str,
+    items: AsyncIterable[Tuple[int, Any]],
+    emotions: frozenset,
+    symptoms: frozenset,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Validate and write (index, raw item) pairs in batches of `batch_size`,
+    one UNWIND statement per batch. Items that are invalid or belong to a
+    failed batch are reported by index; the rest are still imported.
+    `raw` may be an exception, reported as that item's parse error. If
+    `items` itself fails (a broken upload), the items read so far are still
+    written and one error at the next index marks where the import stopped.
+    """
+    created = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[dict] = []
+    batch_indexes: List[int] = []
+
+    async def flush():
+        nonlocal created, batch, batch_indexes
+        try:
+            # Each batch commits (or rolls back) as its own transaction
+            created += await async_db.execute_write(_write_import_batch_tx, user_id, batch)
+        except Exception:
+            # The driver's message is for the logs, not the client
+            logger.exception("Error importing thought batch", extra={"uid": user_id, "items": len(batch)})
+            errors.extend({"index": index, "error": "Write failed"} for index in batch_indexes)
+        batch, batch_indexes = [], []
+
+    next_index = 0
+    try:
+        async for index, raw in items:
+            next_index = index + 1
+            try:
+                if isinstance(raw, Exception):
+                    raise ValueError(str(raw))
+                batch.append(validate_import_item(raw, emotions, symptoms))
+                batch_indexes.append(index)
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+                continue
+
+            if len(batch) >= batch_size:
+                await flush()
+    except Exception:
+        # Earlier batches are committed already, so report them instead of failing
+        logger.exception("Thought import stream failed", extra={"uid": user_id, "index": next_index})
+        errors.append({"index": next_index, "error": "Upload interrupted; this and later items were not imported"})
+
+    if batch:
+        await flush()
+    if created:
+        await response_cache.invalidate(user_id)
+
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+
+# Filters are written as `$param IS NULL OR ...` so every combination shares
+# one statement text (and one cached plan); only paging and the symptom
+# filter pick a variant.
+_USER_THOUGHTS_QUERY_TEMPLATE = """
+{match}
+WHERE ($start_date IS NULL OR r.timestamp >= $start_date)
+  AND ($end_date IS NULL OR r.timestamp <= $end_date)
+  AND ($emotion IS NULL OR r.emotion = $emotion)
+  AND ($cursor_ts IS NULL OR r.timestamp < $cursor_ts OR (r.timestamp = $cursor_ts AND r.id < $cursor_id))
+WITH r ORDER BY r.timestamp DESC, r.id DESC{limit}
+RETURN r {{
+    .id, .user_id, .timestamp, .emotion,
+    title: CASE WHEN $fields IS NULL OR 'title' IN $fields THEN r.title END,
+    situation_description: CASE WHEN $fields IS NULL OR 'situation_description' IN $fields THEN r.situation_description END,
+    underlying_belief: CASE WHEN $fields IS NULL OR 'underlying_belief' IN $fields THEN r.underlying_belief END,
+    symptoms: CASE WHEN $fields IS NULL OR 'symptoms' IN $fields THEN [(r)-[:HAS_SYMPTOM]->(s:Symptom) | s.name] END
+}} AS r
+"""
+
+_ALL_THOUGHTS_MATCH = "MATCH (:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought)"
+
+# Symptom filters start at the indexed Symptom nodes and walk their
+# HAS_SYMPTOM edges into the user's records, so they cost what they match
+# rather than the length of the history.
+_ANY_SYMPTOM_MATCH = """MATCH (s:Symptom) WHERE s.name IN $symptoms
+MATCH (s)<-[:HAS_SYMPTOM]-(r:Thought)<-[:HAS_RECORD]-(:User {uid: $user_id})
+WITH DISTINCT r"""
+
+_ALL_SYMPTOMS_MATCH = """MATCH (s:Symptom) WHERE s.name IN $symptoms
+MATCH (s)<-[:HAS_SYMPTOM]-(r:Thought)<-[:HAS_RECORD]-(:User {uid: $user_id})
+WITH r, count(DISTINCT s) AS matched
+WHERE matched = size($symptoms)
+WITH r"""
+
+
+def _register_user_thoughts_queries(name: str, match: str):
+    return (
+        register_query(name, _USER_THOUGHTS_QUERY_TEMPLATE.format(match=match, limit="")),
+        register_query(f"{name}_page", _USER_THOUGHTS_QUERY_TEMPLATE.format(match=match, limit="\nLIMIT $limit")),
+    )
+
+
+USER_THOUGHTS_QUERY, USER_THOUGHTS_PAGE_QUERY = _register_user_thoughts_queries(
+    "thought.list", _ALL_THOUGHTS_MATCH
+)
+ANY_SYMPTOM_THOUGHTS_QUERY, ANY_SYMPTOM_THOUGHTS_PAGE_QUERY = _register_user_thoughts_queries(
+    "thought.list_any_symptom", _ANY_SYMPTOM_MATCH
+)
+ALL_SYMPTOMS_THOUGHTS_QUERY, ALL_SYMPTOMS_THOUGHTS_PAGE_QUERY = _register_user_thoughts_queries(
+    "thought.list_all_symptoms", _ALL_SYMPTOMS_MATCH
+)
+
+SYMPTOM_MATCH_MODES = ("any", "all")
+
+
+def _build_user_thoughts_query(
     user_id: str,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     emotion: Optional[str] = None,
-    symptom: Optional[str] = None
+    symptoms: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    symptom_match: str = "any"
+):
+    if symptom_match not in SYMPTOM_MATCH_MODES:
+        raise ValueError(f"symptom_match must be one of: {', '.join(SYMPTOM_MATCH_MODES)}")
+    symptoms = _normalize_symptoms(symptoms or [])
+
+    # Keyset pagination: resume strictly after the (timestamp, id) of the
+    # last record of the previous page, so deep pages cost the same as the first
+    cursor_ts, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+
+    params = {
+        "user_id": user_id,
+        "start_date": start_date.astimezone(timezone.utc) if start_date else None,
+        "end_date": end_date.astimezone(timezone.utc) if end_date else None,
+        "emotion": emotion or None,
+        "cursor_ts": cursor_ts,
+        "cursor_id": cursor_id,
+        "fields": list(fields) if fields is not None else None,
+    }
+
+    # With a single symptom "all" and "any" are the same; "any" skips the count
+    if not symptoms:
+        query, page_query = USER_THOUGHTS_QUERY, USER_THOUGHTS_PAGE_QUERY
+    elif symptom_match == "all" and len(symptoms) > 1:
+        query, page_query = ALL_SYMPTOMS_THOUGHTS_QUERY, ALL_SYMPTOMS_THOUGHTS_PAGE_QUERY
+    else:
+        query, page_query = ANY_SYMPTOM_THOUGHTS_QUERY, ANY_SYMPTOM_THOUGHTS_PAGE_QUERY
+    if symptoms:
+        params["symptoms"] = symptoms
+
+    if limit:
+        params["limit"] = limit
+        return page_query, params
+    return query, params
+
+
+async def _user_thoughts_tx_async(tx, query: str, params: dict) -> List[Thought]:
+    results = await tx.run(query, params)
+    return [_record_to_thought(result["r"]) async for result in results]
+
+
+async def get_user_thoughts_async(
+    user_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    emotion: Optional[str] = None,
+    symptoms: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    symptom_match: str = "any"
 ) -> List[Thought]:
     try:
-        query = """
-        MATCH (u:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought)
-        WHERE 1=1
-        """
-        params = {"user_id": user_id}
-
-        if start_date:
-            query += " AND r.timestamp >= $start_date"
-            params["start_date"] = start_date.astimezone(timezone.utc)
-        
-        if end_date:
-            query += " AND r.timestamp <= $end_date"
-            params["end_date"] = end_date.astimezone(timezone.utc)
-        
-        if emotion:
-            query += " AND r.emotion = $emotion"
-            params["emotion"] = emotion
-
-        if symptom:
-            query += " AND $symptom IN r.symptoms"
-            params["symptom"] = symptom
-
-        query += " RETURN r ORDER BY r.timestamp DESC"
-
-        with db.get_session() as session:
-            results = session.run(query, params)
-            raw_data = results.data()
-
-        thoughts = []
-        for result in raw_data:
-            record_data = result["r"]
-            timestamp = record_data["timestamp"]
-
-            if hasattr(timestamp, "to_native"):
-                parsed_timestamp = timestamp.to_native()
-            else:
-                parsed_timestamp = timestamp
-
-            thoughts.append(Thought(
-                id=record_data["id"],
-                user_id=record_data["user_id"],
-                timestamp=parsed_timestamp,
-                title=record_data.get("title"),
-                situation_description=record_data.get("situation_description"),
-                symptoms=record_data.get("symptoms", []),
-                emotion=record_data["emotion"],
-                underlying_belief=record_data.get("underlying_belief"),
-            ))
-        
-        return thoughts
+        query, params = _build_user_thoughts_query(
+            user_id, start_date, end_date, emotion, symptoms, limit, cursor, fields, symptom_match
+        )
+
+        return await async_db.execute_read(_user_thoughts_tx_async, query, params)
 
     except Exception as e:
-        print(f"Error getting user thought records: {e}")
+        logger.exception("Error getting user thought records")
         raise e
 
 
-def get_thought_patterns(user_id: str) -> List[dict]:
+async def stream_user_thoughts(
+    user_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> AsyncIterator[Thought]:
+    """
+    Yield the user's thoughts one by one straight from the result cursor.
+    Only one fetch batch (EXPORT_FETCH_SIZE records) is held in memory.
+    """
+    query, params = _build_user_thoughts_query(user_id, start_date, end_date)
+
+    # Read access so a routing driver streams from a follower, not the leader
+    async with async_db.get_session(fetch_size=EXPORT_FETCH_SIZE, default_access_mode=READ_ACCESS) as session:
+        results = await session.run(query, params)
+        async for result in results:
+            yield _record_to_thought(result["r"])
+
+
+# Lucene applies skip/limit before the ownership check, and its user_id clause
+# goes through the configurable analyzer, so it only narrows the hits. Every
+# index row comes back (r is null for someone else's thought) so the paging
+# can count raw rows.
+SEARCH_THOUGHTS_QUERY = register_query("thought.search", """
+CALL db.index.fulltext.queryNodes($index, $query, {skip: $skip, limit: $limit})
+YIELD node, score
+RETURN CASE WHEN node.user_id = $user_id THEN node {
+    .id, .user_id, .timestamp, .emotion, .title, .situation_description, .underlying_belief,
+    symptoms: [(node)-[:HAS_SYMPTOM]->(s:Symptom) | s.name]
+} END AS r, score
+""")
+
+
+async def _search_thoughts_tx(
+    tx, params: dict, offset: int, limit: int
+) -> Tuple[List[Tuple[Any, float]], Optional[int]]:
+    """
+    Up to `limit` of the user's hits from index position `offset` on, and the
+    position the next page starts at (None when the index has no more hits).
+    """
+    owned = []
+    for _ in range(SEARCH_MAX_ROUNDS):
+        # One row past the page tells whether another page exists
+        results = await tx.run(SEARCH_THOUGHTS_QUERY, {**params, "skip": offset, "limit": limit + 1})
+        rows = [(result["r"], result["score"]) async for result in results]
+        for position, (record, score) in enumerate(rows):
+            if len(owned) == limit:
+                return owned, offset + position
+            if record is not None:
+                owned.append((record, score))
+        if len(rows) <= limit:
+            return owned, None
+        offset += len(rows)
+    # Mostly foreign hits: return a short page rather than scan the whole index
+    return owned, offset
+
+
+async def search_thoughts_async(
+    user_id: str,
+    q: str,
+    limit: int = 20,
+    offset: int = 0
+) -> Tuple[List[ThoughtSearchHit], Optional[int]]:
+    """
+    Full-text search over the user's titles, situations and beliefs, best
+    matches first, with the offset of the next page (None on the last one).
+    Raises ValueError when `q` has no searchable words.
+    """
     try:
-        query = """
-        MATCH (u:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought)
-        WITH r.emotion AS emotion, count(*) AS count
-        ORDER BY count DESC
-        RETURN emotion, count
-        LIMIT 5
-        """
-
-        with db.get_session() as session:
-            results = session.run(query, user_id=user_id)
+        terms = search_service.search_terms(q)
+        params = {
+            "index": THOUGHT_FULLTEXT_INDEX,
+            "query": search_service.build_fulltext_query(user_id, terms),
+            "user_id": user_id,
+        }
 
-        return [{"emotion": result["emotion"], "count": result["count"]}
-                for result in results]
+        rows, next_offset = await async_db.execute_read(_search_thoughts_tx, params, offset, limit)
+        hits = [
+            ThoughtSearchHit(
+                thought=_record_to_thought(record),
+                score=score,
+                highlights=search_service.highlights(record, terms)
+            )
+            for record, score in rows
+        ]
+        return hits, next_offset
 
+    except ValueError:
+        raise
     except Exception as e:
-        print(f"Error getting thought patterns: {e}")
+        logger.exception("Error searching thought records")
         raise e
 
 
-def update_thought(record_id: str, updates: dict) -> Optional[Thought]:
+async def get_thought_patterns_async(user_id: str) -> List[dict]:
     try:
-        updates["updated_at"] = datetime.now(timezone.utc)
-
-        if "timestamp" in updates and isinstance(updates["timestamp"], str):
-            updates["timestamp"] = datetime.fromisoformat(updates["timestamp"]).astimezone(timezone.utc)
-        elif "timestamp" in updates and isinstance(updates["timestamp"], datetime):
-            updates["timestamp"] = updates["timestamp"].astimezone(timezone.utc)
-
-        if "symptoms" in updates and not isinstance(updates["symptoms"], list):
-            updates["symptoms"] = [updates["symptoms"]]
-
-        query = """
-        MATCH (r:Thought {id: $record_id})
-        SET r += $updates
-        RETURN r
-        """
-
-        with db.get_session() as session:
-            result = session.run(query, record_id=record_id, updates=updates).single()
-
-        if result:
-            record_data = result["r"]
-            timestamp = record_data["timestamp"]
-
-            if hasattr(timestamp, "to_native"):
-                parsed_timestamp = timestamp.to_native()
-            else:
-                parsed_timestamp = timestamp
-
-            return Thought(
-                id=record_data["id"],
-                user_id=record_data["user_id"],
-                timestamp=parsed_timestamp,
-                title=record_data.get("title"),
-                situation_description=record_data.get("situation_description"),
-                symptoms=record_data.get("symptoms", []),
-                emotion=record_data["emotion"],
-                underlying_belief=record_data.get("underlying_belief"),
-            )
-        return None
+        stats = await stats_service.get_user_stats(user_id, kinds=[stats_service.EMOTION])
+        return [{"emotion": emotion, "count": count}
+                for emotion, count in stats_service.top(stats[stats_service.EMOTION], 5)]
 
     except Exception as e:
-        print(f"Error updating thought record: {e}")
+        logger.exception("Error getting thought patterns")
         raise e
 
 
-def delete_thought(record_id: str) -> bool:
+# Ownership is part of the match, so a record owned by someone else is
+# indistinguishable from a missing one and no history has to be loaded.
+# $symptoms must already be checked against the catalog. When given, they
+# replace the links and any legacy `symptoms` list property; otherwise that
+# list is left for the stats rebuild to migrate into HAS_SYMPTOM edges.
+UPDATE_THOUGHT_QUERY = register_query("thought.update", """
+MATCH (:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought {id: $record_id})
+WITH r,
+     r.emotion AS old_emotion,
+     r.timestamp AS old_timestamp,
+     [(r)-[:HAS_SYMPTOM]->(s:Symptom) | s.name] AS old_symptoms,
+     r.terms AS old_terms,
+     r.term_counts AS old_term_counts
+SET r += $updates
+FOREACH (_ IN CASE WHEN $symptoms IS NULL THEN [] ELSE [1] END | REMOVE r.symptoms)
+WITH r, old_emotion, old_timestamp, old_symptoms, old_terms, old_term_counts
+CALL {
+    WITH r
+    WITH r WHERE $symptoms IS NOT NULL
+    OPTIONAL MATCH (r)-[link:HAS_SYMPTOM]->(:Symptom)
+    DELETE link
+    WITH DISTINCT r
+    UNWIND $symptoms AS symptom_name
+    MATCH (s:Symptom {name: symptom_name})
+    CREATE (r)-[:HAS_SYMPTOM]->(s)
+    RETURN count(*) AS linked
+}
+WITH r, old_emotion, old_timestamp, old_symptoms, old_terms, old_term_counts,
+     [(r)-[:HAS_SYMPTOM]->(s:Symptom) | s.name] AS linked_symptoms
+RETURN r {.*, symptoms: linked_symptoms} AS r,
+       old_emotion, old_timestamp, old_symptoms, old_terms, old_term_counts, linked_symptoms
+""")
+
+# Only needed when an update changed just one of the tokenized fields
+STORE_THOUGHT_TERMS_QUERY = register_query("thought.store_terms", """
+MATCH (r:Thought {id: $record_id})
+SET r.terms = $terms, r.term_counts = $term_counts
+""")
+
+
+def _updated_terms(record, updates: dict):
+    """
+    Term counts of the updated thought, and the (terms, term_counts) lists
+    still to be stored when _prepare_updates could not extract them.
+    """
+    if "terms" in updates:
+        return keyword_service.stored_term_counts(updates["terms"], updates["term_counts"]), None
+    terms, term_counts = keyword_service.thought_terms(
+        record["r"].get("title"), record["r"].get("situation_description")
+    )
+    if terms == record["r"].get("terms") and term_counts == record["r"].get("term_counts"):
+        return keyword_service.stored_term_counts(terms, term_counts), None
+    return keyword_service.stored_term_counts(terms, term_counts), (terms, term_counts)
+
+
+def _updated_deltas(record, new_terms: Dict[str, int]):
+    deltas = stats_service.thought_deltas(
+        record["old_emotion"], record["old_timestamp"], record["old_symptoms"], sign=-1,
+        terms=keyword_service.stored_term_counts(record["old_terms"], record["old_term_counts"])
+    )
+    return stats_service.thought_deltas(
+        record["r"]["emotion"], record["r"]["timestamp"], record["linked_symptoms"], deltas=deltas,
+        terms=new_terms
+    )
+
+
+def _prepare_updates(updates: dict) -> dict:
+    updates["updated_at"] = datetime.now(timezone.utc)
+
+    if "timestamp" in updates and isinstance(updates["timestamp"], str):
+        updates["timestamp"] = datetime.fromisoformat(updates["timestamp"]).astimezone(timezone.utc)
+    elif "timestamp" in updates and isinstance(updates["timestamp"], datetime):
+        updates["timestamp"] = updates["timestamp"].astimezone(timezone.utc)
+
+    if "symptoms" in updates and not isinstance(updates["symptoms"], list):
+        updates["symptoms"] = [updates["symptoms"]]
+    if "symptoms" in updates:
+        # Symptoms are HAS_SYMPTOM edges, relinked by the update statement
+        updates["symptoms"] = _normalize_symptoms(updates["symptoms"] or [])
+
+    # Full edits carry both tokenized fields, so the terms go out with the SET
+    if "title" in updates and "situation_description" in updates:
+        updates["terms"], updates["term_counts"] = keyword_service.thought_terms(
+            updates["title"], updates["situation_description"]
+        )
+
+    return updates
+
+
+def _update_params(user_id: str, record_id: str, updates: dict) -> dict:
+    properties = {key: value for key, value in updates.items() if key != "symptoms"}
+    return {"user_id": user_id, "record_id": record_id, "updates": properties, "symptoms": updates.get("symptoms")}
+
+
+async def _update_thought_tx_async(tx, user_id: str, record_id: str, updates: dict):
+    result = await tx.run(UPDATE_THOUGHT_QUERY, **_update_params(user_id, record_id, updates))
+    record = await result.single()
+    if record:
+        new_terms, to_store = _updated_terms(record, updates)
+        if to_store:
+            result = await tx.run(
+                STORE_THOUGHT_TERMS_QUERY, record_id=record_id, terms=to_store[0], term_counts=to_store[1]
+            )
+            await result.consume()
+        await stats_service.apply_deltas_async(tx, user_id, _updated_deltas(record, new_terms))
+    return record
+
+
+async def update_thought_async(user_id: str, record_id: str, updates: dict) -> Optional[Thought]:
     try:
-        query = """
-        MATCH (r:Thought {id: $record_id})
-        DETACH DELETE r
-        RETURN count(r) as deleted
-        """
+        updates = _prepare_updates(updates)
 
-        with db.get_session() as session:
-            result = session.run(query, record_id=record_id).single()
+        record = await async_db.execute_write(_update_thought_tx_async, user_id, record_id, updates)
 
-        return result["deleted"] > 0
+        if record:
+            await response_cache.invalidate(user_id)
+            return _record_to_thought(record["r"])
+        return None
 
     except Exception as e:
-        print(f"Error deleting thought record: {e}")
+        logger.exception("Error updating thought record")
         raise e
 
-def get_top_emotions(session, user_id):
-    query = """
-    Match (t:Thought {user_id: $user_id})
-    RETURN t.emotion AS emotion, count(*) AS count
-    ORDER BY count DESC
-    LIMIT 3
-    """
 
-    result = session.run(query, {"user_id": user_id})
-    return [record["emotion"] for record in result]
+DELETE_THOUGHT_QUERY = register_query("thought.delete", """
+MATCH (:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought {id: $record_id})
+WITH r, {
+    emotion: r.emotion,
+    timestamp: r.timestamp,
+    symptoms: [(r)-[:HAS_SYMPTOM]->(s:Symptom) | s.name],
+    terms: r.terms,
+    term_counts: r.term_counts
+} AS removed
+DETACH DELETE r
+RETURN count(r) as deleted, collect(removed) AS removed
+""")
 
-def get_common_hours(session, user_id):
-    query = """
-    MATCH (t:Thought {user_id: $user_id})
-    WITH datetime(t.timestamp).hour AS hour
-    RETURN hour, count(*) AS count
-    ORDER BY count DESC
-    LIMIT 3
-    """
 
-    result = session.run(query, {"user_id": user_id})
-    return [f"{record['hour']}h - {int(record['hour'])+2}h" for record in result]
+def _deleted_deltas(record):
+    deltas = defaultdict(int)
+    for removed in record["removed"]:
+        stats_service.thought_deltas(
+            removed["emotion"], removed["timestamp"], removed["symptoms"], sign=-1, deltas=deltas,
+            terms=keyword_service.stored_term_counts(removed.get("terms"), removed.get("term_counts"))
+        )
+    return deltas
 
-def get_most_common_symptom(session, user_id: str) -> str:
-    query = """
-    MATCH (t:Thought {user_id: $user_id})-[:HAS_SYMPTOM]->(s:Symptom)
-    RETURN s.name AS symptom, count(*) AS count
-    ORDER BY count DESC
-    LIMIT 1
-    """
-    
-    result = session.run(query, {"user_id": user_id}).single()
-    return result["symptom"] if result else "N/A"
-
-def get_frequent_keywords(session, user_id):
-
-    STOPWORDS_EN = ["because", "then", "after", "also", "with", "from", "that", "have", "this"]
-
-    query= """
-        MATCH (t:Thought {user_id: $user_id})
-        WITH apoc.text.clean(t.title + ' ' + t.situation_description) AS text
-        WITH apoc.text.split(text, "\\\W+") AS words
-        UNWIND words AS word
-        WITH toLower(word) AS word
-        WHERE size(word) > 3 AND NOT word IN $stopwords
-        RETURN word, count(*) AS count
-        ORDER BY count DESC
-        LIMIT 5
-    """
 
-    result = session.run(query, {
-        "user_id": user_id,
-        "stopwords": STOPWORDS_EN
-    })
-    return [record["word"] for record in result]
-
-def count_active_days(session, user_id: str) -> int:
-    query = """
-    MATCH (t:Thought {user_id: $user_id})
-    RETURN count(DISTINCT date(datetime(t.timestamp))) AS days
+async def _delete_thought_tx_async(tx, user_id: str, record_id: str) -> bool:
+    result = await tx.run(DELETE_THOUGHT_QUERY, user_id=user_id, record_id=record_id)
+    record = await result.single()
+    await stats_service.apply_deltas_async(tx, user_id, _deleted_deltas(record))
+    return record["deleted"] > 0
+
+
+async def delete_thought_async(user_id: str, record_id: str) -> bool:
+    try:
+        deleted = await async_db.execute_write(_delete_thought_tx_async, user_id, record_id)
+        if deleted:
+            await response_cache.invalidate(user_id)
+        return deleted
+
+    except Exception as e:
+        logger.exception("Error deleting thought record")
+        raise e
+
+
+def _insights_from_stats(stats) -> dict:
+    # Stopwords are applied again so a config change shows up without a rebuild
+    keywords = {
+        word: count for word, count in stats[stats_service.KEYWORD].items()
+        if keyword_service.is_keyword(word)
+    }
+    top_symptom = stats_service.top(stats[stats_service.SYMPTOM], 1)
+    return {
+        "total_thoughts": stats[stats_service.TOTAL][""],
+        "top_emotions": [emotion for emotion, _ in stats_service.top(stats[stats_service.EMOTION], 3)],
+        "most_common_symptom": top_symptom[0][0] if top_symptom else "N/A",
+        "common_time_ranges": [
+            f"{hour}h - {int(hour)+2}h" for hour, _ in stats_service.top(stats[stats_service.HOUR], 3)
+        ],
+        "frequent_keywords": [word for word, _ in stats_service.top(keywords, 5)],
+        "active_days": len(stats[stats_service.DAY])
+    }
+
+
+async def get_insights_summary_async(user_id: str) -> dict:
     """
-    
-    result = session.run(query, {"user_id": user_id})
-    return result.single()["days"]
-
-def count_user_thoughts(session, user_id: str) -> int:
-    query = """
-    MATCH (t:Thought {user_id: $user_id})
-    RETURN count(t) AS total
+    Dashboard summary read from the user's materialized counters (see
+    stats_service) instead of aggregating their whole history; keywords come
+    from the term counts extracted when each thought was written.
     """
-    
-    result = session.run(query, {"user_id": user_id})
-    return result.single()["total"]
-
-def get_insights_summary(user_id: str) -> dict:
-    with db.get_session() as session:
-        return {
-            "total_thoughts": count_user_thoughts(session, user_id),
-            "top_emotions": get_top_emotions(session, user_id),
-            "most_common_symptom": get_most_common_symptom(session, user_id),
-            "common_time_ranges": get_common_hours(session, user_id),
-            "frequent_keywords": get_frequent_keywords(session, user_id),
-            "active_days": count_active_days(session, user_id)  
-        }
\ No newline at end of file
+    try:
+        stats = await stats_service.get_user_stats(user_id)
+        return _insights_from_stats(stats)
+
+    except Exception as e:
+        logger.exception("Error getting insights summary")
+        raise e
@@ -0,0 +1,219 @@
+"""
+Firebase ID token verification.
+
+Two interchangeable verifiers, picked with AUTH_TOKEN_VERIFIER:
+
+    firebase  (default) delegate to firebase_admin.auth.verify_id_token
+              (blocking; it fetches the certificates itself when its cache
+              runs out).
+    jwks      verify locally against Google's signing keys, held in memory
+              and refreshed in the background before they expire, so the
+              request path is a pure CPU check with no I/O. Needs the project
+              id (FIREBASE_PROJECT_ID or the Firebase app's); startup fails
+              without one.
+
+Both return the decoded claims with `uid` set, like firebase_admin does.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+import jwt
+from firebase_admin import auth
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_JWKS_URL = "https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com"
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+# Refresh this long before the published keys expire
+JWKS_REFRESH_MARGIN = float(os.getenv("AUTH_JWKS_REFRESH_MARGIN_SECONDS", "300"))
+# Never refetch more often than this, even on failures or unknown key ids
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("AUTH_JWKS_MIN_REFRESH_SECONDS", "30"))
+# Used when the response carries no Cache-Control max-age
+JWKS_DEFAULT_MAX_AGE = 3600.0
+CLOCK_SKEW_SECONDS = 10
+
+JWKSFetcher = Callable[[], Awaitable[Tuple[dict, float]]]
+
+
+class TokenVerificationError(Exception):
+    pass
+
+
+def _max_age(cache_control: str) -> float:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return float(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE
+
+
+async def fetch_firebase_jwks() -> Tuple[dict, float]:
+    """Download the signing keys; returns the JWK set and its max-age in seconds."""
+    async with httpx.AsyncClient(timeout=10) as client:
+        response = await client.get(FIREBASE_JWKS_URL)
+        response.raise_for_status()
+        return response.json(), _max_age(response.headers.get("cache-control"))
+
+
+class FirebaseAdminVerifier:
+    """Verification through the Firebase Admin SDK. Blocking: run it off the event loop."""
+
+    blocking = True
+
+    def verify(self, token: str) -> dict:
+        return auth.verify_id_token(token)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class JWKSTokenVerifier:
+    """
+    Verifies Firebase ID tokens against an in-memory JWK set.
+
+    start() loads the keys and schedules a background task that refreshes them
+    ahead of their max-age (or early, when a token arrives signed with an
+    unknown key id). verify() never does I/O.
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        fetcher: JWKSFetcher = fetch_firebase_jwks,
+        refresh_margin: float = JWKS_REFRESH_MARGIN,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+    ):
+        self.project_id = project_id
+        self._fetcher = fetcher
+        self._refresh_margin = refresh_margin
+        self._min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._refreshed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def load_jwks(self, jwks: dict, max_age: float):
+        """Swap in a new key set valid for max_age seconds."""
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            try:
+                key = jwt.PyJWK.from_dict(jwk)
+            except jwt.PyJWTError:
+                logger.warning("Skipping unusable signing key %s", jwk.get("kid"))
+                continue
+            if key.key_id:
+                keys[key.key_id] = key
+        if not keys:
+            raise TokenVerificationError("Key set contains no usable signing keys")
+
+        self._keys = keys
+        self._refreshed_at = time.time()
+        self._expires_at = self._refreshed_at + max_age
+
+    @property
+    def key_ids(self) -> frozenset:
+        return frozenset(self._keys)
+
+    async def refresh(self):
+        jwks, max_age = await self._fetcher()
+        self.load_jwks(jwks, max_age)
+        logger.info("Loaded %d token signing keys (max-age %ss)", len(self._keys), int(max_age))
+
+    def next_refresh_delay(self) -> float:
+        delay = self._expires_at - time.time() - self._refresh_margin
+        return max(delay, self._min_refresh_interval)
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.next_refresh_delay())
+                # Woken by an unknown key id: still respect the minimum interval
+                await asyncio.sleep(max(0.0, self._refreshed_at + self._min_refresh_interval - time.time()))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.refresh()
+            except Exception:
+                # Keep serving the current keys and try again after the minimum interval
+                logger.exception("Failed to refresh token signing keys")
+
+    async def start(self):
+        if self.project_id is None:
+            import firebase_admin
+            self.project_id = firebase_admin.get_app().project_id
+        if not self.project_id:
+            raise TokenVerificationError("Firebase project id is not configured")
+
+        self._wake = asyncio.Event()
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Could not load token signing keys on startup")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def verify(self, token: str) -> dict:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed token: {e}") from e
+
+        if header.get("alg") != "RS256":
+            raise TokenVerificationError("Unexpected token algorithm")
+        key = self._keys.get(header.get("kid"))
+        if key is None:
+            if self._wake is not None:
+                self._wake.set()
+            raise TokenVerificationError("Token signed with an unknown key")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=FIREBASE_ISSUER_PREFIX + (self.project_id or ""),
+                leeway=CLOCK_SKEW_SECONDS,
+                options={"require": ["exp", "iat", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("Invalid token subject")
+        if claims.get("auth_time", 0) > time.time() + CLOCK_SKEW_SECONDS:
+            raise TokenVerificationError("Token auth_time is in the future")
+
+        claims["uid"] = subject
+        return claims
+
+
+def create_token_verifier():
+    kind = os.getenv("AUTH_TOKEN_VERIFIER", "firebase").lower()
+    if kind == "firebase":
+        return FirebaseAdminVerifier()
+    if kind == "jwks":
+        return JWKSTokenVerifier(project_id=os.getenv("FIREBASE_PROJECT_ID"))
+    raise ValueError(f"Unknown AUTH_TOKEN_VERIFIER: {kind}")
+
+
+token_verifier = create_token_verifier()
@@ -1,29 +1,71 @@
+import logging
 from app.models.user import User
-from app.db.connection import Neo4jConnection
+from app.db.queries import register_query
+from app.db.connection import db, async_db
+
+logger = logging.getLogger(__name__)
+
+
+GET_USER_QUERY = register_query("user.get", """MATCH (u:User {uid: $uid}) RETURN u""")
+
+CREATE_USER_QUERY = register_query("user.create", """
+                MERGE (u:User {uid: $uid})
+                ON CREATE SET u.email = $email, u.name = $name, u.photo_url = $photo_url
+                RETURN u
+        """)
+
+
+def _user_from_node(user_data) -> User:
+    return User(
+        uid=user_data["uid"],
+        email=user_data["email"],
+        name=user_data.get("name"),
+        photo_url=user_data.get("photo_url"),
+    )
+
+
+def _get_user_tx(tx, uid: str):
+    return tx.run(GET_USER_QUERY, uid=uid).single()
+
+
+def _create_user_tx(tx, user: User):
+    return tx.run(
+        CREATE_USER_QUERY,
+        uid=user.uid,
+        email=user.email,
+        name=user.name,
+        photo_url=user.photo_url,
+    ).single()
+
+
+async def _get_user_tx_async(tx, uid: str):
+    result = await tx.run(GET_USER_QUERY, uid=uid)
+    return await result.single()
+
+
+async def _create_user_tx_async(tx, user: User):
+    result = await tx.run(
+        CREATE_USER_QUERY,
+        uid=user.uid,
+        email=user.email,
+        name=user.name,
+        photo_url=user.photo_url,
+    )
+    return await result.single()
 
-db = Neo4jConnection()
 
 def get_user_by_firebase_uid(uid: str) -> User | None:
     """
     Get a user by their Firebase UID.
     """
     try:
-        query = """MATCH (u:User {uid: $uid}) RETURN u"""
-
-        with db.get_session() as session:  # Gerenciando sessão corretamente
-            result = session.run(query, uid=uid).single()
+        result = db.execute_read(_get_user_tx, uid)
 
         if result:
-            user_data = result["u"]
-            return User(
-                uid=user_data["uid"],
-                email=user_data["email"],
-                name=user_data.get("name"),
-                photo_url=user_data.get("photo_url"),
-            )
+            return _user_from_node(result["u"])
 
     except Exception as e:
-        print(f"Error getting user by Firebase UID: {e}")
+        logger.exception("Error getting user by Firebase UID")
         raise e
 
     return None  # Retorna None se o usuário não for encontrado
@@ -35,33 +77,41 @@ def create_user(user: User) -> User:
     """
 
     try:
-        query = """
-                MERGE (u:User {uid: $uid})
-                ON CREATE SET u.email = $email, u.name = $name, u.photo_url = $photo_url
-                RETURN u
-        """
-
-        with db.get_session() as session:  # Usa `with` para garantir que a sessão seja fechada corretamente
-            result = session.run(
-                query,
-                uid=user.uid,
-                email=user.email,
-                name=user.name,
-                photo_url=user.photo_url,
-            ).single()
+        result = db.execute_write(_create_user_tx, user)
         
         if result:
-            user_data = result["u"]
-            return User(
-                uid=user_data["uid"],
-                email=user_data["email"],
-                name=user_data.get("name"),
-                photo_url=user_data.get("photo_url"),
-            )
+            return _user_from_node(result["u"])
         else:
             return None  # Caso nenhum usuário seja criado ou retornado
 
     except Exception as e:
-        print(f"Error creating user: {e}")
+        logger.exception("Error creating user")
         raise e
 
+
+async def get_user_by_firebase_uid_async(uid: str) -> User | None:
+    """
+    Get a user by their Firebase UID.
+    """
+    try:
+        record = await async_db.execute_read(_get_user_tx_async, uid)
+
+        return _user_from_node(record["u"]) if record else None
+
+    except Exception as e:
+        logger.exception("Error getting user by Firebase UID")
+        raise e
+
+
+async def create_user_async(user: User) -> User | None:
+    """
+    Create a new user in the database (a no-op MERGE if it already exists).
+    """
+    try:
+        record = await async_db.execute_write(_create_user_tx_async, user)
+
+        return _user_from_node(record["u"]) if record else None
+
+    except Exception as e:
+        logger.exception("Error creating user")
+        raise e
@@ -0,0 +1,487 @@
+"""
+In-memory stand-in for the Neo4j drivers, for offline benchmarks and load tests.
+
+The services only run statements registered in app.db.queries, so instead of
+interpreting Cypher the stand-in looks each statement up by its registered
+name and runs a Python equivalent over plain dicts. Per-user history is kept
+sorted by (timestamp, id) and symptoms are indexed by name, mirroring the
+indexes the real schema creates, so relative costs stay meaningful. Full-text
+search is not implemented.
+
+    graph = InMemoryGraph()
+    graph.seed_catalogs()
+    graph.seed_user("u1", thoughts=10_000)
+    with standin_database(graph):
+        ...  # app.db.connection.db / async_db now talk to `graph`
+"""
+import asyncio
+import bisect
+import random
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from neo4j.time import DateTime
+
+from app.db.connection import async_db, db
+from app.db.queries import query_registry
+from app.services import keyword_service, stats_service
+
+EMOTIONS = ["Anger", "Anxiety", "Fear", "Guilt", "Joy", "Sadness", "Shame"]
+SYMPTOMS = ["racing heart", "sweaty palms", "headache", "insomnia", "nausea", "muscle tension"]
+WORDS = (
+    "trabalho reunião chefe prova família amigo conversa dinheiro viagem projeto prazo "
+    "cansaço medo mensagem resposta ligação atraso erro crítica elogio festa sono "
+    "meeting deadline exam partner email presentation interview traffic argument"
+).split()
+
+_SUMMARY = SimpleNamespace(result_available_after=None, result_consumed_after=None)
+
+
+class Node(dict):
+    """Property map that also carries the element_id some services read."""
+
+    def __init__(self, properties: dict, element_id: Optional[str] = None):
+        super().__init__(properties)
+        self.element_id = element_id or uuid.uuid4().hex
+
+
+def _utc(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    if hasattr(value, "to_native"):
+        value = value.to_native()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.astimezone(timezone.utc)
+
+
+class InMemoryGraph:
+    """
+    `round_trip` (seconds) is awaited by every async statement, standing in
+    for the network hop to the database; even at 0 the statement yields to
+    the event loop, as real I/O would, so concurrent requests interleave.
+    """
+
+    def __init__(self, round_trip: float = 0.0):
+        self.round_trip = round_trip
+        self.users: Dict[str, Node] = {}
+        self.emotions: Dict[str, Node] = {}
+        self.symptoms: Dict[str, Node] = {}
+        self.thoughts: Dict[str, dict] = {}
+        # Per user, (timestamp, id) in ascending order: the thought_user_timestamp index
+        self.history: Dict[str, List[Tuple[datetime, str]]] = defaultdict(list)
+        self.thought_symptoms: Dict[str, Set[str]] = defaultdict(set)
+        self.symptom_thoughts: Dict[str, Set[str]] = defaultdict(set)
+        self.stats: Dict[str, Dict[Tuple[str, str], int]] = {}
+        self._lock = threading.RLock()
+        self._handlers: Dict[str, Callable[[dict], List[dict]]] = {
+            "user.get": self._get_user,
+            "user.create": self._create_user,
+            "emotion.all": lambda p: [{"e": e} for e in self.emotions.values()],
+            "symptom.all": lambda p: [{"s": s} for s in self.symptoms.values()],
+            "thought.create": self._create_thought,
+            "thought.import_batch": self._import_batch,
+            "thought.list": lambda p: self._list_thoughts(p, None),
+            "thought.list_page": lambda p: self._list_thoughts(p, None),
+            "thought.list_any_symptom": lambda p: self._list_thoughts(p, "any"),
+            "thought.list_any_symptom_page": lambda p: self._list_thoughts(p, "any"),
+            "thought.list_all_symptoms": lambda p: self._list_thoughts(p, "all"),
+            "thought.list_all_symptoms_page": lambda p: self._list_thoughts(p, "all"),
+            "thought.update": self._update_thought,
+            "thought.store_terms": self._store_terms,
+            "thought.delete": self._delete_thought,
+            # Statements run one at a time under self._lock already
+            "stats.lock": lambda p: [],
+            "stats.apply_deltas": self._apply_deltas,
+            "stats.read": self._read_stats,
+            "stats.reset": self._reset_stats,
+            # Seeded thoughts only ever have HAS_SYMPTOM links
+            "stats.link_legacy_symptoms": lambda p: [],
+            "stats.thought_facts": self._thought_facts,
+            "stats.store_thought_terms": lambda p: [r for row in p["rows"] for r in self._store_terms(
+                {"record_id": row["id"], "terms": row["terms"], "term_counts": row["term_counts"]})],
+            "stats.all_user_ids": lambda p: [{"uid": uid} for uid in self.users],
+        }
+
+    # -- driver entry point -------------------------------------------------
+
+    def run(self, query, params: dict) -> List[dict]:
+        name = query_registry.name_of(query)
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise NotImplementedError(f"The in-memory stand-in does not implement statement {name}")
+        with self._lock:
+            return handler(params)
+
+    # -- seeding --------------------------------------------------------------
+
+    def seed_catalogs(self, emotions: Iterable[str] = EMOTIONS, symptoms: Iterable[str] = SYMPTOMS):
+        for name in emotions:
+            self.emotions[name] = Node({"id": uuid.uuid4().hex, "name": name, "description": None})
+        for name in symptoms:
+            self.symptoms[name] = Node({"name": name, "description": None})
+
+    def seed_user(self, uid: str, thoughts: int = 0, seed: int = 0, days: int = 365) -> List[str]:
+        """
+        Create a user with `thoughts` synthetic records (and their counters)
+        spread over the last `days` days; returns the thought ids.
+        """
+        self._create_user({"uid": uid, "email": f"{uid}@example.com", "name": uid, "photo_url": ""})
+        self.stats[uid] = {(stats_service.TOTAL, ""): 0}
+        return self.add_thoughts(uid, thoughts, seed=seed, days=days)
+
+    def add_thoughts(self, uid: str, count: int, seed: int = 0, days: int = 365) -> List[str]:
+        """Add `count` synthetic thoughts to an existing user, keeping the counters in step."""
+        rng = random.Random(f"{seed}:{uid}:{len(self.history[uid])}")
+        now = datetime.now(timezone.utc)
+        emotions, symptoms = list(self.emotions), list(self.symptoms)
+        ids = []
+        for _ in range(count):
+            title = " ".join(rng.choices(WORDS, k=3))
+            description = " ".join(rng.choices(WORDS, k=12))
+            terms, term_counts = keyword_service.thought_terms(title, description)
+            ids.append(self._insert_thought(uid, {
+                "timestamp": now - timedelta(seconds=rng.randrange(days * 86400)),
+                "title": title,
+                "situation_description": description,
+                "emotion": rng.choice(emotions),
+                "underlying_belief": " ".join(rng.choices(WORDS, k=6)),
+                "terms": terms,
+                "term_counts": term_counts,
+            }, rng.sample(symptoms, rng.randint(0, 2))))
+        self._apply_deltas({"user_id": uid, "deltas": self._deltas_for(ids)})
+        return ids
+
+    def _deltas_for(self, thought_ids: Iterable[str]) -> List[dict]:
+        deltas = defaultdict(int)
+        for thought_id in thought_ids:
+            thought = self.thoughts[thought_id]
+            stats_service.thought_deltas(
+                thought["emotion"], thought["timestamp"], self.thought_symptoms[thought_id], deltas=deltas,
+                terms=keyword_service.stored_term_counts(thought.get("terms"), thought.get("term_counts"))
+            )
+        return [{"kind": kind, "key": key, "delta": delta} for (kind, key), delta in deltas.items() if delta]
+
+    # -- users ------------------------------------------------------------------
+
+    def _get_user(self, p):
+        user = self.users.get(p["uid"])
+        return [{"u": user}] if user else []
+
+    def _create_user(self, p):
+        user = self.users.get(p["uid"])
+        if user is None:
+            user = self.users[p["uid"]] = Node({
+                "uid": p["uid"], "email": p["email"], "name": p["name"], "photo_url": p["photo_url"]
+            })
+        return [{"u": user}]
+
+    # -- thoughts -----------------------------------------------------------------
+
+    def _insert_thought(self, uid: str, properties: dict, symptoms: Iterable[str]) -> str:
+        thought_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        thought = {"id": thought_id, "user_id": uid, "created_at": now, "updated_at": now, **properties}
+        thought["timestamp"] = _utc(thought["timestamp"])
+        self.thoughts[thought_id] = thought
+        bisect.insort(self.history[uid], (thought["timestamp"], thought_id))
+        for name in symptoms:
+            self.thought_symptoms[thought_id].add(name)
+            self.symptom_thoughts[name].add(thought_id)
+        return thought_id
+
+    def _unindex(self, thought: dict):
+        history = self.history[thought["user_id"]]
+        del history[bisect.bisect_left(history, (thought["timestamp"], thought["id"]))]
+
+    def _owned(self, p) -> Optional[dict]:
+        thought = self.thoughts.get(p["record_id"])
+        if thought is None or thought["user_id"] != p["user_id"] or p["user_id"] not in self.users:
+            return None
+        return thought
+
+    def _create_thought(self, p):
+        if p["user_id"] not in self.users or any(name not in self.symptoms for name in p["symptoms"]):
+            return []
+        thought_id = self._insert_thought(p["user_id"], {
+            key: p[key] for key in (
+                "timestamp", "title", "situation_description", "emotion", "underlying_belief", "terms", "term_counts"
+            )
+        }, p["symptoms"])
+        thought = self.thoughts[thought_id]
+        return [{"thought_props": self._properties(thought), "db_timestamp": DateTime.from_native(thought["timestamp"])}]
+
+    def _import_batch(self, p):
+        if p["user_id"] not in self.users:
+            return [{"created": 0}]
+        for row in p["rows"]:
+            symptoms = [name for name in row["symptoms"] if name in self.symptoms]
+            self._insert_thought(p["user_id"], {key: value for key, value in row.items() if key != "symptoms"}, symptoms)
+        return [{"created": len(p["rows"])}]
+
+    @staticmethod
+    def _properties(thought: dict) -> dict:
+        properties = dict(thought)
+        for key in ("timestamp", "created_at", "updated_at"):
+            if properties.get(key) is not None:
+                properties[key] = DateTime.from_native(properties[key])
+        return properties
+
+    def _projection(self, thought: dict, fields: Optional[List[str]]) -> dict:
+        row = {
+            "id": thought["id"],
+            "user_id": thought["user_id"],
+            "timestamp": DateTime.from_native(thought["timestamp"]),
+            "emotion": thought["emotion"],
+        }
+        for field in ("title", "situation_description", "underlying_belief"):
+            row[field] = thought.get(field) if fields is None or field in fields else None
+        row["symptoms"] = sorted(self.thought_symptoms[thought["id"]]) if fields is None or "symptoms" in fields else None
+        return row
+
+    def _list_thoughts(self, p, symptom_match: Optional[str]):
+        uid = p["user_id"]
+        if uid not in self.users:
+            return []
+        cursor = (p["cursor_ts"], p["cursor_id"]) if p["cursor_ts"] is not None else None
+
+        if symptom_match is None:
+            # Walk the per-user index backwards, starting just before the cursor
+            history = self.history[uid]
+            end = bisect.bisect_left(history, cursor) if cursor else len(history)
+            candidates = (history[i] for i in range(end - 1, -1, -1))
+        else:
+            matched = [self.symptom_thoughts.get(name, set()) for name in p["symptoms"]]
+            ids = set.union(*matched) if symptom_match == "any" else set.intersection(*matched)
+            candidates = sorted(
+                ((self.thoughts[i]["timestamp"], i) for i in ids if self.thoughts[i]["user_id"] == uid),
+                reverse=True
+            )
+
+        rows, limit = [], p.get("limit")
+        for key in candidates:
+            thought = self.thoughts[key[1]]
+            if cursor and key >= cursor:
+                continue
+            if p["start_date"] is not None and thought["timestamp"] < p["start_date"]:
+                continue
+            if p["end_date"] is not None and thought["timestamp"] > p["end_date"]:
+                continue
+            if p["emotion"] is not None and thought["emotion"] != p["emotion"]:
+                continue
+            rows.append({"r": self._projection(thought, p["fields"])})
+            if limit and len(rows) >= limit:
+                break
+        return rows
+
+    def _set_symptoms(self, thought_id: str, names: Iterable[str]):
+        for name in self.thought_symptoms.pop(thought_id, set()):
+            self.symptom_thoughts[name].discard(thought_id)
+        for name in names:
+            if name in self.symptoms:
+                self.thought_symptoms[thought_id].add(name)
+                self.symptom_thoughts[name].add(thought_id)
+
+    def _update_thought(self, p):
+        thought = self._owned(p)
+        if thought is None:
+            return []
+        old = {
+            "old_emotion": thought["emotion"],
+            "old_timestamp": DateTime.from_native(thought["timestamp"]),
+            "old_symptoms": sorted(self.thought_symptoms[thought["id"]]),
+            "old_terms": thought.get("terms"),
+            "old_term_counts": thought.get("term_counts"),
+        }
+        self._unindex(thought)
+        for key, value in p["updates"].items():
+            if value is None:
+                thought.pop(key, None)
+            else:
+                thought[key] = value
+        thought["timestamp"] = _utc(thought["timestamp"])
+        bisect.insort(self.history[thought["user_id"]], (thought["timestamp"], thought["id"]))
+        if p["symptoms"] is not None:
+            self._set_symptoms(thought["id"], p["symptoms"])
+
+        linked = sorted(self.thought_symptoms[thought["id"]])
+        return [{"r": {**self._properties(thought), "symptoms": linked}, **old, "linked_symptoms": linked}]
+
+    def _store_terms(self, p):
+        thought = self.thoughts.get(p["record_id"])
+        if thought is not None:
+            thought["terms"], thought["term_counts"] = p["terms"], p["term_counts"]
+        return []
+
+    def _delete_thought(self, p):
+        thought = self._owned(p)
+        if thought is None:
+            return [{"deleted": 0, "removed": []}]
+        removed = {
+            "emotion": thought["emotion"],
+            "timestamp": DateTime.from_native(thought["timestamp"]),
+            "symptoms": sorted(self.thought_symptoms[thought["id"]]),
+            "terms": thought.get("terms"),
+            "term_counts": thought.get("term_counts"),
+        }
+        self._unindex(thought)
+        self._set_symptoms(thought["id"], [])
+        del self.thoughts[thought["id"]]
+        return [{"deleted": 1, "removed": [removed]}]
+
+    # -- analytics ------------------------------------------------------------------
+
+    def _user_thoughts(self, uid: str) -> List[dict]:
+        return [self.thoughts[thought_id] for _, thought_id in self.history.get(uid, [])]
+
+    # -- materialized counters --------------------------------------------------------
+
+    def _apply_deltas(self, p):
+        counters = self.stats.get(p["user_id"])
+        if counters is None:
+            return []
+        for delta in p["deltas"]:
+            key = (delta["kind"], delta["key"])
+            counters[key] = counters.get(key, 0) + delta["delta"]
+            if counters[key] <= 0 and delta["kind"] != stats_service.TOTAL:
+                del counters[key]
+        return []
+
+    def _read_stats(self, p):
+        kinds = p.get("kinds")
+        return [
+            {"kind": kind, "key": key, "count": count}
+            for (kind, key), count in self.stats.get(p["user_id"], {}).items()
+            if kinds is None or kind in kinds or kind == stats_service.TOTAL
+        ]
+
+    def _reset_stats(self, p):
+        self.stats[p["user_id"]] = {(stats_service.TOTAL, ""): 0}
+        return []
+
+    def _thought_facts(self, p):
+        return [{
+            "id": thought["id"],
+            "emotion": thought["emotion"],
+            "timestamp": DateTime.from_native(thought["timestamp"]),
+            "symptoms": sorted(self.thought_symptoms[thought["id"]]),
+            "terms": thought.get("terms"),
+            "term_counts": thought.get("term_counts"),
+            "title": thought.get("title") if thought.get("terms") is None else None,
+            "situation_description": thought.get("situation_description") if thought.get("terms") is None else None,
+        } for thought in self._user_thoughts(p["user_id"])]
+
+
+# -- driver surface ---------------------------------------------------------------------
+
+
+def _parameters(parameters: Optional[dict], kwargs: dict) -> dict:
+    return {**(parameters or {}), **kwargs}
+
+
+class StandInResult:
+    def __init__(self, records: List[dict]):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self, strict: bool = False):
+        return self._records[0] if self._records else None
+
+    def data(self, *keys):
+        return [dict(record) for record in self._records]
+
+    def consume(self):
+        return _SUMMARY
+
+
+class AsyncStandInResult:
+    def __init__(self, records: List[dict]):
+        self._records = records
+
+    async def __aiter__(self):
+        for record in self._records:
+            yield record
+
+    async def single(self, strict: bool = False):
+        return self._records[0] if self._records else None
+
+    async def data(self, *keys):
+        return [dict(record) for record in self._records]
+
+    async def consume(self):
+        return _SUMMARY
+
+
+class StandInSession:
+    """Session and transaction at once: managed work gets the session as its tx."""
+
+    def __init__(self, graph: InMemoryGraph):
+        self._graph = graph
+
+    def run(self, query, parameters: Optional[dict] = None, **kwargs):
+        return StandInResult(self._graph.run(query, _parameters(parameters, kwargs)))
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_write = execute_read
+
+    def close(self):
+        pass
+
+
+class AsyncStandInSession:
+    def __init__(self, graph: InMemoryGraph):
+        self._graph = graph
+
+    async def run(self, query, parameters: Optional[dict] = None, **kwargs):
+        await asyncio.sleep(self._graph.round_trip)
+        return AsyncStandInResult(self._graph.run(query, _parameters(parameters, kwargs)))
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await work(self, *args, **kwargs)
+
+    execute_write = execute_read
+
+    async def close(self):
+        pass
+
+
+class StandInDriver:
+    def __init__(self, graph: InMemoryGraph):
+        self._graph = graph
+
+    def session(self, **config):
+        return StandInSession(self._graph)
+
+    def close(self):
+        pass
+
+
+class AsyncStandInDriver:
+    def __init__(self, graph: InMemoryGraph):
+        self._graph = graph
+
+    def session(self, **config):
+        return AsyncStandInSession(self._graph)
+
+    async def close(self):
+        pass
+
+
+@contextmanager
+def standin_database(graph: InMemoryGraph):
+    """Point the shared connections at `graph` for the duration of the block."""
+    previous = db.driver, async_db.driver
+    db.driver, async_db.driver = StandInDriver(graph), AsyncStandInDriver(graph)
+    try:
+        yield graph
+    finally:
+        db.driver, async_db.driver = previous
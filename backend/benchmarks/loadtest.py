@@ -0,0 +1,227 @@
+"""
+Load test replaying journaling sessions against the app.
+
+Every virtual user repeats one session after another until the duration is
+up. A session signs in with a fresh token, then follows the journey a
+dashboard visit makes:
+
+    login -> /auth/me -> list /thought-records/ -> create -> insights-summary -> patterns
+
+By default the app runs in this process on the in-memory graph stand-in,
+with a fake token verifier and no network; the load generator then shares the
+event loop with the app, so treat its throughput as a relative number for
+comparing commits. For the capacity of one uvicorn worker, serve the app on
+the stand-ins from a second shell and point --url at it:
+
+    python -m benchmarks.loadtest --users 50 --duration 30
+    python -m benchmarks.serve --users 50 --port 8000
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --users 50 --duration 30
+
+Results are JSON: per journey step (and in total) request and error counts,
+mean/p50/p95/p99/min/max latency in milliseconds and requests per second of
+wall time.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.graph_standin import InMemoryGraph
+from benchmarks.offline_app import CACHE_BACKENDS, auth_headers, offline_client
+from benchmarks.run import git_revision, thought_payload
+from benchmarks.stats import summarize
+
+LIST_PAGE_SIZE = 20
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    method: str
+    path: str
+    params: Optional[dict] = None
+    body: Optional[Callable[[int], dict]] = None
+
+
+# The first request of a session carries a token the server has not seen yet,
+# so it pays for verification and the user lookup like a real sign-in.
+JOURNEY = (
+    Step("login", "GET", "/auth/verify-token"),
+    Step("auth_me", "GET", "/auth/me"),
+    Step("list_thoughts", "GET", "/thought-records/", params={"limit": LIST_PAGE_SIZE}),
+    Step("create_thought", "POST", "/thought-records/", body=thought_payload),
+    Step("insights_summary", "GET", "/thought-records/insights-summary"),
+    Step("patterns", "GET", "/thought-records/patterns"),
+)
+
+
+def load_uid(i: int) -> str:
+    return f"load-user-{i}"
+
+
+def seed_users(users: int, thoughts: int, seed: int = 0, round_trip: float = 0.0) -> InMemoryGraph:
+    """A graph holding `users` load-test users with `thoughts` thoughts each."""
+    graph = InMemoryGraph(round_trip=round_trip)
+    graph.seed_catalogs()
+    for i in range(users):
+        graph.seed_user(load_uid(i), thoughts=thoughts, seed=seed)
+    return graph
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    def record(self, step: str, seconds: float, ok: bool):
+        self.samples[step].append(seconds)
+        if not ok:
+            self.errors[step] += 1
+
+    def report(self, elapsed: float) -> Dict[str, dict]:
+        steps = {}
+        for step in [step.name for step in JOURNEY]:
+            steps[step] = {**summarize(self.samples[step], elapsed), "errors": self.errors[step]}
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        steps["total"] = {**summarize(everything, elapsed), "errors": sum(self.errors.values())}
+        return steps
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    uid: str,
+    deadline: float,
+    recorder: Recorder,
+    think_time: float,
+    rng: random.Random
+):
+    session = 0
+    while time.perf_counter() < deadline:
+        headers = auth_headers(uid, session=str(session))
+        for step in JOURNEY:
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    step.method, step.path, params=step.params, headers=headers,
+                    json=step.body(session) if step.body else None
+                )
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            recorder.record(step.name, time.perf_counter() - start, ok)
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * think_time))
+        session += 1
+
+
+@asynccontextmanager
+async def target_client(
+    url: Optional[str], users: int, thoughts: int, seed: int, round_trip: float, cache: str
+) -> AsyncIterator[httpx.AsyncClient]:
+    if url is None:
+        async with offline_client(seed_users(users, thoughts, seed, round_trip), cache=cache) as client:
+            yield client
+        return
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        yield client
+
+
+async def run(
+    users: int,
+    duration: float,
+    thoughts: int = 200,
+    think_time: float = 0.0,
+    ramp_up: float = 0.0,
+    url: Optional[str] = None,
+    seed: int = 0,
+    round_trip: float = 0.0,
+    cache: str = "memory"
+) -> dict:
+    recorder = Recorder()
+    async with target_client(url, users, thoughts, seed, round_trip, cache) as client:
+
+        async def start_user(i: int):
+            # Spread the arrivals over the ramp-up instead of a thundering herd
+            await asyncio.sleep(ramp_up * i / users)
+            await virtual_user(client, load_uid(i), deadline, recorder, think_time, random.Random(f"{seed}:{i}"))
+
+        started = time.perf_counter()
+        deadline = started + ramp_up + duration
+        await asyncio.gather(*(start_user(i) for i in range(users)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": url or "in-process",
+            "users": users,
+            "duration": duration,
+            "ramp_up": ramp_up,
+            "think_time": think_time,
+            "thoughts_per_user": thoughts if url is None else None,
+            "round_trip_ms": round_trip * 1000 if url is None else None,
+            "response_cache": cache if url is None else None,
+            "elapsed": round(elapsed, 3),
+        },
+        "endpoints": recorder.report(elapsed),
+    }
+
+
+def render_table(report: dict) -> str:
+    lines = [f"{'step':<18}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"]
+    for step, stats in report["endpoints"].items():
+        lines.append(
+            f"{step:<18}{stats['count']:>10}{stats['errors']:>8}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['ops_per_sec']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load after the ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds over which the users start")
+    parser.add_argument("--think-time", type=float, default=0,
+                        help="mean pause between steps in seconds (0 for closed-loop maximum load)")
+    parser.add_argument("--thoughts", type=int, default=200, help="seeded thoughts per user (in-process only)")
+    parser.add_argument("--round-trip-ms", type=float, default=0,
+                        help="simulated database round trip per statement (in-process only)")
+    parser.add_argument("--response-cache", choices=CACHE_BACKENDS, default="memory",
+                        help="response cache backend (in-process only)")
+    parser.add_argument("--url", help="base URL of a running server, e.g. one started by benchmarks.serve")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    report = asyncio.run(run(
+        args.users, args.duration, thoughts=args.thoughts, think_time=args.think_time,
+        ramp_up=args.ramp_up, url=args.url, seed=args.seed, round_trip=args.round_trip_ms / 1000,
+        cache=args.response_cache
+    ))
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered + "\n")
+    else:
+        print(rendered)
+    print(render_table(report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+The FastAPI app wired for offline runs: the in-memory graph instead of Neo4j,
+and a token verifier that trusts "user:<uid>" bearer tokens instead of
+Firebase. offline_client sends requests through the whole ASGI stack
+(middleware, auth dependency, routing, validation) without a network socket
+or a lifespan; offline_backend alone is enough to serve the app with uvicorn.
+Each run starts with an empty response cache: "memory", "redis" (the
+RedisBackend over redis_standin.InMemoryRedis) or "none".
+
+    async with offline_client(graph) as client:
+        await client.get("/auth/me", headers=auth_headers("u1"))
+"""
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import firebase_admin
+import httpx
+from firebase_admin import credentials
+
+from benchmarks.graph_standin import InMemoryGraph, standin_database
+from benchmarks.redis_standin import InMemoryRedis
+
+
+class _OfflineCredential(credentials.Base):
+    def get_credential(self):
+        return None
+
+
+# app.config.firebase_config initializes the SDK from FIREBASE_CREDENTIALS
+# unless an app already exists; nothing here ever calls Firebase.
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(_OfflineCredential(), {"projectId": "offline"})
+
+from app import main as main_module  # noqa: E402
+from app.cache.response_cache import MemoryBackend, RedisBackend, response_cache  # noqa: E402
+from app.dependencies import auth_dependency  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.token_verifier import TokenVerificationError  # noqa: E402
+
+TOKEN_PREFIX = "user:"
+
+
+class FakeTokenVerifier:
+    """
+    Accepts "user:<uid>" tokens, valid for `ttl` seconds from verification.
+    "user:<uid>/<session>" names the same user with a distinct token, as if
+    they had signed in again.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.verifications = 0
+
+    def verify(self, token: str) -> dict:
+        if not token.startswith(TOKEN_PREFIX):
+            raise TokenVerificationError("Unknown token")
+        self.verifications += 1
+        uid = token[len(TOKEN_PREFIX):].split("/", 1)[0]
+        return {"uid": uid, "email": f"{uid}@example.com", "name": uid, "exp": time.time() + self.ttl}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def auth_headers(uid: str, session: Optional[str] = None) -> Dict[str, str]:
+    token = f"{TOKEN_PREFIX}{uid}" if session is None else f"{TOKEN_PREFIX}{uid}/{session}"
+    return {"Authorization": f"Bearer {token}"}
+
+
+def reset_auth_caches():
+    """Forget verified tokens and provisioned users (a cold /auth/me)."""
+    auth_dependency.token_cache.clear()
+    auth_dependency.user_cache.clear()
+
+
+CACHE_BACKENDS = ("memory", "redis", "none")
+
+
+def response_cache_backend(kind: str):
+    if kind not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {kind}")
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        return RedisBackend(InMemoryRedis())
+    return None
+
+
+@contextmanager
+def offline_backend(
+    graph: InMemoryGraph,
+    verifier: Optional[FakeTokenVerifier] = None,
+    cache: str = "memory"
+) -> Iterator[FakeTokenVerifier]:
+    """Point the app's database, token verification (lifespan included) and response cache at the stand-ins."""
+    verifier = verifier or FakeTokenVerifier()
+    previous = auth_dependency.token_verifier, main_module.token_verifier, response_cache.backend
+    auth_dependency.token_verifier = main_module.token_verifier = verifier
+    # A cache left over from another graph would answer for users that share a uid
+    response_cache.backend = response_cache_backend(cache)
+    reset_auth_caches()
+    try:
+        with standin_database(graph):
+            yield verifier
+    finally:
+        auth_dependency.token_verifier, main_module.token_verifier, response_cache.backend = previous
+        reset_auth_caches()
+
+
+@asynccontextmanager
+async def offline_client(
+    graph: InMemoryGraph,
+    verifier: Optional[FakeTokenVerifier] = None,
+    cache: str = "memory"
+) -> AsyncIterator[httpx.AsyncClient]:
+    with offline_backend(graph, verifier, cache):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://offline") as client:
+            yield client
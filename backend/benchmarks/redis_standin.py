@@ -0,0 +1,38 @@
+"""
+In-memory stand-in for the few redis.asyncio calls the response cache makes,
+to exercise RedisBackend without a Redis server.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+
+class InMemoryRedis:
+    """get / set(ex=) / delete / aclose over a dict; `round_trip` seconds per call."""
+
+    def __init__(self, round_trip: float = 0.0):
+        self.round_trip = round_trip
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await asyncio.sleep(self.round_trip)
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        await asyncio.sleep(self.round_trip)
+        self._values[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        await asyncio.sleep(self.round_trip)
+        return sum(self._values.pop(key, None) is not None for key in keys)
+
+    async def aclose(self):
+        self._values.clear()
@@ -0,0 +1,227 @@
+"""
+Offline benchmarks for the thought services and routes.
+
+Each dataset size seeds one synthetic user with that many thoughts (plus a
+second user owning a few) in the in-memory graph stand-in, then times the
+hot paths one call at a time: the services directly, and the routes through
+the whole FastAPI stack with a fake token verifier. Nothing touches Neo4j or
+Firebase, so runs on different commits are comparable on the same machine.
+
+    python -m benchmarks.run --sizes 10,1000,100000 --output bench.json
+    python -m benchmarks.run --compare before.json --output after.json
+
+Results are JSON: run metadata plus, per size and scenario, count,
+mean/p50/p95/p99/min/max in milliseconds and calls per second.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.graph_standin import EMOTIONS, SYMPTOMS, InMemoryGraph, standin_database
+from benchmarks.offline_app import auth_headers, offline_client, reset_auth_caches
+from benchmarks.stats import summarize
+from app.models.thought import Thought
+from app.services import thought_service
+
+DEFAULT_SIZES = (10, 1000, 100000)
+BENCH_USER = "bench-user"
+OTHER_USER = "other-user"
+PAGE_SIZE = 50
+
+
+def thought_payload(i: int) -> dict:
+    return {
+        "title": f"Reunião com o chefe {i}",
+        "situation_description": "O prazo do projeto mudou de novo e a reunião atrasou",
+        "emotion": EMOTIONS[i % len(EMOTIONS)],
+        "underlying_belief": "Vou decepcionar a equipe",
+        "symptoms": [SYMPTOMS[i % len(SYMPTOMS)]],
+    }
+
+
+async def measure(call: Callable[[int], Awaitable], iterations: int, warmup: int) -> Dict[str, float]:
+    """Time `iterations` sequential calls of call(i) after `warmup` untimed ones."""
+    for i in range(warmup):
+        await call(i)
+    samples = []
+    for i in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def seed(size: int, seed_value: int) -> tuple:
+    graph = InMemoryGraph()
+    graph.seed_catalogs()
+    own = graph.seed_user(BENCH_USER, thoughts=size, seed=seed_value)
+    foreign = graph.seed_user(OTHER_USER, thoughts=10, seed=seed_value)
+    return graph, own, foreign
+
+
+async def service_scenarios(graph: InMemoryGraph, iterations: int, warmup: int) -> Dict[str, dict]:
+    async def create(i):
+        payload = thought_payload(i)
+        await thought_service.create_thought_async(
+            BENCH_USER, Thought(user_id=BENCH_USER, timestamp=datetime.now(timezone.utc), **payload)
+        )
+
+    async def first_page(i):
+        await thought_service.get_user_thoughts_async(BENCH_USER, limit=PAGE_SIZE)
+
+    async def symptom_page(i):
+        await thought_service.get_user_thoughts_async(BENCH_USER, symptoms=[SYMPTOMS[0]], limit=PAGE_SIZE)
+
+    async def insights_counters(i):
+        await thought_service.get_insights_summary_async(BENCH_USER)
+
+    with standin_database(graph):
+        return {
+            "service.create_thought": await measure(create, iterations, warmup),
+            "service.get_user_thoughts.page": await measure(first_page, iterations, warmup),
+            "service.get_user_thoughts.symptom": await measure(symptom_page, iterations, warmup),
+            "service.get_insights_summary.counters": await measure(insights_counters, iterations, warmup),
+        }
+
+
+async def route_scenarios(
+    graph: InMemoryGraph, own: List[str], foreign: List[str], iterations: int, warmup: int
+) -> Dict[str, dict]:
+    headers = auth_headers(BENCH_USER)
+
+    def expect(status: int):
+        def check(response):
+            if response.status_code != status:
+                raise RuntimeError(f"{response.request.method} {response.request.url} returned "
+                                   f"{response.status_code}, expected {status}: {response.text}")
+        return check
+
+    async with offline_client(graph) as client:
+        ok, not_found = expect(200), expect(404)
+
+        async def create(i):
+            ok(await client.post("/thought-records/", json=thought_payload(i), headers=headers))
+
+        async def list_page(i):
+            ok(await client.get("/thought-records/", params={"limit": PAGE_SIZE}, headers=headers))
+
+        async def insights(i):
+            ok(await client.get("/thought-records/insights-summary", headers=headers))
+
+        async def update_own(i):
+            ok(await client.put(f"/thought-records/{own[i % len(own)]}", json=thought_payload(i), headers=headers))
+
+        async def update_foreign(i):
+            not_found(await client.put(f"/thought-records/{foreign[i % len(foreign)]}",
+                                       json=thought_payload(i), headers=headers))
+
+        async def delete_own(i):
+            ok(await client.delete(f"/thought-records/{deletable[i]}", headers=headers))
+
+        async def me_warm(i):
+            ok(await client.get("/auth/me", headers=headers))
+
+        async def me_cold(i):
+            reset_auth_caches()
+            ok(await client.get("/auth/me", headers=headers))
+
+        scenarios = {
+            "route.auth_me.warm": await measure(me_warm, iterations, warmup),
+            "route.auth_me.cold": await measure(me_cold, iterations, warmup),
+            "route.create_thought": await measure(create, iterations, warmup),
+            "route.list_thoughts.page": await measure(list_page, iterations, warmup),
+            "route.insights_summary": await measure(insights, iterations, warmup),
+            "route.update_thought.own": await measure(update_own, iterations, warmup),
+            "route.update_thought.foreign": await measure(update_foreign, iterations, warmup),
+        }
+        # Every delete needs its own record; add them just before deleting
+        deletable = graph.add_thoughts(BENCH_USER, iterations + warmup)
+        scenarios["route.delete_thought.own"] = await measure(delete_own, iterations, warmup)
+        return scenarios
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(sizes: List[int], iterations: int, warmup: int, seed_value: int = 0) -> dict:
+    results = {}
+    for size in sizes:
+        graph, own, foreign = seed(size, seed_value)
+        scenarios = await service_scenarios(graph, iterations, warmup)
+        scenarios.update(await route_scenarios(graph, own, foreign, iterations, warmup))
+        results[str(size)] = scenarios
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "warmup": warmup,
+            "seed": seed_value,
+        },
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict) -> List[str]:
+    """One line per scenario present in both runs: p50 and p95 before -> after."""
+    lines = []
+    for size, scenarios in after["results"].items():
+        for name, stats in scenarios.items():
+            old = before.get("results", {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            lines.append(
+                f"{size:>7} {name:<40} p50 {old['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms ({change:+6.1f}%)"
+                f"  p95 {old['p95_ms']:9.3f} -> {stats['p95_ms']:9.3f} ms"
+            )
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated thoughts per seeded user")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls before each scenario")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic history")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to diff against")
+    args = parser.parse_args(argv)
+
+    # Expected 404s and the like are part of the workload, not news
+    logging.disable(logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = asyncio.run(run(sizes, args.iterations, args.warmup, args.seed))
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered + "\n")
+    else:
+        print(rendered)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before = json.load(f)
+        print("\n".join(compare(before, report)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
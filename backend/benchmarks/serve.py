@@ -0,0 +1,39 @@
+"""
+Serve the app on the offline stand-ins with one uvicorn worker, as the
+target of `python -m benchmarks.loadtest --url ...`.
+
+    python -m benchmarks.serve --users 50 --thoughts 200 --port 8000
+
+The load-test users (load-user-0 .. load-user-N-1) are seeded before the
+server starts; their "user:<uid>/<session>" tokens are accepted by the fake
+verifier. Leave NEO4J_APPLY_SCHEMA unset: the stand-in has no DDL.
+"""
+import argparse
+import sys
+
+import uvicorn
+
+from benchmarks.loadtest import seed_users
+from benchmarks.offline_app import CACHE_BACKENDS, app, offline_backend
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="load-test users to seed")
+    parser.add_argument("--thoughts", type=int, default=200, help="seeded thoughts per user")
+    parser.add_argument("--round-trip-ms", type=float, default=0,
+                        help="simulated database round trip per statement")
+    parser.add_argument("--response-cache", choices=CACHE_BACKENDS, default="memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    graph = seed_users(args.users, args.thoughts, args.seed, args.round_trip_ms / 1000)
+    with offline_backend(graph, cache=args.response_cache):
+        uvicorn.run(app, host=args.host, port=args.port, workers=1, access_log=False, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""Latency summaries shared by the benchmark runner and the load tests."""
+import math
+from typing import Dict, Optional, Sequence
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Linearly interpolated q-th percentile (0..100) of already sorted samples."""
+    if not sorted_samples:
+        return math.nan
+    position = (len(sorted_samples) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def summarize(samples: Sequence[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """
+    Millisecond summary of latencies given in seconds. Throughput is per
+    second of `elapsed` wall time (concurrent runs), or of summed latency
+    when the samples ran one after another.
+    """
+    ordered = sorted(samples)
+    busy = elapsed if elapsed is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4) if ordered else math.nan,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4) if ordered else math.nan,
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else math.nan,
+        "ops_per_sec": round(len(ordered) / busy, 2) if busy else math.nan,
+    }
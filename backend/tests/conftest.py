@@ -1,5 +1,56 @@
 import os
 import sys
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
 
 # Add the backend directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeAsyncResult:
+    """Stands in for a neo4j AsyncResult over `records` (dicts)."""
+
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        async def gen():
+            for record in self._records:
+                yield record
+        return gen()
+
+    async def data(self):
+        return self._records
+
+    async def single(self):
+        return self._records[0] if self._records else None
+
+    async def consume(self):
+        return None
+
+
+@pytest.fixture
+def mock_async_session():
+    """
+    The session every async_db call gets: run() is an AsyncMock to feed
+    FakeAsyncResults, and execute_read/execute_write run the work on it.
+    """
+    session = Mock()
+    session.run = AsyncMock()
+
+    async def execute(work, *args, **kwargs):
+        return await work(session, *args, **kwargs)
+
+    session.execute_read = AsyncMock(side_effect=execute)
+    session.execute_write = AsyncMock(side_effect=execute)
+
+    @asynccontextmanager
+    async def get_session(**config):
+        session.config = config
+        yield session
+
+    # Every service module shares the one async_db instance
+    with patch('app.db.connection.async_db.get_session', get_session):
+        yield session
@@ -0,0 +1,135 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from app.cache.lru_cache import LRUCache
+from app.cache.single_flight import SingleFlight
+from app.dependencies import auth_dependency
+from app.dependencies.auth_dependency import get_current_user
+from app.models.user import User
+from app.monitoring.metrics import AUTH_CACHE_REQUESTS
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    auth_dependency.token_cache.clear()
+    auth_dependency.user_cache.clear()
+    yield
+    auth_dependency.token_cache.clear()
+    auth_dependency.user_cache.clear()
+
+
+@pytest.fixture
+def decoded_token():
+    return {
+        "uid": "test_uid",
+        "email": "test@example.com",
+        "name": "Test User",
+        "exp": time.time() + 3600,
+    }
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_verification_and_lookup(decoded_token):
+    # Arrange
+    user = User(uid="test_uid", email="test@example.com", name="Test User")
+    token = MagicMock(credentials="test_token")
+    lookups = [("token", "hit"), ("token", "miss"), ("user", "hit"), ("user", "miss")]
+    before = {labels: AUTH_CACHE_REQUESTS.value(*labels) for labels in lookups}
+
+    with patch("app.dependencies.auth_dependency.token_verifier.verify", return_value=decoded_token) as mock_verify, \
+         patch("app.dependencies.auth_dependency.get_user_by_firebase_uid_async", return_value=user) as mock_get_user:
+        # Act
+        first = await get_current_user(Mock(), token=token)
+        second = await get_current_user(Mock(), token=token)
+
+    # Assert
+    assert first == second == user
+    assert mock_verify.call_count == 1
+    assert mock_get_user.call_count == 1
+    # One miss then one hit per cache, as exported on /metrics
+    assert all(AUTH_CACHE_REQUESTS.value(*labels) == before[labels] + 1 for labels in lookups)
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_verified_again(decoded_token):
+    # Arrange
+    decoded_token["exp"] = time.time() - 1
+    user = User(uid="test_uid", email="test@example.com")
+    token = MagicMock(credentials="test_token")
+
+    with patch("app.dependencies.auth_dependency.token_verifier.verify", return_value=decoded_token) as mock_verify, \
+         patch("app.dependencies.auth_dependency.get_user_by_firebase_uid_async", return_value=user):
+        # Act
+        await get_current_user(Mock(), token=token)
+        await get_current_user(Mock(), token=token)
+
+    # Assert
+    assert mock_verify.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_is_not_cached():
+    token = MagicMock(credentials="invalid_token")
+
+    with patch("app.dependencies.auth_dependency.token_verifier.verify", side_effect=Exception("bad token")):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(Mock(), token=token)
+
+    assert exc_info.value.status_code == 401
+    assert len(auth_dependency.token_cache) == 0
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_requests_provision_user_once(decoded_token):
+    # Arrange: the user doesn't exist yet and the lookup is slow
+    created = User(uid="test_uid", email="test@example.com", name="Test User")
+
+    async def slow_lookup(uid):
+        await asyncio.sleep(0.01)
+        return None
+
+    with patch("app.dependencies.auth_dependency.token_verifier.verify", return_value=decoded_token) as mock_verify, \
+         patch("app.dependencies.auth_dependency.get_user_by_firebase_uid_async", side_effect=slow_lookup), \
+         patch("app.dependencies.auth_dependency.create_user_async", new_callable=AsyncMock, return_value=created) as mock_create:
+        # Act
+        users = await asyncio.gather(*[
+            get_current_user(Mock(), token=MagicMock(credentials="test_token"))
+            for _ in range(10)
+        ])
+
+    # Assert
+    assert all(user == created for user in users)
+    assert mock_verify.call_count == 1
+    assert mock_create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_failures_and_releases_key():
+    flight = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
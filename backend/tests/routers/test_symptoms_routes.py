@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from app.main import app
+from app.models.symptom import Symptom
+
+client = TestClient(app)
+
+@pytest.fixture
+def mock_catalog():
+    symptoms = [Symptom(id="4:abc:1", name="racing heart")]
+    with patch('app.routes.symptoms.get_symptom_catalog', new_callable=AsyncMock) as mock_get_catalog:
+        mock_get_catalog.return_value = (symptoms, "v1")
+        yield mock_get_catalog
+
+def test_get_all_symptoms_sets_etag(mock_catalog):
+    response = client.get("/symptoms/")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"v1"'
+    assert response.json()["symptoms"][0]["name"] == "racing heart"
+
+def test_get_all_symptoms_not_modified(mock_catalog):
+    response = client.get("/symptoms/", headers={"If-None-Match": 'W/"v0", "v1"'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_get_all_symptoms_changed_catalog(mock_catalog):
+    response = client.get("/symptoms/", headers={"If-None-Match": '"v0"'})
+
+    assert response.status_code == 200
+    assert len(response.json()["symptoms"]) == 1
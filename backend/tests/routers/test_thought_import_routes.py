@@ -0,0 +1,35 @@
+import json
+import pytest
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from app.dependencies.auth_dependency import get_current_user
+from app.main import app
+
+client = TestClient(app)
+
+@pytest.fixture
+def signed_in():
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(uid="test_uid")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+def test_import_rejects_oversized_array_before_reading_it(signed_in):
+    body = json.dumps([{"emotion": "Joy", "title": "x" * 100}] * 10)
+
+    with patch('app.routes.thoughts.MAX_IMPORT_BYTES', 200), \
+         patch('app.routes.thoughts.import_thoughts_async', new_callable=AsyncMock) as import_thoughts:
+        response = client.post("/thought-records/bulk", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 413
+    import_thoughts.assert_not_called()
+
+def test_import_counts_body_bytes_without_content_length(signed_in):
+    def chunks():
+        for _ in range(10):
+            yield b" " * 100
+
+    with patch('app.routes.thoughts.MAX_IMPORT_BYTES', 500):
+        response = client.post("/thought-records/bulk", content=chunks(), headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 413
@@ -1,42 +1,36 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from app.main import app
-from app.services.emotion_service import add_emotion, get_all_emotions_from_db
+from app.services.emotion_service import add_emotion_async, get_all_emotions_async
+from tests.conftest import FakeAsyncResult
 
 @pytest.fixture
 def client():
     return TestClient(app)
 
-@pytest.fixture
-def mock_neo4j_session():
-    with patch('app.services.emotion_service.db.get_session') as mock_get_session:
-        mock_session = Mock()
-        mock_get_session.return_value.__enter__.return_value = mock_session
-        yield mock_session
-
-def test_add_emotion(mock_neo4j_session):
+@pytest.mark.asyncio
+async def test_add_emotion(mock_async_session):
     # Arrange
-    mock_result = Mock()
-    mock_result.single.return_value = {
+    mock_async_session.run.return_value = FakeAsyncResult([{
         "e": {
             "id": "test_id",
             "name": "Test Emotion",
             "description": "Test Description"
         }
-    }
-    mock_neo4j_session.run.return_value = mock_result
+    }])
 
     # Act
-    result = add_emotion("Test Emotion", "Test Description")
+    result = await add_emotion_async("Test Emotion", "Test Description")
 
     # Assert
     assert result is not None
     assert result.id == "test_id"
     assert result.name == "Test Emotion"
-    mock_neo4j_session.run.assert_called_once()
+    mock_async_session.run.assert_called_once()
 
-def test_get_all_emotions(mock_neo4j_session):
+@pytest.mark.asyncio
+async def test_get_all_emotions(mock_async_session):
     # Arrange
     mock_results = [
         {
@@ -54,13 +48,54 @@ def test_get_all_emotions(mock_neo4j_session):
             }
         }
     ]
-    mock_neo4j_session.run.return_value = mock_results
+    mock_async_session.run.return_value = FakeAsyncResult(mock_results)
 
     # Act
-    results = get_all_emotions_from_db()
+    results = await get_all_emotions_async()
 
     # Assert
     assert len(results) == 2
     assert results[0].id == "test_id_1"
     assert results[1].id == "test_id_2"
 
+
+@pytest.mark.asyncio
+async def test_emotion_index_is_cached_until_invalidated(mock_async_session):
+    from app.models.emotion import Emotion
+    from app.services import emotion_service
+
+    loader = AsyncMock(return_value=[Emotion(id="1", name="Joy")])
+    emotion_service.invalidate_emotion_cache()
+
+    with patch.object(emotion_service._emotion_cache, "_loader", loader):
+        assert await emotion_service.is_valid_emotion("Joy")
+        assert not await emotion_service.is_valid_emotion("Rage")
+        assert list(await emotion_service.get_emotion_index()) == ["Joy"]
+        assert loader.await_count == 1
+
+        # Adding an emotion drops the cached catalog
+        mock_async_session.run.return_value = FakeAsyncResult([
+            {"e": {"id": "2", "name": "Rage", "description": None}}
+        ])
+        await add_emotion_async("Rage")
+        loader.return_value = [Emotion(id="1", name="Joy"), Emotion(id="2", name="Rage")]
+
+        assert await emotion_service.is_valid_emotion("Rage")
+        assert loader.await_count == 2
+
+    emotion_service.invalidate_emotion_cache()
+
+
+def test_get_all_emotions_route_keeps_duplicate_names(client):
+    from app.models.emotion import Emotion
+    from app.services import emotion_service
+
+    loader = AsyncMock(return_value=[Emotion(id="1", name="Joy"), Emotion(id="2", name="Joy")])
+    emotion_service.invalidate_emotion_cache()
+
+    with patch.object(emotion_service._emotion_cache, "_loader", loader):
+        response = client.get("/emotions/")
+
+    emotion_service.invalidate_emotion_cache()
+    assert response.status_code == 200
+    assert [emotion["id"] for emotion in response.json()["emotions"]] == ["1", "2"]
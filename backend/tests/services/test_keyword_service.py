@@ -0,0 +1,33 @@
+from app.services.keyword_service import (
+    build_stopwords,
+    stored_term_counts,
+    term_counts,
+    thought_terms,
+    tokenize,
+)
+
+
+def test_tokenize_drops_portuguese_and_english_stopwords():
+    words = tokenize("Fiquei ansioso porque a reunião, because the meeting, foi adiada 2x!")
+
+    assert words == ["fiquei", "ansioso", "reunião", "meeting", "adiada"]
+
+
+def test_tokenize_normalizes_case_and_unicode():
+    # "Coração" spelled with a combining cedilla and tilde
+    assert tokenize("CORAÇÃO coração Coração") == ["coração"] * 3
+
+
+def test_tokenize_with_custom_stopwords():
+    stopwords = build_stopwords(["en"], extra=["Trabalho"])
+
+    assert tokenize("Trabalho cansativo", stopwords) == ["cansativo"]
+
+
+def test_thought_terms_round_trip():
+    terms, counts = thought_terms("Medo da prova", "A prova de cálculo amanhã")
+
+    assert terms == ["amanhã", "cálculo", "medo", "prova"]
+    assert counts == [1, 1, 1, 2]
+    assert stored_term_counts(terms, counts) == term_counts("Medo da prova", "A prova de cálculo amanhã")
+    assert stored_term_counts(None, None) == {}
@@ -0,0 +1,48 @@
+import pytest
+from app.services.search_service import (
+    build_fulltext_query,
+    decode_search_cursor,
+    encode_search_cursor,
+    highlight,
+    search_terms,
+)
+
+
+def test_search_terms_strip_lucene_syntax():
+    assert search_terms('Chefe AND "reunião"* OR title:(x) chefe') == ["chefe", "and", "reunião", "or", "title", "x"]
+
+
+def test_build_fulltext_query_scopes_to_user():
+    query = build_fulltext_query('uid"1', ["chefe", "reunião"])
+
+    assert query.startswith('+user_id:"uid\\"1" +(')
+    assert "title:(chefe reunião)" in query
+    assert "underlying_belief:(chefe reunião)" in query
+
+
+def test_build_fulltext_query_requires_terms():
+    with pytest.raises(ValueError):
+        build_fulltext_query("uid", [])
+
+
+def test_highlight_escapes_and_marks_matches():
+    assert highlight("O <chefe> gritou. Chefe!", ["chefe"]) == (
+        "O &lt;<mark>chefe</mark>&gt; gritou. <mark>Chefe</mark>!"
+    )
+    assert highlight("Nada aqui", ["chefe"]) is None
+
+
+def test_highlight_cuts_long_text_around_first_match():
+    text = "palavra " * 60 + "reunião " + "fim " * 60
+
+    snippet = highlight(text, ["reunião"])
+
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>reunião</mark>" in snippet
+    assert len(snippet) < len(text)
+
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(40)) == 40
+    with pytest.raises(ValueError):
+        decode_search_cursor("garbage")
@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timezone
+from app.db.queries import query_registry
+from app.services.stats_service import (
+    _rebuild_user_stats_tx,
+    stats_from_records,
+    thought_deltas,
+    time_range,
+    top,
+)
+from tests.conftest import FakeAsyncResult
+
+
+def test_thought_deltas_for_new_thought():
+    timestamp = datetime(2025, 3, 10, 6, 30, tzinfo=timezone.utc)
+
+    deltas = thought_deltas("Fear", timestamp, ["racing heart", "racing heart", "sweaty palms"])
+
+    assert deltas == {
+        ("total", ""): 1,
+        ("emotion", "Fear"): 1,
+        ("hour", "6"): 1,
+        ("day", "2025-03-10"): 1,
+        ("symptom", "racing heart"): 1,
+        ("symptom", "sweaty palms"): 1,
+        ("symptom_range", "Morning|racing heart"): 1,
+        ("symptom_range", "Morning|sweaty palms"): 1,
+    }
+
+
+def test_thought_deltas_for_update_cancel_out_unchanged_counters():
+    old_timestamp = datetime(2025, 3, 10, 6, 30, tzinfo=timezone.utc)
+    new_timestamp = datetime(2025, 3, 10, 23, 30, tzinfo=timezone.utc)
+
+    deltas = thought_deltas("Fear", old_timestamp, [], sign=-1)
+    thought_deltas("Joy", new_timestamp, [], deltas=deltas)
+
+    assert deltas[("total", "")] == 0
+    assert deltas[("day", "2025-03-10")] == 0
+    assert deltas[("emotion", "Fear")] == -1
+    assert deltas[("emotion", "Joy")] == 1
+    assert deltas[("hour", "6")] == -1
+    assert deltas[("hour", "23")] == 1
+
+
+def test_thought_deltas_add_keyword_term_counts():
+    timestamp = datetime(2025, 3, 10, 6, 30, tzinfo=timezone.utc)
+
+    deltas = thought_deltas("Fear", timestamp, [], sign=-1, terms={"prova": 2, "medo": 1})
+
+    assert deltas[("keyword", "prova")] == -2
+    assert deltas[("keyword", "medo")] == -1
+
+
+@pytest.mark.parametrize("hour, expected", [
+    (4, "Dawn"), (5, "Morning"), (12, "Afternoon"), (18, "Night"), (23, "Dawn"),
+])
+def test_time_range(hour, expected):
+    assert time_range(hour) == expected
+
+
+def test_stats_from_records_requires_total():
+    assert stats_from_records([{"kind": "emotion", "key": "Fear", "count": 1}]) is None
+
+    stats = stats_from_records([{"kind": "total", "key": "", "count": 0}])
+    assert stats["total"][""] == 0
+    assert stats["emotion"] == {}
+
+
+def test_top_breaks_ties_by_key():
+    assert top({"b": 2, "a": 2, "c": 5}, 2) == [("c", 5), ("a", 2)]
+
+
+class _FakeTx:
+    def __init__(self, stats_rows):
+        self.stats_rows = stats_rows
+        self.statements = []
+
+    async def run(self, query, **params):
+        name = query_registry.name_of(query)
+        self.statements.append(name)
+        return FakeAsyncResult(self.stats_rows if name == "stats.read" else [])
+
+
+async def test_rebuild_locks_the_user_before_reading_thoughts():
+    tx = _FakeTx([])
+
+    await _rebuild_user_stats_tx(tx, "u1")
+
+    assert tx.statements[0] == "stats.lock"
+    # Legacy symptom lists become edges before the thoughts are counted
+    assert tx.statements.index("stats.link_legacy_symptoms") < tx.statements.index("stats.thought_facts")
+
+
+async def test_rebuild_if_missing_keeps_counters_found_on_the_leader():
+    tx = _FakeTx([{"kind": "total", "key": "", "count": 3}])
+
+    stats = await _rebuild_user_stats_tx(tx, "u1", only_if_missing=True)
+
+    assert stats == {"total": {"": 3}}
+    assert tx.statements == ["stats.lock", "stats.read"]
@@ -0,0 +1,386 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+from app.models.thought import Thought
+from app.services.thought_service import (
+    decode_cursor,
+    delete_thought_async,
+    encode_cursor,
+    get_insights_summary_async,
+    get_thought_patterns_async,
+    get_user_thoughts_async,
+    import_thoughts_async,
+    parse_fields,
+    search_thoughts_async,
+    stream_user_thoughts,
+    unknown_symptoms,
+    update_thought_async,
+)
+from tests.conftest import FakeAsyncResult
+
+
+@pytest.mark.asyncio
+async def test_get_thought_patterns_async(mock_async_session):
+    # Arrange
+    mock_async_session.run.return_value = FakeAsyncResult([
+        {"kind": "total", "key": "", "count": 6},
+        {"kind": "emotion", "key": "Anger", "count": 2},
+        {"kind": "emotion", "key": "Fear", "count": 4},
+    ])
+
+    # Act
+    result = await get_thought_patterns_async("test_uid")
+
+    # Assert: read from the materialized counters, no history scan
+    assert result == [{"emotion": "Fear", "count": 4}, {"emotion": "Anger", "count": 2}]
+    assert mock_async_session.run.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_user_thoughts_async(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    mock_async_session.run.return_value = FakeAsyncResult([
+        {"r": {
+            "id": "thought_1",
+            "user_id": "test_uid",
+            "timestamp": timestamp,
+            "title": "Example",
+            "emotion": "Anxiety",
+        }}
+    ])
+
+    # Act
+    result = await get_user_thoughts_async("test_uid", emotion="Anxiety")
+
+    # Assert
+    assert len(result) == 1
+    assert result[0].id == "thought_1"
+    assert result[0].timestamp == timestamp
+    _, params = mock_async_session.run.call_args.args
+    assert params["emotion"] == "Anxiety"
+
+
+@pytest.mark.asyncio
+async def test_update_thought_async_is_scoped_to_owner(mock_async_session):
+    # Arrange: the ownership-scoped MATCH finds nothing for another user's record
+    mock_async_session.run.return_value = FakeAsyncResult([])
+
+    # Act
+    result = await update_thought_async("other_uid", "thought_1", {"title": "Hijacked"})
+
+    # Assert
+    assert result is None
+    query = mock_async_session.run.call_args.args[0]
+    kwargs = mock_async_session.run.call_args.kwargs
+    assert "(:User {uid: $user_id})-[:HAS_RECORD]->(r:Thought {id: $record_id})" in query
+    assert kwargs["user_id"] == "other_uid"
+    assert kwargs["record_id"] == "thought_1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("symptoms, symptom_match, anchor", [
+    (["Racing Heart"], "all", "WITH DISTINCT r"),
+    (["racing heart", "sweaty palms"], "any", "WITH DISTINCT r"),
+    (["racing heart", "sweaty palms", "racing heart"], "all", "WHERE matched = size($symptoms)"),
+])
+async def test_get_user_thoughts_async_traverses_from_symptoms(mock_async_session, symptoms, symptom_match, anchor):
+    # Arrange
+    mock_async_session.run.return_value = FakeAsyncResult([])
+
+    # Act
+    await get_user_thoughts_async("test_uid", symptoms=symptoms, symptom_match=symptom_match, limit=10)
+
+    # Assert: anchored on the Symptom index, not a scan of the user's history
+    query, params = mock_async_session.run.call_args.args
+    assert query.lstrip().startswith("MATCH (s:Symptom) WHERE s.name IN $symptoms")
+    assert anchor in query
+    assert "r.symptoms" not in query
+    assert params["symptoms"] == sorted({symptom.lower() for symptom in symptoms})
+
+
+@pytest.mark.asyncio
+async def test_get_user_thoughts_async_rejects_unknown_symptom_match(mock_async_session):
+    with pytest.raises(ValueError):
+        await get_user_thoughts_async("test_uid", symptoms=["racing heart"], symptom_match="some")
+
+
+@pytest.mark.asyncio
+async def test_search_thoughts_async(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    mock_async_session.run.return_value = FakeAsyncResult([{
+        "r": {
+            "id": "thought_1", "user_id": "test_uid", "timestamp": timestamp, "emotion": "Fear",
+            "title": "Reunião com o chefe", "situation_description": "Apresentação",
+            "underlying_belief": None, "symptoms": ["racing heart"],
+        },
+        "score": 1.5,
+    }])
+
+    # Act
+    hits, next_offset = await search_thoughts_async("test_uid", "chefe", limit=10, offset=20)
+
+    # Assert: one row past the page is asked for, and there is none
+    _, params = mock_async_session.run.call_args.args
+    assert params["skip"] == 20 and params["limit"] == 11
+    assert params["query"].startswith('+user_id:"test_uid"')
+    assert next_offset is None
+    assert hits[0].thought.id == "thought_1"
+    assert hits[0].score == 1.5
+    assert hits[0].highlights == {"title": "Reunião com o <mark>chefe</mark>"}
+
+
+def _search_row(thought_id):
+    # Someone else's thought comes back as a null record
+    record = None if thought_id is None else {
+        "id": thought_id, "user_id": "test_uid", "timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "emotion": "Fear", "title": "chefe", "situation_description": None, "underlying_belief": None,
+        "symptoms": [],
+    }
+    return {"r": record, "score": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_search_thoughts_async_pages_by_index_rows(mock_async_session):
+    # Arrange: a foreign hit inside the first index page
+    mock_async_session.run.return_value = FakeAsyncResult([_search_row(row) for row in ["t1", None, "t2", "t3"]])
+
+    # Act
+    hits, next_offset = await search_thoughts_async("test_uid", "chefe", limit=2)
+
+    # Assert: the page is full and the next one starts after the rows it used
+    assert [hit.thought.id for hit in hits] == ["t1", "t2"]
+    assert next_offset == 3
+
+
+@pytest.mark.asyncio
+async def test_search_thoughts_async_reads_on_past_foreign_hits(mock_async_session):
+    # Arrange: the first index page holds only one of the user's thoughts
+    mock_async_session.run.side_effect = [
+        FakeAsyncResult([_search_row(row) for row in [None, "t1", None]]),
+        FakeAsyncResult([_search_row("t2")]),
+    ]
+
+    # Act
+    hits, next_offset = await search_thoughts_async("test_uid", "chefe", limit=2, offset=4)
+
+    # Assert
+    assert [hit.thought.id for hit in hits] == ["t1", "t2"]
+    assert next_offset is None
+    assert [call.args[1]["skip"] for call in mock_async_session.run.call_args_list] == [4, 7]
+
+
+@pytest.mark.asyncio
+async def test_update_thought_async_moves_keyword_counts(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    updated = {
+        "id": "thought_1", "user_id": "test_uid", "timestamp": timestamp, "emotion": "Fear",
+        "title": "Reunião de trabalho", "situation_description": "O chefe criticou o trabalho",
+    }
+    mock_async_session.run.return_value = FakeAsyncResult([{
+        "r": updated,
+        "old_emotion": "Fear", "old_timestamp": timestamp, "old_symptoms": [],
+        "old_terms": ["prova"], "old_term_counts": [2],
+        "linked_symptoms": [],
+    }])
+
+    # Act
+    await update_thought_async("test_uid", "thought_1", {
+        "title": updated["title"], "situation_description": updated["situation_description"],
+    })
+
+    # Assert: terms are extracted before the write and stored by the SET itself
+    update_call, stats_call = mock_async_session.run.call_args_list
+    assert update_call.kwargs["updates"]["terms"] == ["chefe", "criticou", "reunião", "trabalho"]
+    assert update_call.kwargs["updates"]["term_counts"] == [1, 1, 1, 2]
+    deltas = {(d["kind"], d["key"]): d["delta"] for d in stats_call.kwargs["deltas"]}
+    assert deltas[("keyword", "prova")] == -2
+    assert deltas[("keyword", "trabalho")] == 2
+    assert ("total", "") not in deltas
+
+
+@pytest.mark.asyncio
+async def test_delete_thought_async(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    mock_async_session.run.return_value = FakeAsyncResult([{
+        "deleted": 1,
+        "removed": [{"emotion": "Joy", "timestamp": timestamp, "symptoms": ["racing heart"]}],
+    }])
+
+    # Act
+    with patch('app.services.thought_service.response_cache.invalidate', new_callable=AsyncMock) as invalidate:
+        result = await delete_thought_async("test_uid", "thought_1")
+
+    # Assert
+    assert result is True
+    invalidate.assert_awaited_once_with("test_uid")
+    _, kwargs = mock_async_session.run.call_args
+    deltas = {(d["kind"], d["key"]): d["delta"] for d in kwargs["deltas"]}
+    assert deltas[("total", "")] == -1
+    assert deltas[("emotion", "Joy")] == -1
+    assert deltas[("symptom_range", "Afternoon|racing heart")] == -1
+
+
+@pytest.mark.asyncio
+async def test_get_user_thoughts_async_resumes_from_cursor(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    last_seen = Thought(id="thought_9", user_id="test_uid", timestamp=timestamp, emotion="Joy")
+    mock_async_session.run.return_value = FakeAsyncResult([])
+
+    # Act
+    await get_user_thoughts_async("test_uid", limit=20, cursor=encode_cursor(last_seen), fields=["title"])
+
+    # Assert
+    query, params = mock_async_session.run.call_args.args
+    assert "LIMIT $limit" in query
+    assert params["limit"] == 20
+    assert params["cursor_ts"] == timestamp
+    assert params["cursor_id"] == "thought_9"
+    assert params["fields"] == ["title"]
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_unknown_symptoms_are_checked_after_normalizing():
+    catalog = frozenset({"racing heart", "sweaty palms"})
+
+    assert unknown_symptoms([" Racing Heart", "sweaty palms", ""], catalog) == []
+    assert unknown_symptoms(["racing heart", "Tremor"], catalog) == ["tremor"]
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("id, title,emotion") == ["title"]
+    with pytest.raises(ValueError):
+        parse_fields("title,password")
+
+
+@pytest.mark.asyncio
+async def test_stream_user_thoughts_uses_bounded_fetch(mock_async_session):
+    # Arrange
+    timestamp = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    mock_async_session.run.return_value = FakeAsyncResult([
+        {"r": {"id": f"thought_{i}", "user_id": "test_uid", "timestamp": timestamp, "emotion": "Joy"}}
+        for i in range(3)
+    ])
+
+    # Act
+    exported = [thought.id async for thought in stream_user_thoughts("test_uid")]
+
+    # Assert
+    assert exported == ["thought_0", "thought_1", "thought_2"]
+    assert mock_async_session.config["fetch_size"] > 0
+
+
+@pytest.mark.asyncio
+async def test_get_insights_summary_async_reads_counters_only(mock_async_session):
+    # Arrange
+    mock_async_session.run.return_value = FakeAsyncResult([
+        {"kind": "total", "key": "", "count": 4},
+        {"kind": "emotion", "key": "Fear", "count": 3},
+        {"kind": "emotion", "key": "Joy", "count": 1},
+        {"kind": "symptom", "key": "racing heart", "count": 2},
+        {"kind": "hour", "key": "22", "count": 3},
+        {"kind": "hour", "key": "8", "count": 1},
+        {"kind": "day", "key": "2025-01-01", "count": 2},
+        {"kind": "day", "key": "2025-01-02", "count": 1},
+        {"kind": "day", "key": "2025-01-03", "count": 1},
+        {"kind": "keyword", "key": "trabalho", "count": 3},
+        {"kind": "keyword", "key": "work", "count": 2},
+        {"kind": "keyword", "key": "porque", "count": 9},
+    ])
+
+    # Act
+    result = await get_insights_summary_async("test_uid")
+
+    # Assert
+    assert mock_async_session.run.call_count == 1
+    assert result == {
+        "total_thoughts": 4,
+        "top_emotions": ["Fear", "Joy"],
+        "most_common_symptom": "racing heart",
+        "common_time_ranges": ["22h - 24h", "8h - 10h"],
+        "frequent_keywords": ["trabalho", "work"],
+        "active_days": 3,
+    }
+
+
+async def _items(raw_items):
+    for index, item in enumerate(raw_items):
+        yield index, item
+
+
+@pytest.mark.asyncio
+async def test_import_thoughts_async_batches_and_reports_item_errors(mock_async_session):
+    # Arrange: five valid items, one unknown emotion, one unknown symptom, one parse error
+    mock_async_session.run.side_effect = lambda query, **params: FakeAsyncResult(
+        [{"created": len(params["rows"])}] if "rows" in params else []
+    )
+    valid = {"emotion": "Joy", "timestamp": "2025-01-01T12:00:00Z", "symptoms": [" Racing Heart "]}
+    raw_items = [valid] * 3 + [
+        {"emotion": "Bliss"},
+        {"emotion": "Joy", "symptoms": ["levitation"]},
+        ValueError("Invalid JSON"),
+    ] + [valid] * 2
+
+    # Act
+    report = await import_thoughts_async(
+        "test_uid", _items(raw_items),
+        emotions=frozenset({"Joy"}), symptoms=frozenset({"racing heart"}), batch_size=2
+    )
+
+    # Assert
+    assert report["created"] == 5
+    assert [error["index"] for error in report["errors"]] == [3, 4, 5]
+    assert "Bliss" in report["errors"][0]["error"]
+    batches = [call.kwargs["rows"] for call in mock_async_session.run.call_args_list if "rows" in call.kwargs]
+    assert [len(rows) for rows in batches] == [2, 2, 1]
+    assert batches[0][0]["symptoms"] == ["racing heart"]
+
+
+@pytest.mark.asyncio
+async def test_import_thoughts_async_reports_failed_batch(mock_async_session):
+    # Arrange
+    mock_async_session.run.side_effect = RuntimeError("database unavailable")
+
+    # Act
+    report = await import_thoughts_async(
+        "test_uid", _items([{"emotion": "Joy"}, {"emotion": "Joy"}]),
+        emotions=frozenset({"Joy"}), symptoms=frozenset(), batch_size=10
+    )
+
+    # Assert: the driver's message stays in the logs
+    assert report["created"] == 0
+    assert [error["index"] for error in report["errors"]] == [0, 1]
+    assert all(error["error"] == "Write failed" for error in report["errors"])
+
+
+@pytest.mark.asyncio
+async def test_import_thoughts_async_keeps_committed_batches_when_upload_breaks(mock_async_session):
+    # Arrange
+    mock_async_session.run.side_effect = lambda query, **params: FakeAsyncResult(
+        [{"created": len(params["rows"])}] if "rows" in params else []
+    )
+
+    async def broken_upload():
+        for index in range(3):
+            yield index, {"emotion": "Joy"}
+        raise RuntimeError("client disconnected")
+
+    # Act
+    report = await import_thoughts_async(
+        "test_uid", broken_upload(), emotions=frozenset({"Joy"}), symptoms=frozenset(), batch_size=2
+    )
+
+    # Assert: the items read are written, then the stop is reported at the next index
+    assert report["created"] == 3
+    assert report["errors"] == [
+        {"index": 3, "error": "Upload interrupted; this and later items were not imported"}
+    ]
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from app.services.token_verifier import JWKSTokenVerifier, TokenVerificationError
+
+PROJECT_ID = "test-project"
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def make_token(private_key, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "test_uid",
+        "iat": now,
+        "auth_time": now,
+        "exp": now + 3600,
+        "email": "test@example.com",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key():
+    return make_key("key-1")
+
+
+@pytest.fixture
+def verifier(signing_key):
+    _, jwk = signing_key
+    verifier = JWKSTokenVerifier(project_id=PROJECT_ID)
+    verifier.load_jwks({"keys": [jwk]}, max_age=3600)
+    return verifier
+
+
+def test_verify_valid_token(verifier, signing_key):
+    private_key, _ = signing_key
+
+    claims = verifier.verify(make_token(private_key, "key-1"))
+
+    assert claims["uid"] == "test_uid"
+    assert claims["email"] == "test@example.com"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"aud": "other-project"},
+    {"iss": "https://securetoken.google.com/other-project"},
+    {"exp": int(time.time()) - 3600},
+    {"sub": ""},
+])
+def test_verify_rejects_invalid_claims(verifier, signing_key, overrides):
+    private_key, _ = signing_key
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, "key-1", **overrides))
+
+
+def test_verify_rejects_foreign_signature(verifier):
+    other_key, _ = make_key("key-1")
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(other_key, "key-1"))
+
+
+def test_verify_rejects_unknown_key_id(verifier, signing_key):
+    private_key, _ = signing_key
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, "rotated-key"))
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_picks_up_rotated_keys(signing_key):
+    # Arrange: the first fetch serves key-1, later ones the rotated key-2
+    _, old_jwk = signing_key
+    new_private_key, new_jwk = make_key("key-2")
+    fetches = []
+
+    async def fetcher():
+        fetches.append(time.time())
+        return {"keys": [old_jwk] if len(fetches) == 1 else [new_jwk]}, 0.0
+
+    verifier = JWKSTokenVerifier(project_id=PROJECT_ID, fetcher=fetcher, refresh_margin=0, min_refresh_interval=0.01)
+
+    # Act
+    await verifier.start()
+    assert verifier.key_ids == {"key-1"}
+    await asyncio.sleep(0.05)
+    await verifier.stop()
+
+    # Assert
+    assert len(fetches) >= 2
+    assert verifier.key_ids == {"key-2"}
+    assert verifier.verify(make_token(new_private_key, "key-2"))["uid"] == "test_uid"
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_current_keys(signing_key):
+    private_key, jwk = signing_key
+    calls = 0
+
+    async def fetcher():
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise RuntimeError("network down")
+        return {"keys": [jwk]}, 0.0
+
+    verifier = JWKSTokenVerifier(project_id=PROJECT_ID, fetcher=fetcher, refresh_margin=0, min_refresh_interval=0.01)
+
+    await verifier.start()
+    await asyncio.sleep(0.05)
+    await verifier.stop()
+
+    assert calls >= 2
+    assert verifier.verify(make_token(private_key, "key-1"))["uid"] == "test_uid"
@@ -7,6 +7,8 @@ from backend.app.models.user import User
 def mock_neo4j_session():
     with patch('app.services.user_service.db.get_session') as mock_get_session:
         mock_session = Mock()
+        mock_session.execute_read.side_effect = lambda work, *args, **kwargs: work(mock_session, *args, **kwargs)
+        mock_session.execute_write.side_effect = lambda work, *args, **kwargs: work(mock_session, *args, **kwargs)
         mock_get_session.return_value.__enter__.return_value = mock_session
         yield mock_session
 
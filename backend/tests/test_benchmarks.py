@@ -0,0 +1,47 @@
+import asyncio
+from collections import Counter
+
+from benchmarks import loadtest, run as bench
+from benchmarks.graph_standin import InMemoryGraph, standin_database
+from benchmarks.stats import percentile, summarize
+from app.services import thought_service
+
+
+def test_percentile_interpolates():
+    samples = [0.001, 0.002, 0.003, 0.004]
+
+    assert percentile(samples, 50) == 0.0025
+    assert percentile(samples, 100) == 0.004
+    assert summarize(samples)["p50_ms"] == 2.5
+
+
+def test_standin_counters_match_seeded_history():
+    graph = InMemoryGraph()
+    graph.seed_catalogs()
+    graph.seed_user("u1", thoughts=200)
+    thoughts = graph._user_thoughts("u1")
+
+    with standin_database(graph):
+        counted = asyncio.run(thought_service.get_insights_summary_async("u1"))
+
+    emotions = Counter(thought["emotion"] for thought in thoughts)
+    assert counted["total_thoughts"] == 200
+    assert counted["active_days"] == len({thought["timestamp"].date() for thought in thoughts})
+    assert [emotions[emotion] for emotion in counted["top_emotions"]] == [count for _, count in emotions.most_common(3)]
+
+
+def test_run_reports_every_scenario():
+    report = asyncio.run(bench.run([10], iterations=3, warmup=1))
+
+    scenarios = report["results"]["10"]
+    assert {"service.create_thought", "route.update_thought.foreign", "route.delete_thought.own"} <= set(scenarios)
+    assert all(stats["count"] == 3 for stats in scenarios.values())
+
+
+def test_loadtest_replays_the_journey_without_errors():
+    report = asyncio.run(loadtest.run(users=3, duration=0.2, thoughts=20))
+
+    endpoints = report["endpoints"]
+    assert list(endpoints) == [step.name for step in loadtest.JOURNEY] + ["total"]
+    assert all(stats["count"] > 0 and stats["errors"] == 0 for stats in endpoints.values())
+    assert endpoints["total"]["count"] == sum(endpoints[step.name]["count"] for step in loadtest.JOURNEY)
@@ -0,0 +1,76 @@
+import io
+import json
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config.logging_config import (
+    DebugSamplingFilter,
+    JsonFormatter,
+    RequestIdFilter,
+    configure_logging,
+    request_id_var,
+    shutdown_logging,
+)
+from app.monitoring.middleware import RequestIdMiddleware
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    token = request_id_var.set("req-1")
+    try:
+        record = _record(uid="u1")
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "req-1"
+    assert entry["uid"] == "u1"
+
+
+def test_debug_sampling_only_drops_debug_records():
+    sampler = DebugSamplingFilter(rate=0)
+
+    assert sampler.filter(_record(level=logging.DEBUG)) is False
+    assert sampler.filter(_record(level=logging.WARNING)) is True
+    assert DebugSamplingFilter(rate=1).filter(_record(level=logging.DEBUG)) is True
+
+
+def test_queue_handler_writes_from_background_thread():
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+    try:
+        logging.getLogger("app.test").info("queued %d", 1, extra={"uid": "u1"})
+        logging.getLogger("app.test").debug("below the level")
+    finally:
+        shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == ["queued 1"]
+    assert lines[0]["uid"] == "u1"
+
+
+def test_request_id_middleware_propagates_or_generates_ids():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/")
+    def read_request_id():
+        return {"request_id": request_id_var.get()}
+
+    client = TestClient(app)
+    given = client.get("/", headers={"X-Request-ID": "abc-123"})
+    generated = client.get("/", headers={"X-Request-ID": "not a valid id!"})
+
+    assert given.headers["X-Request-ID"] == "abc-123"
+    assert given.json()["request_id"] == "abc-123"
+    assert generated.headers["X-Request-ID"] != "not a valid id!"
+    assert generated.json()["request_id"] == generated.headers["X-Request-ID"]
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.db.queries import TrackedSession, register_query
+from app.monitoring.metrics import (
+    CYPHER_AVAILABLE_AFTER,
+    CYPHER_DURATION,
+    CYPHER_ROWS,
+    HTTP_REQUEST_DURATION,
+    MetricsRegistry,
+)
+from app.monitoring.middleware import LatencyMiddleware
+from app.routes import metrics as metrics_routes
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3, "/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.55' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("rows_total", "Rows.", ("statement",))
+
+    counter.inc('say "hi"', amount=2)
+
+    assert 'rows_total{statement="say \\"hi\\""} 2' in registry.render()
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(LatencyMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: str):
+        return {"id": item_id}
+
+    before = HTTP_REQUEST_DURATION.count("GET", "/items/{item_id}", "200")
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert HTTP_REQUEST_DURATION.count("GET", "/items/{item_id}", "200") == before + 2
+    assert HTTP_REQUEST_DURATION.count("GET", "unmatched", "404") >= 1
+
+
+def test_metrics_endpoint_requires_the_token():
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+    client = TestClient(app)
+
+    with patch("app.monitoring.metrics.METRICS_TOKEN", "s3cret"):
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
+
+    with patch("app.monitoring.metrics.METRICS_TOKEN", ""):
+        assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+class FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def consume(self):
+        return SimpleNamespace(result_available_after=4, result_consumed_after=2)
+
+
+def test_tracked_session_times_statements_by_name():
+    query = register_query("test.metrics_statement", "MATCH (n:MetricsTest) RETURN n")
+    session = SimpleNamespace(run=lambda text, *args, **kwargs: FakeResult([{"n": 1}, {"n": 2}]))
+    before = CYPHER_DURATION.count("test.metrics_statement")
+
+    rows = list(TrackedSession(session).run(query))
+
+    assert len(rows) == 2
+    assert CYPHER_DURATION.count("test.metrics_statement") == before + 1
+    assert CYPHER_ROWS.value("test.metrics_statement") >= 2
+    assert CYPHER_AVAILABLE_AFTER.count("test.metrics_statement") == before + 1
@@ -10,3 +10,63 @@ def neo4j_connection():
 def test_neo4j_connection(neo4j_connection):
     # Verifique se a conexão foi estabelecida com sucesso, verificando o retorno de 'connect()'
     assert neo4j_connection.connect() is True  # A conexão deve retornar True se for bem-sucedida
+
+def test_shared_connection_reuses_one_driver():
+    import asyncio
+    from app.db.connection import db, init_db, close_db
+
+    assert init_db() is True
+    driver = db.driver
+    assert init_db() is True
+    assert db.driver is driver  # no second driver/pool per caller
+
+    asyncio.run(close_db())
+    assert db.driver is None
+
+def test_execute_write_runs_work_in_managed_transaction():
+    from unittest.mock import MagicMock
+    from neo4j.exceptions import SessionExpired
+    from app.db.connection import Neo4jConnection
+    from app.db.queries import query_registry
+
+    connection = Neo4jConnection(lazy=True)
+    connection.driver = MagicMock()
+    session = connection.driver.session.return_value
+    tx = MagicMock()
+    session.execute_write.side_effect = lambda work, *args, **kwargs: (work.timeout, work(tx, *args, **kwargs))
+
+    def work(tx, name):
+        tx.run("RETURN $name", name=name)
+        return name
+
+    timeout, result = connection.execute_write(work, "x", timeout=2)
+
+    assert (timeout, result) == (2, "x")
+    tx.run.assert_called_once_with("RETURN $name", name="x")
+    assert query_registry.stats()["executions"] >= 1
+    session.close.assert_called_once()
+
+    # Errors surface once, without a second yield from the context manager
+    session.execute_write.side_effect = SessionExpired("expired")
+    with pytest.raises(SessionExpired):
+        connection.execute_write(work, "x")
+    assert session.close.call_count == 2
+
+
+def test_analytics_use_read_access_and_configured_database(monkeypatch):
+    from unittest.mock import MagicMock
+    from app.db import connection
+    from app.db.connection import Neo4jConnection
+
+    monkeypatch.setattr(connection, "NEO4J_DATABASE", "journal")
+    conn = Neo4jConnection(lazy=True)
+    conn.driver = MagicMock()
+    session = conn.driver.session.return_value
+    session.execute_read.return_value = "read"
+    session.execute_write.return_value = "write"
+
+    assert conn.execute_analytics(lambda tx: None) == "read"
+    conn.driver.session.assert_called_with(database="journal")
+
+    monkeypatch.setattr(connection, "NEO4J_ANALYTICS_ACCESS", "write")
+    assert conn.execute_analytics(lambda tx: None) == "write"
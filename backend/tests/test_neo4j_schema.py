@@ -0,0 +1,63 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+from app.db import schema
+
+
+class FakeResult:
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    def __aiter__(self):
+        async def gen():
+            for record in self._records:
+                yield record
+        return gen()
+
+    async def consume(self):
+        return None
+
+
+@pytest.fixture
+def mock_async_session():
+    session = Mock()
+
+    @asynccontextmanager
+    async def get_session(**config):
+        yield session
+
+    with patch('app.db.schema.async_db.get_session', get_session):
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_only_creates_missing_items(mock_async_session):
+    existing = [{"name": "user_uid_unique"}, {"name": "thought_user_id"}]
+
+    async def run(statement):
+        if statement.startswith("SHOW CONSTRAINTS"):
+            return FakeResult(existing)
+        if statement.startswith("SHOW INDEXES"):
+            return FakeResult()
+        if "emotion_name_unique" in statement:
+            raise Exception("duplicate emotion names")
+        return FakeResult()
+
+    mock_async_session.run = AsyncMock(side_effect=run)
+
+    report = await schema.ensure_schema()
+
+    assert "user_uid_unique" not in report["created"]
+    assert "thought_user_id" not in report["created"]
+    assert "thought_user_timestamp" in report["created"]
+    assert report["failed"] == ["emotion_name_unique"]
+
+
+@pytest.mark.asyncio
+async def test_missing_schema(mock_async_session):
+    present = [{"name": name} for name in schema.schema_statements() if name != "thought_timestamp"]
+    mock_async_session.run = AsyncMock(side_effect=lambda statement: FakeResult(
+        present if statement.startswith("SHOW CONSTRAINTS") else []
+    ))
+
+    assert await schema.missing_schema() == ["thought_timestamp"]
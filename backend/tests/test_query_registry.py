@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timezone
+from app.db.queries import QueryRegistry, query_registry
+from app.models.thought import Thought
+from app.services.thought_service import (
+    ALL_SYMPTOMS_THOUGHTS_QUERY,
+    ANY_SYMPTOM_THOUGHTS_PAGE_QUERY,
+    ANY_SYMPTOM_THOUGHTS_QUERY,
+    USER_THOUGHTS_PAGE_QUERY,
+    USER_THOUGHTS_QUERY,
+    _build_user_thoughts_query,
+    _create_thought_params,
+    encode_cursor,
+)
+
+
+def test_user_thoughts_filters_share_static_statements():
+    timestamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    cursor = encode_cursor(Thought(id="thought_1", user_id="u", timestamp=timestamp, emotion="Joy"))
+    combinations = [
+        {},
+        {"emotion": "Joy"},
+        {"start_date": timestamp, "symptoms": ["racing heart"]},
+        {"end_date": timestamp, "emotion": "Joy", "symptoms": ["racing heart"], "symptom_match": "all"},
+        {"symptoms": ["racing heart", "sweaty palms"], "symptom_match": "all"},
+        {"limit": 20},
+        {"limit": 20, "cursor": cursor, "fields": ["title"]},
+        {"limit": 20, "symptoms": ["racing heart", "sweaty palms"]},
+    ]
+
+    queries = {_build_user_thoughts_query("u", **filters)[0] for filters in combinations}
+
+    assert queries == {
+        USER_THOUGHTS_QUERY, USER_THOUGHTS_PAGE_QUERY,
+        ANY_SYMPTOM_THOUGHTS_QUERY, ANY_SYMPTOM_THOUGHTS_PAGE_QUERY,
+        ALL_SYMPTOMS_THOUGHTS_QUERY,
+    }
+
+
+def test_create_thought_params_always_bind_symptoms():
+    thought = Thought(user_id="u", timestamp=datetime.now(timezone.utc), emotion="Joy", symptoms=[])
+
+    params, normalized = _create_thought_params("u", thought)
+
+    assert params["symptoms"] == [] and normalized == []
+
+
+def test_registered_statements_are_unique():
+    texts = [query_registry[name] for name in query_registry.names()]
+    assert len(texts) == len(set(texts))
+
+
+def test_query_text_reuse_ratio():
+    registry = QueryRegistry()
+    registry.register("a", "MATCH (n) RETURN n")
+    registry.register("b", "MATCH (m) RETURN m")
+
+    for _ in range(3):
+        registry.record("MATCH (n) RETURN n")
+    registry.record("MATCH (m) RETURN m")
+    registry.record("MATCH (x) RETURN x")
+
+    stats = registry.stats()
+    assert stats["executions"] == 5
+    assert stats["distinct_texts"] == 3
+    assert stats["unregistered_texts"] == 1
+    assert stats["query_text_reuse_ratio"] == pytest.approx(0.4)
+    assert stats["by_statement"] == {"a": 3, "b": 1}
+
+    with pytest.raises(ValueError):
+        registry.register("a", "MATCH (other) RETURN other")
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.cache.response_cache import INSIGHTS_SUMMARY, THOUGHT_PATTERNS, MemoryBackend, RedisBackend, ResponseCache
+from app.monitoring.metrics import RESPONSE_CACHE_REQUESTS
+from benchmarks.graph_standin import InMemoryGraph
+from benchmarks.offline_app import auth_headers, offline_client
+from benchmarks.redis_standin import InMemoryRedis
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    backend = MemoryBackend() if request.param == "memory" else RedisBackend(InMemoryRedis())
+    return ResponseCache(backend, ttl=60)
+
+
+async def test_repeat_reads_are_served_from_cache(cache):
+    loader = AsyncMock(return_value={"total_thoughts": 3})
+    hits = RESPONSE_CACHE_REQUESTS.value(INSIGHTS_SUMMARY, "hit")
+
+    assert await cache.get_or_load("u1", INSIGHTS_SUMMARY, loader) == {"total_thoughts": 3}
+    assert await cache.get_or_load("u1", INSIGHTS_SUMMARY, loader) == {"total_thoughts": 3}
+
+    loader.assert_awaited_once()
+    assert RESPONSE_CACHE_REQUESTS.value(INSIGHTS_SUMMARY, "hit") == hits + 1
+
+
+async def test_entries_are_per_user_and_endpoint(cache):
+    await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock(return_value={"user": "u1"}))
+    await cache.get_or_load("u1", THOUGHT_PATTERNS, AsyncMock(return_value=[{"emotion": "Joy", "count": 1}]))
+
+    assert await cache.get_or_load("u2", INSIGHTS_SUMMARY, AsyncMock(return_value={"user": "u2"})) == {"user": "u2"}
+    assert await cache.get_or_load("u1", THOUGHT_PATTERNS, AsyncMock()) == [{"emotion": "Joy", "count": 1}]
+
+
+async def test_invalidate_drops_every_endpoint_of_the_user(cache):
+    await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock(return_value={"total_thoughts": 1}))
+    await cache.get_or_load("u1", THOUGHT_PATTERNS, AsyncMock(return_value=[]))
+    await cache.get_or_load("u2", INSIGHTS_SUMMARY, AsyncMock(return_value={"total_thoughts": 7}))
+
+    await cache.invalidate("u1")
+
+    assert await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock(return_value={"total_thoughts": 2})) == {"total_thoughts": 2}
+    assert await cache.get_or_load("u1", THOUGHT_PATTERNS, AsyncMock(return_value=[1])) == [1]
+    assert await cache.get_or_load("u2", INSIGHTS_SUMMARY, AsyncMock()) == {"total_thoughts": 7}
+
+
+async def test_load_racing_with_a_write_is_not_stored():
+    cache = ResponseCache(MemoryBackend(), ttl=60)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_loader():
+        started.set()
+        await release.wait()
+        return {"total_thoughts": 1}
+
+    stale_read = asyncio.create_task(cache.get_or_load("u1", INSIGHTS_SUMMARY, slow_loader))
+    await started.wait()
+    await cache.invalidate("u1")
+    # A read after the write doesn't join the load that started before it
+    fresh = await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock(return_value={"total_thoughts": 2}))
+    release.set()
+
+    assert await stale_read == {"total_thoughts": 1}
+    assert fresh == {"total_thoughts": 2}
+    assert await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock()) == {"total_thoughts": 2}
+
+
+async def test_backend_errors_fall_back_to_the_loader():
+    backend = AsyncMock()
+    backend.get.side_effect = ConnectionError("down")
+    backend.set.side_effect = ConnectionError("down")
+    backend.delete.side_effect = ConnectionError("down")
+    cache = ResponseCache(backend, ttl=60)
+
+    assert await cache.get_or_load("u1", INSIGHTS_SUMMARY, AsyncMock(return_value={"ok": True})) == {"ok": True}
+    await cache.invalidate("u1")
+
+
+async def test_disabled_cache_always_loads():
+    cache = ResponseCache(None)
+    loader = AsyncMock(return_value=[])
+
+    await cache.get_or_load("u1", THOUGHT_PATTERNS, loader)
+    await cache.get_or_load("u1", THOUGHT_PATTERNS, loader)
+
+    assert loader.await_count == 2
+
+
+async def test_unknown_endpoint_is_rejected():
+    with pytest.raises(ValueError):
+        await ResponseCache(MemoryBackend()).get_or_load("u1", "thoughts", AsyncMock())
+
+
+async def test_dashboard_is_cached_until_the_user_writes():
+    graph = InMemoryGraph()
+    graph.seed_catalogs()
+    graph.seed_user("u1", thoughts=5)
+    headers = auth_headers("u1")
+    thought = {
+        "title": "Prova", "situation_description": "Prova amanhã", "emotion": "Fear",
+        "underlying_belief": "Vou falhar", "symptoms": [],
+    }
+
+    statements = []
+    run = graph.run
+    graph.run = lambda query, params: statements.append(query) or run(query, params)
+
+    async with offline_client(graph) as client:
+        first = await client.get("/thought-records/insights-summary", headers=headers)
+        before_repeat = len(statements)
+        repeat = await client.get("/thought-records/insights-summary", headers=headers)
+        repeat_statements = len(statements) - before_repeat
+        created = await client.post("/thought-records/", json=thought, headers=headers)
+        after_write = await client.get("/thought-records/insights-summary", headers=headers)
+
+    assert first.json()["total_thoughts"] == repeat.json()["total_thoughts"] == 5
+    assert repeat_statements == 0
+    assert created.status_code == 200
+    assert after_write.json()["total_thoughts"] == 6